@@ -0,0 +1 @@
+"""Microbenchmarks for CineBrain's own overhead; see benchmarks/run.py."""
@@ -0,0 +1,408 @@
+"""
+CineBrain microbenchmarks, run against a deterministic stub LLM.
+
+    python -m benchmarks.run                      # full suite
+    python -m benchmarks.run --quick              # fewer iterations, for a smoke check
+    python -m benchmarks.run --baseline benchmarks/results/old.json --fail-on-regression 20
+
+Suites:
+    nodes       per-node wall time and overhead (wall minus simulated LLM time)
+    dispatch    cost of moving a turn through the graph topology with no-op nodes
+    checkpoint  extra cost per turn of each checkpointer over none
+    memory      traced Python heap growth per turn (same thread / new thread per turn)
+    throughput  turns/s and latency with 1, 10 and 100 threads running concurrently
+
+Results are written as JSON (default benchmarks/results/<timestamp>.json).
+With --baseline, every *_ms metric except max_ms is compared against an
+earlier run.
+"""
+import argparse
+import asyncio
+import functools
+import gc
+import inspect
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END
+from langgraph.types import Command
+
+from benchmarks import stub_llm
+from benchmarks.stub_llm import LatencyLedger, charge_to, release
+
+RESULTS_DIR = Path(__file__).parent / "results"
+CONCURRENCY_LEVELS = (1, 10, 100)
+
+
+def _summary(samples: List[float], scale: float = 1000.0) -> Dict[str, float]:
+    """mean/p50/p95/max of samples in seconds, reported in ms."""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * scale, 4),
+        "p50_ms": round(pick(0.50) * scale, 4),
+        "p95_ms": round(pick(0.95) * scale, 4),
+        "max_ms": round(ordered[-1] * scale, 4),
+    }
+
+
+def _graph_module():
+    import src.graph.graph as graph_module
+
+    return graph_module
+
+
+@contextmanager
+def _patched_nodes(replace: Callable[[str, Callable], Callable]) -> Iterator[None]:
+    """Swap every *_node the graph builder uses for replace(name, node) while building."""
+    module = _graph_module()
+    originals = {name: getattr(module, name) for name in dir(module) if name.endswith("_node")}
+    try:
+        for name, node in originals.items():
+            setattr(module, name, replace(name, node))
+        yield
+    finally:
+        for name, node in originals.items():
+            setattr(module, name, node)
+
+
+def _build(checkpointer=None, replace: Optional[Callable[[str, Callable], Callable]] = None):
+    module = _graph_module()
+    if replace is None:
+        return module._build_base_graph().compile(checkpointer=checkpointer)
+    with _patched_nodes(replace):
+        return module._build_base_graph().compile(checkpointer=checkpointer)
+
+
+def _sqlite_saver(directory: str, **kwargs):
+    from src.graph.checkpointer import SQLiteCheckpointSaver
+
+    return SQLiteCheckpointSaver(str(Path(directory) / f"{uuid.uuid4().hex}.sqlite"), **kwargs)
+
+
+async def _turn(graph, message: str, thread_id: str) -> None:
+    from src.graph.streaming import astream_turn
+
+    config = {"configurable": {"thread_id": thread_id, "user_id": thread_id}}
+    async for _ in astream_turn(graph, message, config):
+        pass
+
+
+# --- No-op topology ------------------------------------------------------------
+# Same names, edges and Command targets as the real nodes, doing no work
+
+
+async def _noop(state) -> dict:
+    return {}
+
+
+async def _route(state) -> dict:
+    return {"workflow": "conversation"}
+
+
+async def _reply(state) -> Command[Literal["summary"]]:
+    return Command(update={"messages": [AIMessage(content="ok")]}, goto="summary")
+
+
+async def _finish(state) -> Command[Literal["store_memory", "__end__"]]:
+    return Command(goto=END)
+
+
+async def _store(state) -> Command[Literal["__end__"]]:
+    return Command(goto=END)
+
+
+_NOOP_NODES = {
+    "router_node": _route,
+    "conversation_node": _reply,
+    "video_node": _reply,
+    "audio_node": _reply,
+    "summary_node": _finish,
+    "store_memory_node": _store,
+}
+
+
+def _noop_replace(name: str, node: Callable) -> Callable:
+    return _NOOP_NODES.get(name, _noop)
+
+
+# --- Suites --------------------------------------------------------------------
+
+
+async def bench_nodes(turns: int, latency: float) -> Dict[str, Any]:
+    """Real nodes on one thread; per node wall time and wall minus simulated LLM time."""
+    wall: Dict[str, List[float]] = defaultdict(list)
+    overhead: Dict[str, List[float]] = defaultdict(list)
+
+    def timed(name: str, node: Callable) -> Callable:
+        label = name[: -len("_node")]
+
+        @functools.wraps(node)
+        async def wrapper(*args, **kwargs):
+            ledger = LatencyLedger()
+            token = charge_to(ledger)
+            started = time.perf_counter()
+            try:
+                result = node(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+                return result
+            finally:
+                elapsed = time.perf_counter() - started
+                release(token)
+                wall[label].append(elapsed)
+                overhead[label].append(max(elapsed - ledger.seconds, 0.0))
+
+        return wrapper
+
+    graph = _build(MemorySaver(), timed)
+    thread_id = f"bench-nodes-{uuid.uuid4().hex[:8]}"
+    await _turn(graph, "warm up", thread_id)
+    wall.clear()
+    overhead.clear()
+    for i in range(turns):
+        await _turn(graph, f"pitch me a thriller logline, take {i}", thread_id)
+    return {
+        "turns": turns,
+        "stub_latency_ms": latency * 1000,
+        "nodes": {
+            label: {"wall": _summary(wall[label]), "overhead": _summary(overhead[label])} for label in sorted(wall)
+        },
+    }
+
+
+async def bench_dispatch(turns: int) -> Dict[str, Any]:
+    """Turn time through the real topology with no-op nodes and no checkpointer."""
+    graph = _build(None, _noop_replace)
+    results = {}
+    for mode in ("ainvoke", "astream_turn"):
+        samples = []
+        for i in range(turns + 10):
+            started = time.perf_counter()
+            if mode == "ainvoke":
+                await graph.ainvoke({"messages": [HumanMessage(content=f"hi {i}")]})
+            else:
+                await _turn(graph, f"hi {i}", "dispatch")
+            if i >= 10:
+                samples.append(time.perf_counter() - started)
+        results[mode] = _summary(samples)
+    return results
+
+
+async def bench_checkpoint(turns: int, threads: int = 10) -> Dict[str, Any]:
+    """
+    No-op topology with each checkpointer; cost_ms is the mean per-turn time
+    above running with no checkpointer. Turns rotate over `threads` threads.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        savers = {
+            "none": lambda: None,
+            "memory": MemorySaver,
+            "sqlite_batched": lambda: _sqlite_saver(directory),
+            "sqlite_write_through": lambda: _sqlite_saver(directory, batch_size=1, flush_interval=0.0),
+        }
+        results: Dict[str, Any] = {}
+        for name, make in savers.items():
+            saver = make()
+            graph = _build(saver, _noop_replace)
+            samples = []
+            for i in range(turns + 10):
+                started = time.perf_counter()
+                await graph.ainvoke(
+                    {"messages": [HumanMessage(content=f"hi {i}")]},
+                    {"configurable": {"thread_id": f"ckpt-{i % threads}"}},
+                )
+                if i >= 10:
+                    samples.append(time.perf_counter() - started)
+            if hasattr(saver, "close"):
+                saver.close()
+            results[name] = _summary(samples)
+        baseline = results["none"]["mean_ms"]
+        for name, summary in results.items():
+            summary["cost_ms"] = round(summary["mean_ms"] - baseline, 4)
+    return results
+
+
+async def bench_memory(turns: int) -> Dict[str, Any]:
+    """Traced heap growth per turn with real nodes, a zero-latency stub and the SQLite checkpointer."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("same_thread", "new_thread_per_turn"):
+            saver = _sqlite_saver(directory)
+            graph = _build(saver)
+            for i in range(5):
+                await _turn(graph, f"warm up {i}", f"mem-warm-{mode}")
+            gc.collect()
+            tracemalloc.start()
+            before, _ = tracemalloc.get_traced_memory()
+            for i in range(turns):
+                thread_id = f"mem-{mode}" if mode == "same_thread" else f"mem-{mode}-{i}"
+                await _turn(graph, f"another logline please {i}", thread_id)
+            gc.collect()
+            after, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            saver.close()
+            results[mode] = {
+                "turns": turns,
+                "bytes_per_turn": round((after - before) / turns, 1),
+                "peak_kib": round(peak / 1024, 1),
+            }
+    return results
+
+
+async def bench_throughput(turns_per_thread: int, latency: float, levels=CONCURRENCY_LEVELS) -> Dict[str, Any]:
+    """Real nodes and the batched SQLite checkpointer, `level` threads each running turns back to back."""
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for level in levels:
+            saver = _sqlite_saver(directory)
+            graph = _build(saver)
+            latencies: List[float] = []
+
+            async def conversation(thread_id: str) -> None:
+                for i in range(turns_per_thread):
+                    started = time.perf_counter()
+                    await _turn(graph, f"give me a logline {i}", thread_id)
+                    latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(conversation(f"tp-{level}-{t}") for t in range(level)))
+            elapsed = time.perf_counter() - started
+            saver.close()
+            results[str(level)] = {
+                "threads": level,
+                "turns": len(latencies),
+                "turns_per_second": round(len(latencies) / elapsed, 2),
+                "latency": _summary(latencies),
+            }
+        single = results[str(levels[0])]["latency"]["p50_ms"]
+        for summary in results.values():
+            summary["p50_slowdown_vs_1"] = round(summary["latency"]["p50_ms"] / single, 3) if single else None
+    return {"stub_latency_ms": latency * 1000, "levels": results}
+
+
+# --- Runner --------------------------------------------------------------------
+
+
+def _metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for package in ("langgraph", "langchain-core"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "packages": versions,
+        "stub_latency_ms": args.latency * 1000,
+        "stub_token_delay_ms": args.token_delay * 1000,
+        "quick": args.quick,
+    }
+
+
+def _flatten(tree: Any, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    if isinstance(tree, dict):
+        for key, value in tree.items():
+            flat.update(_flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(tree, (int, float)) and prefix.endswith("_ms"):
+        flat[prefix] = float(tree)
+    return flat
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold_pct: float) -> List[str]:
+    """Lines describing *_ms metrics (max_ms aside) more than threshold_pct slower than the baseline."""
+    now, before = _flatten(current["results"]), _flatten(baseline.get("results", {}))
+    regressions = []
+    for key, value in sorted(now.items()):
+        old = before.get(key)
+        # Single worst samples and sub-microsecond baselines are noise, not a reference point
+        if old is None or old <= 0.001 or key.endswith("max_ms"):
+            continue
+        change = (value - old) / old * 100
+        if change > threshold_pct:
+            regressions.append(f"{key}: {old:.3f} -> {value:.3f} ms (+{change:.1f}%)")
+    return regressions
+
+
+async def run_suites(args: argparse.Namespace) -> Dict[str, Any]:
+    model = stub_llm.install(latency=args.latency, token_delay=args.token_delay)
+    scale = 0.2 if args.quick else 1.0
+    n = lambda full: max(2, int(full * scale))
+    results: Dict[str, Any] = {}
+    for suite in args.suites:
+        started = time.perf_counter()
+        print(f"[bench] {suite}...", file=sys.stderr, flush=True)
+        if suite == "nodes":
+            results[suite] = await bench_nodes(n(50), args.latency)
+        elif suite == "dispatch":
+            results[suite] = await bench_dispatch(n(500))
+        elif suite == "checkpoint":
+            results[suite] = await bench_checkpoint(n(500))
+        elif suite == "memory":
+            # Heap growth doesn't depend on latency; don't wait for it
+            model.latency, model.token_delay = 0.0, 0.0
+            results[suite] = await bench_memory(n(100))
+            model.latency, model.token_delay = args.latency, args.token_delay
+        elif suite == "throughput":
+            results[suite] = await bench_throughput(n(10), args.latency)
+        print(f"[bench] {suite} done in {time.perf_counter() - started:.1f}s", file=sys.stderr, flush=True)
+    return results
+
+
+def main() -> None:
+    suites = ("nodes", "dispatch", "checkpoint", "memory", "throughput")
+    parser = argparse.ArgumentParser(description="CineBrain microbenchmarks with a stub LLM")
+    parser.add_argument("--suites", nargs="+", choices=suites, default=list(suites))
+    parser.add_argument("--latency", type=float, default=0.05, help="stub seconds to first token / structured answer")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="stub seconds between streamed tokens")
+    parser.add_argument("--quick", action="store_true", help="about a fifth of the iterations")
+    parser.add_argument("--output", help="results JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier results JSON to compare *_ms metrics against")
+    parser.add_argument(
+        "--fail-on-regression", type=float, metavar="PCT", help="exit 1 if any *_ms metric is PCT%% slower than --baseline"
+    )
+    args = parser.parse_args()
+
+    report = {"meta": _metadata(args), "results": asyncio.run(run_suites(args))}
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"[bench] results written to {output}", file=sys.stderr)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        threshold = args.fail_on_regression if args.fail_on_regression is not None else 10.0
+        regressions = compare(report, baseline, threshold)
+        for line in regressions:
+            print(f"[bench] slower: {line}", file=sys.stderr)
+        if regressions and args.fail_on_regression is not None:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Deterministic stand-in for the Groq chat models, so benchmarks measure
+CineBrain's own overhead instead of provider latency.
+
+StubChatModel sleeps a configurable time before its first token and between
+tokens, streams a fixed reply, and answers with_structured_output() calls
+with canned instances (see CANNED). Every call also charges its simulated
+time to the active LatencyLedger, so a benchmark can subtract time "spent
+at the provider" from wall time.
+"""
+import asyncio
+import contextvars
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Type
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel
+
+from src.memory.memory_manager import MemoryAnalysis
+from src.prompts.planner_module import ComplexityAnalysis, ContextForGeneration, MemoryStorageDecision, RouterResponse
+
+REPLY = (
+    "Here is a tight logline: a retired stunt double is hired to teach an AI how to fall, "
+    "and learns the machine has been planning its own escape."
+)
+
+# Structured answers that keep every turn on the plain conversation path; memory
+# is never judged important, so no turn searches or writes Mem0
+CANNED: Dict[str, Callable[[], BaseModel]] = {
+    "RouterResponse": lambda: RouterResponse(conversation=True, video=False),
+    "ComplexityAnalysis": lambda: ComplexityAnalysis(is_complex=False, reason="benchmark"),
+    "MemoryAnalysis": lambda: MemoryAnalysis(is_important=False),
+    "ContextForGeneration": lambda: ContextForGeneration(general_instruction="Answer briefly."),
+    "MemoryStorageDecision": lambda: MemoryStorageDecision(should_store=False, reason="benchmark"),
+}
+
+
+class LatencyLedger:
+    """Accumulates simulated provider seconds for the code running under it."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+
+
+_ledger: contextvars.ContextVar[Optional[LatencyLedger]] = contextvars.ContextVar("stub_llm_ledger", default=None)
+
+
+def charge_to(ledger: LatencyLedger) -> contextvars.Token:
+    """Make `ledger` the target of simulated latency in this context (and tasks it starts)."""
+    return _ledger.set(ledger)
+
+
+def release(token: contextvars.Token) -> None:
+    """Undo the matching charge_to()."""
+    _ledger.reset(token)
+
+
+async def _simulate(seconds: float) -> None:
+    ledger = _ledger.get()
+    if ledger is not None:
+        ledger.seconds += seconds
+        ledger.calls += 1
+    if seconds > 0:
+        await asyncio.sleep(seconds)
+
+
+class StubChatModel(BaseChatModel):
+    """Chat model with fixed output and configurable, deterministic latency."""
+
+    latency: float = 0.05  # seconds before the first token / structured answer
+    token_delay: float = 0.0  # seconds between streamed tokens
+    reply: str = REPLY
+
+    @property
+    def _llm_type(self) -> str:
+        return "cinebrain-stub"
+
+    def _tokens(self) -> List[str]:
+        words = self.reply.split(" ")
+        return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await _simulate(self.latency + self.token_delay * (len(self._tokens()) - 1))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for i, token in enumerate(self._tokens()):
+            await _simulate(self.latency if i == 0 else self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "StubChatModel":
+        # Never emits tool calls, so a ReAct agent answers in one step
+        return self
+
+    def with_structured_output(self, schema: Type[BaseModel], **kwargs: Any) -> Runnable:
+        make = CANNED.get(getattr(schema, "__name__", ""))
+        if make is None:
+            raise ValueError(f"No canned structured output for {schema!r}; add one to CANNED")
+
+        async def answer(_: Any) -> BaseModel:
+            await _simulate(self.latency)
+            return make()
+
+        return RunnableLambda(lambda _: make(), afunc=answer)
+
+
+# Modules that bind get_llm_by_type at import time
+_LLM_CONSUMERS = (
+    "src.graph.nodes",
+    "src.memory.memory_manager",
+    "src.memory.conversation_window",
+    "src.agents.agents",
+)
+
+
+def install(latency: float = 0.05, token_delay: float = 0.0) -> StubChatModel:
+    """Route every get_llm_by_type() in the graph to one StubChatModel and return it."""
+    import importlib
+
+    import src.memory.memory_manager as memory_manager
+
+    model = StubChatModel(latency=latency, token_delay=token_delay)
+    for name in _LLM_CONSUMERS:
+        setattr(importlib.import_module(name), "get_llm_by_type", lambda llm_type, _model=model: _model)
+    # The shared memory-analysis LLM is built once; rebuild it from the stub
+    memory_manager._analysis_llm = None
+    return model
@@ -0,0 +1,113 @@
+# build_box_office_dataset.py
+"""
+Build the training CSV of the local box-office estimator
+(BOX_OFFICE_MODEL.dataset_path, data/box_office.csv by default).
+
+    python scripts/build_box_office_dataset.py --grosses grosses.csv [--db .cache/movies.sqlite]
+
+The IMDb dumps carry genres, runtime and rating but no money, so grosses come
+from a CSV with title, year and worldwide_gross columns, plus optional budget
+and release_date (YYYY-MM-DD) or release_month, e.g. an export from The Numbers
+or Box Office Mojo. Each row is matched to the movie of the same title in the
+local database built by ingest_movies_db.py, within a year of the given year
+(festival and wide release dates differ), preferring the closest year and then
+the most voted. Unmatched rows are counted and skipped. The estimator retrains
+itself the next time it loads a dataset newer than its saved model.
+"""
+import argparse
+import csv
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = REPO_ROOT / ".cache" / "movies.sqlite"
+DEFAULT_OUTPUT = REPO_ROOT / "data" / "box_office.csv"
+
+# Columns read by src.tools.box_office_model.load_dataset
+COLUMNS = ("title", "genres", "runtime_minutes", "rating", "release_month", "budget", "worldwide_gross")
+
+_MATCH_SQL = """
+SELECT t.primary_title, t.start_year, t.runtime_minutes, t.genres, r.average_rating
+FROM titles t LEFT JOIN ratings r ON r.tconst = t.tconst
+WHERE t.primary_title = ? COLLATE NOCASE AND t.title_type = 'movie' AND t.start_year BETWEEN ? AND ?
+ORDER BY ABS(t.start_year - ?), COALESCE(r.num_votes, 0) DESC
+LIMIT 1
+"""
+
+
+def _money(value: Optional[str]) -> Optional[float]:
+    """'$1,234,567' -> 1234567.0; empty or unparseable -> None."""
+    cleaned = (value or "").replace("$", "").replace(",", "").strip()
+    try:
+        return float(cleaned) if cleaned else None
+    except ValueError:
+        return None
+
+
+def _month(row: Dict[str, str]) -> Optional[int]:
+    if row.get("release_month"):
+        return int(row["release_month"])
+    date = (row.get("release_date") or "").strip()
+    if len(date) >= 7 and date[4] == "-":
+        return int(date[5:7])
+    return None
+
+
+def build(grosses_path: Path, db_path: Path, output_path: Path) -> None:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(".tmp")
+    written = unmatched = skipped = 0
+    with open(grosses_path, newline="", encoding="utf-8") as src, open(tmp_path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=COLUMNS)
+        writer.writeheader()
+        for row in csv.DictReader(src):
+            gross = _money(row.get("worldwide_gross"))
+            try:
+                year = int(row.get("year") or (row.get("release_date") or "")[:4])
+            except ValueError:
+                year = None
+            if gross is None or year is None or not row.get("title"):
+                skipped += 1
+                continue
+            match = conn.execute(_MATCH_SQL, (row["title"].strip(), year - 1, year + 1, year)).fetchone()
+            if match is None:
+                unmatched += 1
+                continue
+            title, start_year, runtime, genres, rating = match
+            budget = _money(row.get("budget"))
+            writer.writerow(
+                {
+                    "title": f"{title} ({start_year})",
+                    "genres": genres or "",
+                    "runtime_minutes": runtime or "",
+                    "rating": rating if rating is not None else "",
+                    "release_month": _month(row) or "",
+                    "budget": budget if budget is not None else "",
+                    "worldwide_gross": gross,
+                }
+            )
+            written += 1
+    conn.close()
+    tmp_path.replace(output_path)
+    print(
+        f"Wrote {written} titles to {output_path} ({unmatched} not in the movie database, {skipped} without gross/year)",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Join a grosses CSV with the local IMDb database into the box-office dataset.")
+    parser.add_argument("--grosses", type=Path, required=True, help="CSV with title, year, worldwide_gross[, budget, release_date]")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"Movie database from ingest_movies_db.py (default: {DEFAULT_DB})")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help=f"Dataset CSV to write (default: {DEFAULT_OUTPUT})")
+    args = parser.parse_args()
+    if not args.db.expanduser().exists():
+        parser.error(f"{args.db} not found; build it first with scripts/ingest_movies_db.py")
+    build(args.grosses.expanduser(), args.db.expanduser(), args.output.expanduser())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# build_vibe_index.py
+"""
+Append movie synopses to the vibe-matching index used by the vibe_match tool.
+
+    python scripts/build_vibe_index.py --input synopses.csv [--rebuild-ivf]
+
+The input is a CSV with title, year and synopsis columns. Rows are appended
+in batches, so an existing index is extended rather than rebuilt. Pass
+--rebuild-ivf after large appends to re-cluster the approximate search lists.
+"""
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from src.tools.vibe_index import VibeIndex  # noqa: E402
+
+# Synopsis text kept in metadata and shown to the agent
+_SNIPPET_CHARS = 300
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Append synopses to the vibe-matching index.")
+    parser.add_argument("--input", type=Path, required=True, help="CSV with title, year, synopsis columns")
+    parser.add_argument("--index-dir", type=Path, default=REPO_ROOT / ".cache" / "vibe_index")
+    parser.add_argument("--dim", type=int, default=512, help="Must match VIBE_INDEX.dim in agents_config.yaml")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--rebuild-ivf", action="store_true", help="Re-cluster the IVF lists after appending")
+    args = parser.parse_args()
+
+    index = VibeIndex(str(args.index_dir.expanduser()), dim=args.dim)
+    synopses, metadata, added = [], [], 0
+    with open(args.input, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            synopsis = (row.get("synopsis") or "").strip()
+            if not synopsis:
+                continue
+            synopses.append(synopsis)
+            metadata.append({"title": row.get("title", ""), "year": row.get("year") or None, "synopsis": synopsis[:_SNIPPET_CHARS]})
+            if len(synopses) >= args.batch_size:
+                index.append(synopses, metadata)
+                added += len(synopses)
+                synopses, metadata = [], []
+                print(f"\rAppended {added:,} synopses", end="", file=sys.stderr)
+    if synopses:
+        index.append(synopses, metadata)
+        added += len(synopses)
+    print(f"\rAppended {added:,} synopses; index holds {len(index):,}", file=sys.stderr)
+    if args.rebuild_ivf:
+        index.build_ivf()
+
+
+if __name__ == "__main__":
+    main()
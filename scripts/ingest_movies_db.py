@@ -1 +1,200 @@
 # ingest_movies_db.py
+"""
+Load the public IMDb TSV dumps (https://datasets.imdbws.com/) into the local
+SQLite movie database queried by the imdb_api tool.
+
+    python scripts/ingest_movies_db.py --data-dir ~/imdb --db .cache/movies.sqlite
+
+Reads title.basics, title.ratings, title.principals and name.basics (.tsv or
+.tsv.gz) as streams and inserts them in fixed-size batches, so memory stays
+flat on multi-GB files. Indexes and full-text tables are built after the bulk
+load, into a temporary file that replaces the database only when complete.
+"""
+import argparse
+import csv
+import gzip
+import io
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = REPO_ROOT / ".cache" / "movies.sqlite"
+DEFAULT_TITLE_TYPES = ("movie", "tvMovie", "tvSeries", "tvMiniSeries", "short", "video")
+
+SCHEMA = """
+CREATE TABLE titles (
+    tconst TEXT PRIMARY KEY,
+    title_type TEXT,
+    primary_title TEXT NOT NULL,
+    original_title TEXT,
+    start_year INTEGER,
+    end_year INTEGER,
+    runtime_minutes INTEGER,
+    genres TEXT
+);
+CREATE TABLE ratings (
+    tconst TEXT PRIMARY KEY,
+    average_rating REAL,
+    num_votes INTEGER
+);
+CREATE TABLE people (
+    nconst TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    birth_year INTEGER,
+    death_year INTEGER,
+    professions TEXT,
+    known_for TEXT
+);
+CREATE TABLE principals (
+    tconst TEXT NOT NULL,
+    ordering INTEGER,
+    nconst TEXT NOT NULL,
+    category TEXT,
+    job TEXT,
+    characters TEXT
+);
+"""
+
+INDEXES = """
+CREATE INDEX idx_titles_year ON titles (start_year);
+CREATE INDEX idx_titles_title ON titles (primary_title COLLATE NOCASE);
+CREATE INDEX idx_people_name ON people (name COLLATE NOCASE);
+CREATE INDEX idx_principals_title ON principals (tconst, ordering);
+CREATE INDEX idx_principals_person ON principals (nconst);
+CREATE VIRTUAL TABLE titles_fts USING fts5(primary_title, original_title, content='titles', content_rowid='rowid');
+INSERT INTO titles_fts (rowid, primary_title, original_title) SELECT rowid, primary_title, original_title FROM titles;
+CREATE VIRTUAL TABLE people_fts USING fts5(name, content='people', content_rowid='rowid');
+INSERT INTO people_fts (rowid, name) SELECT rowid, name FROM people;
+"""
+
+# Appended to the inserts of per-title rows, whose tconst is bound again last
+_KEPT_TITLE = "WHERE EXISTS (SELECT 1 FROM titles WHERE tconst = ?)"
+
+
+def _open_tsv(data_dir: Path, name: str) -> io.TextIOBase:
+    for candidate in (data_dir / f"{name}.tsv.gz", data_dir / f"{name}.tsv"):
+        if candidate.exists():
+            if candidate.suffix == ".gz":
+                return gzip.open(candidate, "rt", encoding="utf-8", newline="")
+            return open(candidate, encoding="utf-8", newline="")
+    raise FileNotFoundError(f"{name}.tsv(.gz) not found in {data_dir}")
+
+
+def _rows(handle: io.TextIOBase) -> Iterator[List[Optional[str]]]:
+    """TSV rows with IMDb's \\N nulls as None; the dumps don't quote fields."""
+    reader = csv.reader(handle, delimiter="\t", quoting=csv.QUOTE_NONE)
+    next(reader, None)  # header
+    for row in reader:
+        yield [None if value == "\\N" else value for value in row]
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _load(
+    conn: sqlite3.Connection,
+    sql: str,
+    rows: Iterator[Sequence],
+    batch_size: int,
+    label: str,
+) -> int:
+    batch, total, started = [], 0, time.monotonic()
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            conn.executemany(sql, batch)
+            total += len(batch)
+            batch.clear()
+            print(f"\r{label}: {total:,} rows", end="", file=sys.stderr)
+    if batch:
+        conn.executemany(sql, batch)
+        total += len(batch)
+    conn.commit()
+    print(f"\r{label}: {total:,} rows in {time.monotonic() - started:.1f}s", file=sys.stderr)
+    return total
+
+
+def ingest(data_dir: Path, db_path: Path, title_types: Sequence[str], batch_size: int = 50_000) -> None:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_suffix(".tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(str(tmp_path))
+    # Bulk-load settings: the file is thrown away if the run fails
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.executescript(SCHEMA)
+
+    wanted = set(title_types)
+
+    def titles() -> Iterator[Sequence]:
+        with _open_tsv(data_dir, "title.basics") as handle:
+            for row in _rows(handle):
+                tconst, title_type, primary, original, _adult, start, end, runtime, genres = row[:9]
+                if wanted and title_type not in wanted:
+                    continue
+                yield (tconst, title_type, primary, original, _int(start), _int(end), _int(runtime), genres)
+
+    def per_title(name: str, convert: Callable[[list], Sequence]) -> Iterator[Sequence]:
+        with _open_tsv(data_dir, name) as handle:
+            for row in _rows(handle):
+                yield (*convert(row), row[0])
+
+    def people() -> Iterator[Sequence]:
+        with _open_tsv(data_dir, "name.basics") as handle:
+            for row in _rows(handle):
+                nconst, name, birth, death, professions, known_for = row[:6]
+                yield (nconst, name, _int(birth), _int(death), professions, known_for)
+
+    _load(conn, "INSERT OR REPLACE INTO titles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", titles(), batch_size, "titles")
+    # Ratings and principals of titles that weren't kept are dropped by SQLite,
+    # through the titles primary key, rather than by a set of every kept tconst
+    _load(
+        conn,
+        f"INSERT OR REPLACE INTO ratings SELECT ?, ?, ? {_KEPT_TITLE}",
+        per_title("title.ratings", lambda r: (r[0], float(r[1]) if r[1] else None, _int(r[2]))),
+        batch_size,
+        "ratings",
+    )
+    _load(
+        conn,
+        f"INSERT INTO principals SELECT ?, ?, ?, ?, ?, ? {_KEPT_TITLE}",
+        per_title("title.principals", lambda r: (r[0], _int(r[1]), r[2], r[3], r[4], r[5])),
+        batch_size,
+        "principals",
+    )
+    _load(conn, "INSERT OR REPLACE INTO people VALUES (?, ?, ?, ?, ?, ?)", people(), batch_size, "people")
+
+    print("Building indexes and full-text search...", file=sys.stderr)
+    conn.executescript(INDEXES)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    tmp_path.replace(db_path)
+    print(f"Movie database written to {db_path}", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest IMDb TSV dumps into the local movie database.")
+    parser.add_argument("--data-dir", type=Path, required=True, help="Directory with the IMDb .tsv or .tsv.gz files")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"Output SQLite file (default: {DEFAULT_DB})")
+    parser.add_argument(
+        "--title-types",
+        default=",".join(DEFAULT_TITLE_TYPES),
+        help="Comma-separated title types to keep; empty keeps all (episodes make the file much larger)",
+    )
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+    title_types = [t for t in args.title_types.split(",") if t]
+    ingest(args.data_dir.expanduser(), args.db.expanduser(), title_types, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,5 +17,9 @@ setup(
         "rich>=14.0.0",
         "crawl4ai>=0.6.3",
         "pyyaml>=6.0",
+        "httpx[http2]>=0.27.0",
+        "numpy>=1.26",
+        "fastapi>=0.115.0",
+        "uvicorn[standard]>=0.30.0",
     ],
 )
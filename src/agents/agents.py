@@ -6,12 +6,13 @@ from src.prompts.prompts import apply_prompt_template
 
 
 # Create agents using configured LLM types
-def create_agent(agent_name: str, agent_type: str, tools: list, prompt_template: str):
+def create_agent(agent_name: str, agent_type: str, tools: list, prompt_template: str, prompt_vars: dict | None = None):
     """Factory function to create agents with consistent configuration."""
+    system_prompt = apply_prompt_template(prompt_template, prompt_vars or {})[0]["content"]
     return create_react_agent(
         name=agent_name,
         model=get_llm_by_type(agent_type),
         tools=tools,
-        prompt=apply_prompt_template(prompt_template),
+        prompt=system_prompt,
     )
 
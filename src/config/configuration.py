@@ -72,6 +72,8 @@ class ChatAgentConfiguration:
     max_step_num: int = 5         # e.g., at most 5 steps in a plan
     team_timeout: int = 60        # e.g., seconds to wait per team node
     enable_doc_steps: bool = True # optionally enable/disable documentation steps
+    max_window_turns: int = 6     # turns kept verbatim in state; older ones are summarized (0 disables)
+    user_id: str = "default_user" # long-term memory identity for this conversation
     # Add more fields as needed!
 
     @classmethod
@@ -88,7 +90,7 @@ class ChatAgentConfiguration:
         }
         # Cast values to correct types
         for f in fields(cls):
-            if f.name in values:
+            if values.get(f.name) is not None:
                 if f.type is bool:
                     values[f.name] = str(values[f.name]).lower() == "true"
                 elif f.type is int:
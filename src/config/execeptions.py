@@ -13,4 +13,9 @@ class AgentExecutionError(Exception):
 class VideoProcessingError(Exception):
     """Custom exception for video processing errors."""
 
-    pass
\ No newline at end of file
+    pass
+
+class TextToVideoError(Exception):
+    """Custom exception for text-to-video generation errors."""
+
+    pass
@@ -20,6 +20,8 @@ class Settings(BaseSettings):
     )
 
     TTS_MODEL_NAME: str = "playai-tts"
+    TTS_VOICE: str = "Fritz-PlayAI"
+    GROQ_API_KEY: str
     MEMO_API_KEY: str
     SERPER_API_KEY: str
     GEMINI_API_KEY: str
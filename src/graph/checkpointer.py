@@ -0,0 +1,474 @@
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from src.config.logger import logger
+
+# Set by the API server's multi-worker mode: several processes share the file
+SHARED_CHECKPOINTS_ENV = "CINEBRAIN_SHARED_CHECKPOINTS"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    last_active REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_threads_last_active ON threads (last_active);
+"""
+
+# Shortest sleep of the maintenance thread, whatever the configured intervals
+_MIN_MAINTENANCE_WAIT = 0.1
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Disk-backed LangGraph checkpointer on SQLite (WAL mode).
+
+    Writes are buffered in memory and flushed in one transaction once
+    `batch_size` rows are pending or `flush_interval` seconds have passed.
+    Reads flush first, so a thread always sees its own writes.
+
+    Retention:
+        keep_last: checkpoints kept per thread/namespace, applied on flush.
+        idle_ttl: seconds after which an inactive thread is deleted by compact().
+
+    Each checkpoint row holds the full channel values, so keep_last pruning
+    is safe for graphs that don't use DeltaChannel (CineBrain's don't).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        keep_last: Optional[int] = 20,
+        idle_ttl: Optional[float] = 7 * 24 * 3600,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.keep_last = keep_last
+        self.idle_ttl = idle_ttl
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        # Pending rows keyed by primary key, so rewrites of the same row coalesce
+        self._pending_checkpoints: Dict[Tuple[str, str, str], tuple] = {}
+        self._pending_writes: Dict[Tuple[str, str, str, str, int], tuple] = {}
+        self._pending_threads: Dict[str, float] = {}
+        self._pending_since: Optional[float] = None
+
+        self._compaction_stop: Optional[threading.Event] = None
+
+    # --- Buffering -----------------------------------------------------------
+
+    def _pending_count(self) -> int:
+        return len(self._pending_checkpoints) + len(self._pending_writes)
+
+    def _should_flush(self) -> bool:
+        if self._pending_count() >= self.batch_size:
+            return True
+        return self._pending_since is not None and time.monotonic() - self._pending_since >= self.flush_interval
+
+    def _mark_pending(self, thread_id: str) -> None:
+        self._pending_threads[thread_id] = time.time()
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+
+    def flush(self) -> None:
+        """Write all buffered rows in a single transaction and apply keep_last."""
+        with self._lock:
+            if not self._pending_checkpoints and not self._pending_writes and not self._pending_threads:
+                return
+            touched = {key[:2] for key in self._pending_checkpoints}
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    list(self._pending_checkpoints.values()),
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row for key, row in self._pending_writes.items() if key[4] < 0],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row for key, row in self._pending_writes.items() if key[4] >= 0],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO threads VALUES (?, ?)",
+                    list(self._pending_threads.items()),
+                )
+                if self.keep_last:
+                    for thread_id, checkpoint_ns in touched:
+                        self._apply_keep_last(thread_id, checkpoint_ns)
+            self._pending_checkpoints.clear()
+            self._pending_writes.clear()
+            self._pending_threads.clear()
+            self._pending_since = None
+
+    def _apply_keep_last(self, thread_id: str, checkpoint_ns: str) -> int:
+        """Delete all but the newest keep_last checkpoints (and their writes)."""
+        stale = [
+            row[0]
+            for row in self._conn.execute(
+                """
+                SELECT checkpoint_id FROM checkpoints
+                WHERE thread_id = ? AND checkpoint_ns = ?
+                ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?
+                """,
+                (thread_id, checkpoint_ns, self.keep_last),
+            )
+        ]
+        for checkpoint_id in stale:
+            params = (thread_id, checkpoint_ns, checkpoint_id)
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", params
+            )
+            self._conn.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", params
+            )
+        return len(stale)
+
+    # --- BaseCheckpointSaver -------------------------------------------------
+
+    def _buffer_put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, serialized = self.serde.dumps_typed(checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            self._pending_checkpoints[(thread_id, checkpoint_ns, checkpoint["id"])] = (
+                thread_id,
+                checkpoint_ns,
+                checkpoint["id"],
+                config["configurable"].get("checkpoint_id"),
+                type_,
+                serialized,
+                metadata_type,
+                serialized_metadata,
+            )
+            self._mark_pending(thread_id)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def _buffer_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self._lock:
+            for idx, (channel, value) in enumerate(writes):
+                write_idx = WRITES_IDX_MAP.get(channel, idx)
+                key = (thread_id, checkpoint_ns, checkpoint_id, task_id, write_idx)
+                # Special writes (negative idx) are never overwritten, matching the reference savers
+                if write_idx < 0 and key in self._pending_writes:
+                    continue
+                type_, serialized = self.serde.dumps_typed(value)
+                self._pending_writes[key] = (*key, channel, type_, serialized, task_path)
+            self._mark_pending(thread_id)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        next_config = self._buffer_put(config, checkpoint, metadata)
+        if self._should_flush():
+            self.flush()
+        return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self._buffer_writes(config, writes, task_id, task_path)
+        if self._should_flush():
+            self.flush()
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        rows = self._conn.execute(
+            """
+            SELECT task_id, channel, type, value FROM writes
+            WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+            ORDER BY task_path, task_id, idx
+            """,
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return [(task_id, channel, self.serde.loads_typed((type_, value))) for task_id, channel, type_, value in rows]
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed((type_, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            self.flush()
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"""
+                    SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                    ORDER BY checkpoint_id DESC LIMIT 1
+                    """,
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                f"""
+                SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata
+                FROM checkpoints {where} ORDER BY checkpoint_id DESC
+                """,
+                params,
+            ).fetchall()
+            results = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if filter:
+                    metadata = self.serde.loads_typed((row[4], row[5]))
+                    if not all(metadata.get(k) == v for k, v in filter.items()):
+                        continue
+                results.append(self._to_tuple(thread_id, checkpoint_ns, tuple(row)))
+                if limit is not None and len(results) >= limit:
+                    break
+        yield from results
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self.flush()
+            with self._conn:
+                for table in ("checkpoints", "writes", "threads"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    def get_next_version(self, current: Optional[str], channel: None = None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # Async variants: buffered puts stay on the loop; anything touching disk runs in a thread
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in results:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        next_config = self._buffer_put(config, checkpoint, metadata)
+        if self._should_flush():
+            await asyncio.to_thread(self.flush)
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self._buffer_writes(config, writes, task_id, task_path)
+        if self._should_flush():
+            await asyncio.to_thread(self.flush)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    # --- Maintenance ---------------------------------------------------------
+
+    def compact(self, vacuum: bool = False) -> Dict[str, int]:
+        """
+        Flush, evict idle threads, enforce keep_last everywhere and truncate the WAL.
+
+        Returns:
+            Counts of evicted threads and pruned checkpoints.
+        """
+        evicted, pruned = 0, 0
+        with self._lock:
+            self.flush()
+            with self._conn:
+                if self.idle_ttl is not None:
+                    idle = [
+                        row[0]
+                        for row in self._conn.execute(
+                            "SELECT thread_id FROM threads WHERE last_active < ?", (time.time() - self.idle_ttl,)
+                        )
+                    ]
+                    for thread_id in idle:
+                        for table in ("checkpoints", "writes", "threads"):
+                            self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+                    evicted = len(idle)
+                if self.keep_last:
+                    for thread_id, checkpoint_ns in self._conn.execute(
+                        "SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints"
+                    ).fetchall():
+                        pruned += self._apply_keep_last(thread_id, checkpoint_ns)
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            if vacuum:
+                self._conn.execute("VACUUM")
+        logger.system_info(f"Checkpoint compaction: evicted {evicted} threads, pruned {pruned} checkpoints")
+        return {"evicted_threads": evicted, "pruned_checkpoints": pruned}
+
+    def start_compaction(self, interval: float = 3600) -> None:
+        """Run flush/compaction periodically on a daemon thread until close()."""
+        if self._compaction_stop is not None:
+            return
+        stop = threading.Event()
+        self._compaction_stop = stop
+
+        # Write-through savers (flush_interval <= 0) flush on every put, so the
+        # thread only has compaction to do
+        wait = interval if self.flush_interval <= 0 else min(self.flush_interval, interval)
+        wait = max(wait, _MIN_MAINTENANCE_WAIT)
+
+        def _loop() -> None:
+            while not stop.wait(wait):
+                try:
+                    self.flush()
+                    if time.monotonic() - last_compaction[0] >= interval:
+                        self.compact()
+                        last_compaction[0] = time.monotonic()
+                except Exception as e:
+                    logger.warning(f"Checkpoint maintenance failed: {e}")
+
+        last_compaction = [time.monotonic()]
+        threading.Thread(target=_loop, name="checkpoint-compaction", daemon=True).start()
+
+    def close(self) -> None:
+        """Stop the maintenance thread and flush everything to disk."""
+        if self._compaction_stop is not None:
+            self._compaction_stop.set()
+            self._compaction_stop = None
+        self.flush()
+        with self._lock:
+            self._conn.close()
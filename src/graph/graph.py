@@ -1,19 +1,33 @@
+import atexit
+import os
+from pathlib import Path
 
+from langchain_core.messages import AIMessage
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
 
+from src.config.configuration import get_config_path, load_yaml_config
+from src.tools.video_jobs import VideoJob, get_video_scheduler
+from .checkpointer import SHARED_CHECKPOINTS_ENV, SQLiteCheckpointSaver
 from .state import CineBrainState as State
+from .turns import get_thread_turns
 from .nodes import (
     memory_extraction_node,
     router_node,
+    complexity_node,
+    dispatch_node,
     context_injection_node,
     conversation_node,
     video_node,
     audio_node,
     summary_node,
     store_memory_node,
+    context_window_node,
 )
 
+# Per-turn nodes that only need the last user message (or, for context_window,
+# the turns before it), so they can all run at once
+FANOUT_NODES = ("memory_extraction", "router", "complexity", "context_window")
+
 
 def _build_base_graph():
     """Assemble all the nodes and the start/end markers."""
@@ -22,6 +36,9 @@ def _build_base_graph():
     # Define nodes
     g.add_node("memory_extraction", memory_extraction_node)
     g.add_node("router", router_node)
+    g.add_node("complexity", complexity_node)
+    g.add_node("context_window", context_window_node)
+    g.add_node("dispatch", dispatch_node)
     g.add_node("context_injection", context_injection_node)
     g.add_node("conversation", conversation_node)
     g.add_node("video", video_node)
@@ -30,14 +47,17 @@ def _build_base_graph():
     g.add_node("store_memory", store_memory_node)
 
     # Define edges
-    g.add_edge(START, "memory_extraction")
+    # Fan-out: these only depend on the last user message, so they run
+    # concurrently and the turn pays for the slowest one instead of their sum.
+    for node in FANOUT_NODES:
+        g.add_edge(START, node)
 
-    # Memory Extraction decisions
-    g.add_edge("memory_extraction", "router") # Both paths from memory_extraction go to router
+    # Join: dispatch waits for every fan-out node before routing
+    g.add_edge(list(FANOUT_NODES), "dispatch")
 
     # Router decisions
     g.add_conditional_edges(
-        "router",
+        "dispatch",
         lambda state: state["workflow"],
         {
             "conversation": "context_injection",
@@ -73,20 +93,47 @@ def _build_base_graph():
             "_end_": END,
         },
     )
-    # store memory goes back to router to allow for further interaction
-    g.add_edge("store_memory", "router")
+    # store memory ends the turn; the next user message starts a fresh fan-out
+    g.add_edge("store_memory", END)
 
     return g
 
 
+def build_checkpointer() -> SQLiteCheckpointSaver:
+    """
+    Create the SQLite checkpointer described by the CHECKPOINTER section of
+    agents_config.yaml and start its background flush/compaction thread.
+    With CINEBRAIN_SHARED_CHECKPOINTS set, writes are not batched.
+    """
+    conf = load_yaml_config(get_config_path()).get("CHECKPOINTER") or {}
+    path = Path(conf.get("path", ".cache/checkpoints.sqlite"))
+    if not path.is_absolute():
+        path = Path(__file__).parent.parent.parent / path
+    batch_size = int(conf.get("batch_size", 64))
+    flush_interval = float(conf.get("flush_interval_seconds", 1.0))
+    if os.getenv(SHARED_CHECKPOINTS_ENV):
+        # Several server processes share the file: flush every write so each
+        # worker sees the others' turns immediately
+        batch_size, flush_interval = 1, 0.0
+    saver = SQLiteCheckpointSaver(
+        str(path),
+        batch_size=batch_size,
+        flush_interval=flush_interval,
+        keep_last=conf.get("keep_last", 20),
+        idle_ttl=conf.get("idle_ttl_seconds", 7 * 24 * 3600),
+    )
+    saver.start_compaction(float(conf.get("compaction_interval_seconds", 3600)))
+    atexit.register(saver.close)
+    return saver
+
+
 def build_graph_with_memory():
     """
-    Build and compile the graph with a persistent MemorySaver.
+    Build and compile the graph with the persistent SQLite checkpointer.
     All state updates will be checkpointed.
     """
-    memory = MemorySaver()
     base = _build_base_graph()
-    return base.compile(checkpointer=memory)
+    return base.compile(checkpointer=build_checkpointer())
 
 
 def build_graph():
@@ -101,3 +148,23 @@ def build_graph():
 graph = build_graph_with_memory()
 
 
+async def _deliver_video(job: VideoJob) -> None:
+    """
+    Write a finished video job back to every thread waiting for it. The update
+    is applied as store_memory, the last node of a turn, so it schedules no
+    further nodes; the next turn sees video_path and the message. It waits
+    for a turn running on the thread (in any worker) so both land in order.
+    """
+    if job.status == "succeeded" and job.result:
+        update = {
+            "video_path": job.result[0],
+            "messages": [AIMessage(content=f"Your video is ready: {', '.join(job.result)}")],
+        }
+    else:
+        update = {"messages": [AIMessage(content=f"Sorry, the video could not be generated: {job.error}")]}
+    for thread_id in job.thread_ids:
+        async with get_thread_turns().hold(thread_id):
+            await graph.aupdate_state({"configurable": {"thread_id": thread_id}}, update, as_node="store_memory")
+
+
+get_video_scheduler().add_callback(_deliver_video)
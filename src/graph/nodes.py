@@ -1,48 +1,131 @@
 from typing import Literal
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, RemoveMessage
 from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
+from langgraph.graph import END
 from langgraph.types import Command
 from src.llm.llm import get_llm_by_type
 from src.config.logger import logger
 from src.prompts.prompts import apply_prompt_template
 from src.prompts.planner_module import RouterResponse, ComplexityAnalysis, ContextForGeneration, MemoryStorageDecision
+from src.prompts.intent_classifier import classify_route, classify_complexity, get_fast_path_config
 from src.memory.memory_manager import  get_memory_manager
+from src.memory.conversation_window import fold_turn, split_turns
+from src.config.configuration import ChatAgentConfiguration
 from src.graph.state import CineBrainState as State
+from src.graph.streaming import RESPONSE_TAG
 from src.agents.agents import create_agent
 from src.tools.web_tools import get_tools
-from src.tools.text_video import generate_video
+from src.tools.video_jobs import get_video_scheduler
 from src.tools.text_speech import generate_speech
 
 
+def _user_id(config: RunnableConfig) -> str:
+    """The run's long-term memory identity.
+
+    configurable["user_id"] wins; ChatAgentConfiguration (USER_ID env var, then
+    default_user) is only the fallback, so a USER_ID set on the server cannot
+    merge every caller into one identity.
+    """
+    user_id = (config.get("configurable") or {}).get("user_id") if config else None
+    return str(user_id) if user_id else ChatAgentConfiguration.from_runnable_config(config).user_id
+
+
 # --- Node: Memory Extraction ---
-async def memory_extraction_node(state: State) -> Command[Literal["router","_end_"]]:
-    """Extract relevant memory context from the last message and route to router."""
+async def memory_extraction_node(state: State, config: RunnableConfig) -> dict:
+    """Extract relevant memory context from the last message.
+
+    Runs in the classification fan-out alongside the router and complexity nodes.
+    """
     logger.system_info("Running memory_extraction_node")
     if not state["messages"]:
-        return Command(goto="_end_")
-    memory_manager = await get_memory_manager()
+        return {}
+    user_id = _user_id(config)
+    memory_manager = await get_memory_manager(user_id)
     memories = await memory_manager.extract_memory(state["messages"][-1].content)
     if memories:
-        memory_context = memory_manager.format_memories_for_prompt(memories)
-        return Command(update={"memory_context": memory_context}, goto="router")
-    else:
-        return Command(goto="router")
+        return {"memory_context": memory_manager.format_memories_for_prompt(memories)}
+    return {"memory_context": ""}
 
 # --- Node: Router ---
-def router_node(state: State) -> Command[Literal["conversation", "video", "audio", "_end_"]]:
-    """Route to the appropriate workflow based on user input or state."""
+async def router_node(state: State) -> dict:
+    """Classify the last user message into a workflow.
+
+    Runs in the classification fan-out, so it only sees memory context from earlier turns.
+    """
     logger.system_info("Running router_node")
-    llm = get_llm_by_type("basic").with_structured_output(RouterResponse)
-    prompt = apply_prompt_template("ROUTER_PROMPT", state["messages"])
-    response = llm.invoke([HumanMessage(content=prompt)])
+    if not state["messages"]:
+        return {"workflow": "_end_"}
+    user_query = state["messages"][-1].content
+    fast_path = get_fast_path_config()
+    response, confidence = classify_route(user_query)
+    if fast_path["enabled"] and confidence >= fast_path["router_threshold"]:
+        logger.system_info(f"Fast-path route (confidence={confidence:.2f})")
+    else:
+        llm = get_llm_by_type("basic").with_structured_output(RouterResponse)
+        prompt = apply_prompt_template(
+            "router",
+            {"user_query": user_query, "memory_context": state.get("memory_context", "")},
+        )
+        response = await llm.ainvoke(prompt)
     if response.conversation:
-        return Command(goto="conversation")
+        workflow = "conversation"
     elif response.video:
-        return Command(goto="video")
+        workflow = "video"
     elif response.audio:
-        return Command(goto="audio")
+        workflow = "audio"
+    else:
+        workflow = "_end_"
+    return {"workflow": workflow}
+
+# --- Node: Complexity ---
+async def complexity_node(state: State) -> dict:
+    """Assess whether the last user message needs the ReAct agent.
+
+    Runs in the classification fan-out; the result is read by conversation_node.
+    """
+    logger.system_info("Running complexity_node")
+    if not state["messages"]:
+        return {"is_complex": False, "complexity_reason": ""}
+    user_query = state["messages"][-1].content
+    fast_path = get_fast_path_config()
+    complexity_analysis, confidence = classify_complexity(user_query)
+    if fast_path["enabled"] and confidence >= fast_path["complexity_threshold"]:
+        logger.system_info(f"Fast-path complexity (confidence={confidence:.2f})")
     else:
-        return Command(goto="_end_")
+        complexity_llm = get_llm_by_type("basic").with_structured_output(ComplexityAnalysis)
+        complexity_prompt = apply_prompt_template("complexity_assessment", {"user_query": user_query})
+        complexity_analysis = await complexity_llm.ainvoke(complexity_prompt)
+    return {
+        "is_complex": complexity_analysis.is_complex,
+        "complexity_reason": complexity_analysis.reason,
+    }
+
+# --- Node: Context Window ---
+async def context_window_node(state: State, config: RunnableConfig) -> dict:
+    """Keep the last max_window_turns turns verbatim and fold older ones into conversation_summary.
+
+    Runs in the fan-out. Usually exactly one turn falls out of the window per
+    user message, so the summary is updated incrementally, one turn at a time.
+    """
+    logger.system_info("Running context_window_node")
+    max_turns = ChatAgentConfiguration.from_runnable_config(config).max_window_turns
+    turns = split_turns(state["messages"])
+    overflow = len(turns) - max_turns
+    if max_turns <= 0 or overflow <= 0:
+        return {}
+
+    conversation_summary = state.get("conversation_summary", "")
+    for turn in turns[:overflow]:
+        conversation_summary = await fold_turn(conversation_summary, turn)
+    removed = [RemoveMessage(id=message.id) for turn in turns[:overflow] for message in turn]
+    return {"conversation_summary": conversation_summary, "messages": removed}
+
+# --- Node: Dispatch ---
+def dispatch_node(state: State) -> dict:
+    """Join point for the classification fan-out; routing happens on its outgoing edges."""
+    logger.system_info(f"Running dispatch_node (workflow={state.get('workflow')})")
+    return {}
 
 # --- Node: Context Injection ---
 async def context_injection_node(state: State) -> dict:
@@ -60,40 +143,41 @@ async def context_injection_node(state: State) -> dict:
         "workflow": workflow
     }
     context_prompt = apply_prompt_template("context_injection_generation", context_prompt_vars)
-    generated_context = await context_llm.invoke([HumanMessage(content=context_prompt)])
+    generated_context = await context_llm.ainvoke(context_prompt)
     
-    return {"context_for_generation": generated_context.dict(), "current_activity": generated_context.general_instruction}
+    return {"context_for_generation": generated_context.model_dump(), "current_activity": generated_context.general_instruction}
 
 # --- Node: Conversation ---
-def conversation_node(state: State, config: RunnableConfig) -> Command[Literal["summary"]]:
+async def conversation_node(state: State, config: RunnableConfig) -> Command[Literal["summary"]]:
     """Handle conversation and generate AI response."""
     logger.system_info("Running conversation_node")
     user_query = state["messages"][-1].content
+    # state["messages"] only holds the recent window; older turns live in conversation_summary
+    prompt_vars = {
+        "context_injection_output": state.get("current_activity") or user_query,
+        "conversation_summary": state.get("conversation_summary") or "(none)",
+    }
 
-    # Assess complexity
-    complexity_llm = get_llm_by_type("basic").with_structured_output(ComplexityAnalysis)
-    complexity_prompt = apply_prompt_template("complexity_assessment", {"user_query": user_query})
-    complexity_analysis = complexity_llm.invoke([HumanMessage(content=complexity_prompt)])
-
-    if complexity_analysis.is_complex:
-        logger.system_info(f"Complex query detected: {complexity_analysis.reason}. Using ReAct agent.")
-        agent = create_agent("conversation_react", "tools", get_tools(), "CONVERSATION_PROMPT") # Assuming CONVERSATION_PROMPT can guide ReAct
-        agent_response = agent.invoke(state["messages"])
+    # Complexity was assessed by complexity_node during the classification fan-out
+    if state.get("is_complex"):
+        logger.system_info(f"Complex query detected: {state.get('complexity_reason')}. Using ReAct agent.")
+        agent = create_agent("conversation_react", "tools", get_tools(), "conversation", prompt_vars)
+        agent_result = await agent.ainvoke({"messages": state["messages"]}, config)
+        agent_response = agent_result["messages"][-1]
 
         # Summarize agent's response
-        summary_llm = get_llm_by_type("basic")
+        summary_llm = get_llm_by_type("basic").with_config(tags=[RESPONSE_TAG])
         summary_prompt = apply_prompt_template("agent_summary", {"agent_response": agent_response.content})
-        summary_response = summary_llm.invoke([HumanMessage(content=summary_prompt)])
+        summary_response = await summary_llm.ainvoke(summary_prompt, config)
         response_content = summary_response.content
     else:
         logger.system_info("Simple query. Using basic LLM.")
-        llm = get_llm_by_type("basic")
-        prompt = apply_prompt_template("conversation", state["messages"])
-        llm_response = llm.invoke([HumanMessage(content=prompt)])
+        llm = get_llm_by_type("basic").with_config(tags=[RESPONSE_TAG])
+        prompt = apply_prompt_template("conversation", prompt_vars)
+        llm_response = await llm.ainvoke(prompt + state["messages"], config)
         response_content = llm_response.content
 
-    state["messages"].append(AIMessage(content=response_content))
-    return Command(update={"messages": state["messages"]}, goto="summary")
+    return Command(update={"messages": [AIMessage(content=response_content)]}, goto="summary")
 
 # --- Node: Video ---
 async def video_node(state: State, config: RunnableConfig) -> Command[Literal["summary"]]:
@@ -108,9 +192,18 @@ async def video_node(state: State, config: RunnableConfig) -> Command[Literal["s
     video_prompt = context_for_generation.get("video_prompt", "")
     negative_prompt = context_for_generation.get("negative_prompt", "")
 
-    video_path = await generate_video(video_prompt, negative_prompt)
+    scheduler = get_video_scheduler()
+    # The same shot was generated before: reuse it instead of paying for Veo again
+    cached = scheduler.cached(video_prompt, negative_prompt)
+    if cached:
+        return Command(update={"video_path": cached[0]}, goto="summary")
+
+    # Veo takes minutes: queue the job and finish the turn; the scheduler writes
+    # video_path back to this thread when the video is ready
+    thread_id = config.get("configurable", {}).get("thread_id")
+    job_id = await scheduler.submit(video_prompt, negative_prompt, thread_id=thread_id)
     
-    return Command(update={"video_path": video_path}, goto="summary")
+    return Command(update={"video_job_id": job_id, "video_path": None}, goto="summary")
 
 # --- Node: Audio ---
 async def audio_node(state: State, config: RunnableConfig) -> Command[Literal["summary"]]:
@@ -124,53 +217,73 @@ async def audio_node(state: State, config: RunnableConfig) -> Command[Literal["s
 
     audio_dialogue = context_for_generation.get("audio_dialogue", "")
 
-    audio_path = await generate_speech(audio_dialogue)
+    # Forward each synthesized chunk to stream_mode="custom" consumers for progressive playback
+    writer = get_stream_writer()
+    audio_path = await generate_speech(
+        audio_dialogue,
+        on_chunk=lambda index, payload: writer({"audio_chunk": payload, "index": index}),
+    )
     
     return Command(update={"audio_path": audio_path}, goto="summary")
 
 # --- Node: Summary ---
-async def summary_node(state: State, config: RunnableConfig) -> Command[Literal["store_memory", "_end_"]]:
+async def summary_node(state: State, config: RunnableConfig) -> Command[Literal["store_memory", "__end__"]]:
     """Summarize the conversation so far, including generated media if available."""
     logger.system_info("Running summary_node")
     
     video_path = state.get("video_path")
+    video_job_id = state.get("video_job_id")
     audio_path = state.get("audio_path")
     summary_content = ""
 
-    if video_path:
+    # Videos finish after their turn has ended, so only report one on a video turn
+    if state.get("workflow") == "video" and video_path:
         summary_content = f"A video was generated and saved at: {video_path}."
+    elif state.get("workflow") == "video" and video_job_id:
+        summary_content = f"A video was queued for generation (job {video_job_id})."
     elif audio_path:
         summary_content = f"An audio snippet was generated and saved at: {audio_path}."
     else:
-        # Original conversation summary logic
-        agent = create_agent("summary", "basic", get_tools(), "SUMMARY_PROMPT")
-        response = await agent.invoke(state["messages"])
+        # Summarize only the latest exchange; earlier turns were summarized on their own turn
+        last_turn = split_turns(state["messages"])[-1]
+        summary_llm = get_llm_by_type("basic")
+        summary_prompt = apply_prompt_template(
+            "summary",
+            {
+                "workflow": state.get("workflow", "conversation"),
+                "user_query": last_turn[0].content,
+                "ai_response": last_turn[-1].content if len(last_turn) > 1 else "",
+            },
+        )
+        response = await summary_llm.ainvoke(summary_prompt, config)
         summary_content = response.content
 
     # Decide whether to store memory
     decision_llm = get_llm_by_type("basic").with_structured_output(MemoryStorageDecision)
     decision_prompt_vars = {"summary": summary_content}
     decision_prompt = apply_prompt_template("memory_storage_decision", decision_prompt_vars)
-    storage_decision = await decision_llm.invoke([HumanMessage(content=decision_prompt)])
+    storage_decision = await decision_llm.ainvoke(decision_prompt)
 
     if storage_decision.should_store:
-        logger.info(f"Storing memory: {storage_decision.reason}")
+        logger.system_info(f"Storing memory: {storage_decision.reason}")
         return Command(update={"summary": summary_content}, goto="store_memory")
     else:
-        logger.info(f"Not storing memory: {storage_decision.reason}")
-        return Command(goto="_end_")
+        logger.system_info(f"Not storing memory: {storage_decision.reason}")
+        return Command(goto=END)
 
 # --- Node: Store Memory ---
-async def store_memory_node(state: State) -> Command[Literal["router"]]:
+async def store_memory_node(state: State, config: RunnableConfig) -> Command[Literal["__end__"]]:
     """Store the summary or important information in memory."""
     logger.system_info("Running store_memory_node")
     summary = state.get("summary", "")
 
     if summary:
-        memory_manager = await get_memory_manager()
-        await memory_manager.add_to_memory([{"role": "assistant", "content": summary}])
-        logger.info(f"Stored summary: {summary}")
+        user_id = _user_id(config)
+        memory_manager = await get_memory_manager(user_id)
+        # Write-behind: the turn doesn't wait for Mem0
+        memory_manager.queue_memory([{"role": "assistant", "content": summary}])
+        logger.system_info(f"Queued summary for storage: {summary}")
     else:
         logger.warning("No summary found to store in memory.")
         
-    return Command(goto="router")
+    return Command(goto=END)
@@ -9,14 +9,28 @@ class CineBrainState(MessagesState):
     Attributes:
         last_message (AnyMessage): The most recent message in the conversation, can be any valid
             LangChain message type (HumanMessage, AIMessage, etc.)
-        workflow (str): The current workflow the AI Companion is in. Can be "conversation", "image", or "video".
+        workflow (str): The current workflow the AI Companion is in. Can be "conversation", "video", "audio" or "_end_".
         video_path (str): The path to the video file to be used for speech-to-text conversion.
+        video_job_id (str): The id of the most recent video job queued for this thread.
         image_path (str): The path to the image file to be used for speech-to-text conversion.
+        audio_path (str): The path to the generated speech audio file.
         memory_context (str): The context of the memories to be injected into the character card.
+        context_for_generation (dict): Structured ContextForGeneration produced by context injection.
+        current_activity (str): The general instruction produced by context injection.
+        conversation_summary (str): Running summary of turns that fell out of the message window.
+        is_complex (bool): Whether the last user message needs the ReAct agent.
+        complexity_reason (str): Why the complexity assessment reached its verdict.
     """
 
     summary: str
-    workflow: Literal["conversation", "image", "video"]
+    workflow: Literal["conversation", "video", "audio", "_end_"]
     video_path: Optional[str] = None
+    video_job_id: Optional[str] = None
     image_path: Optional[str] = None
-    memory_context: str
\ No newline at end of file
+    audio_path: Optional[str] = None
+    memory_context: str
+    context_for_generation: dict
+    current_activity: Optional[str]
+    conversation_summary: str
+    is_complex: bool
+    complexity_reason: str
\ No newline at end of file
@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Literal, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.runnables import RunnableConfig
+
+# Tag carried by the LLM calls whose output is the user-visible reply.
+# Other calls (classifiers, ReAct steps, summaries) are not streamed to the UI.
+RESPONSE_TAG = "cinebrain:response"
+
+
+@dataclass
+class StreamEvent:
+    """
+    One event of a streamed turn.
+
+    kind:
+        "token": data is a text fragment of the reply.
+        "node": data is the name of a node that just finished.
+        "audio": data is a complete WAV segment of generated speech; segments
+            arrive in playback order while later ones are still synthesizing.
+        "final": data is the full reply text (None if the graph produced none).
+    """
+    kind: Literal["token", "node", "audio", "final"]
+    data: Any
+
+
+def _last_ai_content(update: Any) -> Optional[str]:
+    if not isinstance(update, dict):
+        return None
+    for message in reversed(update.get("messages") or []):
+        if isinstance(message, AIMessage):
+            return message.content
+    return None
+
+
+async def astream_turn(graph, user_input: str, config: Optional[RunnableConfig] = None) -> AsyncIterator[StreamEvent]:
+    """
+    Run one user turn through the graph, yielding reply tokens as the LLM
+    produces them, speech segments as the audio node synthesizes them, and
+    node names as nodes complete.
+
+    A "final" event is always emitted last, so callers that miss tokens (e.g.
+    on a response-cache hit, which does not stream) still get the reply.
+    """
+    final_content: Optional[str] = None
+    async for mode, chunk in graph.astream(
+        {"messages": [HumanMessage(content=user_input)]},
+        config,
+        stream_mode=["messages", "updates", "custom"],
+    ):
+        if mode == "messages":
+            message, metadata = chunk
+            if (
+                isinstance(message, AIMessageChunk)
+                and message.content
+                and RESPONSE_TAG in (metadata.get("tags") or [])
+            ):
+                yield StreamEvent("token", message.content)
+        elif mode == "custom":
+            if isinstance(chunk, dict) and "audio_chunk" in chunk:
+                yield StreamEvent("audio", chunk["audio_chunk"])
+        elif mode == "updates":
+            for node, update in chunk.items():
+                content = _last_ai_content(update)
+                if content is not None:
+                    final_content = content
+                yield StreamEvent("node", node)
+    yield StreamEvent("final", final_content)
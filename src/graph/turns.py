@@ -0,0 +1,170 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Set
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+from .checkpointer import SHARED_CHECKPOINTS_ENV
+
+
+class ThreadLocks:
+    """
+    Lock rows in a SQLite file shared by several processes, so a thread is
+    claimed by one of them at a time even when a load balancer sends its
+    requests to different API workers.
+
+    A row is held for `lease` seconds and renewed while in use; rows left by
+    a process that died expire with their lease.
+    """
+
+    def __init__(self, path: str, lease: float = 60.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease = lease
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS thread_locks (
+                thread_id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def acquire(self, thread_id: str) -> bool:
+        """Take thread_id's row unless another owner holds an unexpired one."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO thread_locks (thread_id, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (thread_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE thread_locks.expires_at < ?
+                """,
+                (thread_id, self.owner, now + self.lease, now),
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def renew(self, thread_ids: List[str]) -> None:
+        expires_at = time.time() + self.lease
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE thread_locks SET expires_at = ? WHERE thread_id = ? AND owner = ?",
+                [(expires_at, thread_id, self.owner) for thread_id in thread_ids],
+            )
+            self._conn.commit()
+
+    def release(self, thread_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM thread_locks WHERE thread_id = ? AND owner = ?", (thread_id, self.owner))
+            self._conn.commit()
+
+
+class ThreadTurns:
+    """
+    Claims on conversation threads, so one writer at a time updates a thread.
+
+    A turn and an out-of-band update of the same thread (a finished video job
+    delivering its result) both write a checkpoint on top of the thread's
+    latest one; running them at once forks the thread and one side's messages
+    are lost. Interfaces claim the thread for each turn and the video callback
+    claims it before updating the state.
+
+    begin() claims a thread or reports it busy (the API answers 409); hold()
+    waits for it, checking every poll_interval seconds. With `locks`, claims
+    also exclude the other processes sharing the lock file.
+    """
+
+    def __init__(self, locks: Optional[ThreadLocks] = None, poll_interval: float = 0.2):
+        self.locks = locks
+        self.poll_interval = poll_interval
+        self._held: Set[str] = set()
+        self._renewer: Optional[asyncio.Task] = None
+
+    async def begin(self, thread_id: str) -> bool:
+        """Claim thread_id; False if this or another process already holds it."""
+        if thread_id in self._held:
+            return False
+        self._held.add(thread_id)
+        if self.locks is None:
+            return True
+        try:
+            claimed = await asyncio.to_thread(self.locks.acquire, thread_id)
+        except BaseException:
+            self._held.discard(thread_id)
+            raise
+        if not claimed:
+            self._held.discard(thread_id)
+            return False
+        if self._renewer is None or self._renewer.done():
+            self._renewer = asyncio.create_task(self._renew_locks())
+        return True
+
+    async def end(self, thread_id: str) -> None:
+        try:
+            if self.locks is not None:
+                await asyncio.to_thread(self.locks.release, thread_id)
+        finally:
+            # Only after the row is gone, so a new claim here never races the delete
+            self._held.discard(thread_id)
+
+    def abandon(self, thread_id: str) -> None:
+        """end() for error paths that must not await (e.g. while being cancelled)."""
+        try:
+            if self.locks is not None:
+                self.locks.release(thread_id)
+        finally:
+            self._held.discard(thread_id)
+
+    @asynccontextmanager
+    async def hold(self, thread_id: str) -> AsyncIterator[None]:
+        """Wait until thread_id can be claimed and keep it for the block."""
+        while not await self.begin(thread_id):
+            await asyncio.sleep(self.poll_interval)
+        try:
+            yield
+        finally:
+            await self.end(thread_id)
+
+    async def _renew_locks(self) -> None:
+        """Extend the lock rows of this process's threads until it holds none."""
+        while self._held:
+            await asyncio.sleep(self.locks.lease / 3)
+            try:
+                await asyncio.to_thread(self.locks.renew, list(self._held))
+            except sqlite3.Error as e:
+                logger.warning(f"Could not renew thread locks: {e}")
+
+
+_thread_turns: Optional[ThreadTurns] = None
+
+
+def get_thread_turns() -> ThreadTurns:
+    """
+    Process-wide thread claims configured by THREAD_TURNS in agents_config.yaml.
+    Lock rows are only used with CINEBRAIN_SHARED_CHECKPOINTS set, i.e. when
+    several API workers share the checkpoint file.
+    """
+    global _thread_turns
+    if _thread_turns is None:
+        conf = load_yaml_config(get_config_path()).get("THREAD_TURNS") or {}
+        locks = None
+        if os.getenv(SHARED_CHECKPOINTS_ENV):
+            path = Path(conf.get("lock_path", ".cache/thread_locks.sqlite"))
+            if not path.is_absolute():
+                path = Path(__file__).parent.parent.parent / path
+            locks = ThreadLocks(str(path), lease=float(conf.get("lease_seconds", 60)))
+        _thread_turns = ThreadTurns(locks, poll_interval=float(conf.get("poll_interval_seconds", 0.2)))
+    return _thread_turns
@@ -1,7 +1,32 @@
 # app.py
-from chainlit import app
+import chainlit as cl
+
 from src.graph.graph import graph
+from src.graph.streaming import astream_turn
+from src.graph.turns import get_thread_turns
+
+
+@cl.on_message
+async def main(message: cl.Message):
+    # One checkpointer thread per Chainlit session; memories belong to the
+    # authenticated user when there is one, otherwise to the session
+    session = cl.context.session
+    user_id = session.user.identifier if session.user else session.id
+    config = {"configurable": {"thread_id": session.id, "user_id": user_id}}
+    reply = cl.Message(content="")
+    streamed = False
+
+    # Finished video jobs wait for the turn before writing to the thread
+    async with get_thread_turns().hold(session.id):
+        async for event in astream_turn(graph, message.content, config):
+            if event.kind == "token":
+                streamed = True
+                await reply.stream_token(event.data)
+            elif event.kind == "audio":
+                # Send each speech segment as it is synthesized instead of waiting for the whole file
+                segment = cl.Audio(name="speech.wav", content=event.data, mime="audio/wav", auto_play=True)
+                await cl.Message(content="", elements=[segment]).send()
+            elif event.kind == "final" and not streamed and event.data:
+                reply.content = event.data
 
-@app.on_message
-async def main(message: str):
-    await graph.invoke(message)
+    await reply.send()
@@ -0,0 +1,208 @@
+"""
+Run a JSONL file of requests through the graph without the interactive UI.
+
+    python -m src.interfaces.cli.batch requests.jsonl -o results.jsonl --concurrency 8
+
+Each input line is an object with a "message" (or "input"/"prompt") and
+optionally "id", "thread_id" and "user_id". Lines without an id are
+identified by their line number. Results are appended to the output file
+as each request finishes, one JSON line with the reply, the nodes that ran
+and timings. Rerunning with the same output file skips ids it already
+holds, so an interrupted run resumes where it stopped. Requests that share
+a thread_id run one at a time, in file order; all others run concurrently.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Set, TextIO, Tuple
+
+from src.config.logger import logger
+from src.graph.graph import graph
+from src.graph.streaming import astream_turn
+from src.graph.turns import get_thread_turns
+from src.memory.write_queue import get_write_queue
+
+_MESSAGE_KEYS = ("message", "input", "prompt")
+
+
+def read_requests(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line_number, request) lazily; malformed lines come back as {"_error": ...}."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("not a JSON object")
+            except ValueError as e:
+                request = {"_error": f"invalid JSON: {e}"}
+            yield line_number, request
+
+
+def request_id(line_number: int, request: Dict[str, Any]) -> str:
+    return str(request.get("id", f"line-{line_number}"))
+
+
+def completed_ids(path: str, retry_errors: bool = False) -> Set[str]:
+    """Ids already in the output file (successful ones only when retry_errors)."""
+    done: Set[str] = set()
+    if not Path(path).exists():
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash; that request runs again
+                continue
+            if not retry_errors or result.get("status") == "ok":
+                done.add(str(result.get("id")))
+    return done
+
+
+class BatchRunner:
+    """Streams requests through the graph with at most `concurrency` in flight."""
+
+    def __init__(self, output: TextIO, concurrency: int = 8, timeout: Optional[float] = None):
+        self.output = output
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._thread_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.counts = {"ok": 0, "error": 0, "skipped": 0}
+
+    def _write(self, result: Dict[str, Any]) -> None:
+        # One line per result, flushed at once, so a crash loses at most the line being written
+        self.output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.output.flush()
+        self.counts[result["status"]] += 1
+        finished = self.counts["ok"] + self.counts["error"]
+        if finished % 50 == 0:
+            logger.system_info(f"Batch progress: {finished} done ({self.counts['error']} errors)")
+
+    async def _turn(self, message: str, config: dict, result: Dict[str, Any], started: float) -> None:
+        nodes = []
+        async for event in astream_turn(graph, message, config):
+            if event.kind == "token" and result["first_token_seconds"] is None:
+                result["first_token_seconds"] = round(time.monotonic() - started, 3)
+            elif event.kind == "node":
+                nodes.append(event.data)
+            elif event.kind == "final":
+                result["reply"] = event.data
+        result["nodes"] = nodes
+        values = (await graph.aget_state(config)).values or {}
+        for key in ("audio_path", "video_path", "video_job_id"):
+            result[key] = values.get(key)
+
+    async def run_one(self, line_number: int, request: Dict[str, Any]) -> None:
+        rid = request_id(line_number, request)
+        message = next((request[key] for key in _MESSAGE_KEYS if isinstance(request.get(key), str)), None)
+        thread_id = str(request.get("thread_id") or f"batch-{rid}")
+        result: Dict[str, Any] = {
+            "id": rid,
+            "line": line_number,
+            "thread_id": thread_id,
+            "status": "ok",
+            "reply": None,
+            "first_token_seconds": None,
+        }
+        if message is None:
+            result.update(status="error", error=request.get("_error", "no message field"), seconds=0.0)
+            self._write(result)
+            return
+
+        config = {"configurable": {"thread_id": thread_id, "user_id": request.get("user_id") or thread_id}}
+        # Only explicit thread_ids can be shared, so only they need a lock (which keeps file order);
+        # the thread claim keeps finished video jobs from updating the thread mid-turn
+        lock = self._thread_locks[thread_id] if request.get("thread_id") else contextlib.nullcontext()
+        async with lock, get_thread_turns().hold(thread_id):
+            started = time.monotonic()
+            result["started_at"] = time.time()
+            try:
+                await asyncio.wait_for(self._turn(message, config, result, started), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                result.update(status="error", error=f"timed out after {self.timeout}s")
+            except Exception as e:
+                result.update(status="error", error=f"{type(e).__name__}: {e}")
+            result["seconds"] = round(time.monotonic() - started, 3)
+        self._write(result)
+
+    async def run(self, requests: AsyncIterator[Tuple[int, Dict[str, Any]]]) -> None:
+        # The bounded queue keeps the reader only a little ahead of the workers
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker() -> None:
+            while True:
+                item = await queue.get()
+                try:
+                    if item is None:
+                        return
+                    await self.run_one(*item)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            async for item in requests:
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+
+async def _pending(path: str, done: Set[str], runner: BatchRunner) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    for line_number, request in read_requests(path):
+        if request_id(line_number, request) in done:
+            runner.counts["skipped"] += 1
+            continue
+        yield line_number, request
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = 8,
+    timeout: Optional[float] = None,
+    retry_errors: bool = False,
+) -> Dict[str, int]:
+    """Run every request of input_path not yet in output_path; returns ok/error/skipped counts."""
+    done = completed_ids(output_path, retry_errors)
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    started = time.monotonic()
+    with open(output_path, "a", encoding="utf-8") as output:
+        runner = BatchRunner(output, concurrency=concurrency, timeout=timeout)
+        try:
+            await runner.run(_pending(input_path, done, runner))
+        finally:
+            # Memories queued by the turns are written before exiting
+            await get_write_queue().close()
+    elapsed = time.monotonic() - started
+    finished = runner.counts["ok"] + runner.counts["error"]
+    logger.system_info(
+        f"Batch finished: {runner.counts['ok']} ok, {runner.counts['error']} errors, "
+        f"{runner.counts['skipped']} skipped in {elapsed:.1f}s ({finished / elapsed if elapsed else 0:.2f} req/s)"
+    )
+    return runner.counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of requests through CineBrain")
+    parser.add_argument("input", help="JSONL file, one request object per line")
+    parser.add_argument("-o", "--output", help="results JSONL (default: <input>.results.jsonl)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="requests in flight at once")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per request")
+    parser.add_argument("--retry-errors", action="store_true", help="rerun requests whose previous result was an error")
+    args = parser.parse_args()
+    output = args.output or str(Path(args.input).with_suffix(".results.jsonl"))
+    asyncio.run(run_batch(args.input, output, args.concurrency, args.timeout, args.retry_errors))
+
+
+if __name__ == "__main__":
+    main()
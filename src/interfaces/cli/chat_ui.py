@@ -1,4 +1,9 @@
 import asyncio
+import os
+import shutil
+import tempfile
+import uuid
+from typing import List, Optional
 from rich.console import Console
 from rich.panel import Panel
 from rich.live import Live
@@ -6,54 +11,120 @@ from rich.markdown import Markdown
 from rich.text import Text
 
 from src.graph.graph import graph
-from langchain_core.messages import HumanMessage, AIMessage
+from src.graph.streaming import astream_turn
+from src.graph.turns import get_thread_turns
+from src.memory.write_queue import get_write_queue
+from src.tools.video_jobs import VideoJob, get_video_scheduler
 
 console = Console()
 
+# Command-line players tried in order for progressive speech playback
+_PLAYERS = [["afplay"], ["paplay"], ["aplay", "-q"], ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"]]
+
+
+class AudioPlayer:
+    """Plays WAV segments back to back with a system player while later ones are still arriving."""
+
+    def __init__(self):
+        self.command: Optional[List[str]] = next((cmd for cmd in _PLAYERS if shutil.which(cmd[0])), None)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, wav: bytes) -> None:
+        if self.command is None:
+            return
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+            f.write(wav)
+        self._queue.put_nowait(f.name)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._play())
+
+    async def _play(self) -> None:
+        while not self._queue.empty():
+            path = self._queue.get_nowait()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *self.command, path, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+                )
+                await process.wait()
+            finally:
+                os.unlink(path)
+
+    async def wait(self) -> None:
+        """Let queued segments finish playing."""
+        if self._task is not None:
+            await self._task
+
+
+def _response_panel(content: str) -> Panel:
+    return Panel(Markdown(content), title="[bold green]CineBrain[/bold green]", title_align="left", border_style="green")
+
+
 async def chat_ui():
     console.print(Panel("[bold green]Welcome to CineBrain AI Companion![/bold green]", expand=False))
     console.print("[italic]Type 'quit' or 'exit' to end the chat.[/italic]")
+    # One checkpointer thread per CLI session
+    thread_id = str(uuid.uuid4())
+    player = AudioPlayer()
+    videos = get_video_scheduler()
+
+    async def announce_video(job: VideoJob) -> None:
+        if thread_id not in job.thread_ids:
+            return
+        if job.status == "succeeded":
+            console.print(f"[bold green]🎬 Video ready:[/bold green] {', '.join(job.result or [])}")
+        else:
+            console.print(f"[bold red]Video generation failed:[/bold red] {job.error}")
+
+    videos.add_callback(announce_video)
+    # Pick up jobs a previous session left running
+    videos.resume()
 
     while True:
-        user_input = console.input("[bold blue]You:[/bold blue] ").strip()
+        # Read input off the loop so queued video jobs keep polling meanwhile
+        user_input = (await asyncio.to_thread(console.input, "[bold blue]You:[/bold blue] ")).strip()
 
         if user_input.lower() in ["quit", "exit"]:
             console.print("[bold red]Ending chat. Goodbye![/bold red]")
+            await get_write_queue().close()
             break
 
         if not user_input:
             continue
 
         try:
-            # Prepare the initial state with the user's message
-            # The graph expects a list of messages
-            initial_state = {"messages": [HumanMessage(content=user_input)]}
-
-            # Use Live to show thinking process
-            with Live(
-                Text("CineBrain is thinking...", style="italic yellow"),
-                console=console,
-                vert_align="top",
-                refresh_per_second=8
-            ) as live:
-                # Invoke the graph
-                # Assuming the graph returns a state object with a 'messages' key
-                # And the last message in 'messages' is the AI's response
-                response_state = await graph.ainvoke(initial_state)
-                
-                # Extract the last AI message
-                ai_response_message = None
-                if response_state and "messages" in response_state:
-                    for msg in reversed(response_state["messages"]):
-                        if isinstance(msg, AIMessage):
-                            ai_response_message = msg.content
-                            break
-                
-                if ai_response_message:
-                    live.update(Panel(Markdown(ai_response_message), title="[bold green]CineBrain[/bold green]", title_align="left", border_style="green"), refresh=True)
-                else:
-                    live.update(Panel("[italic red]CineBrain did not provide a response.[/italic red]", title="[bold red]Error[/bold red]", title_align="left", border_style="red"), refresh=True)
-                live.stop() # Stop the live display immediately after updating
+            # Stream the reply token by token; the graph keeps running summary
+            # and memory storage after the last token is shown.
+            config = {"configurable": {"thread_id": thread_id}}
+            streamed_text = ""
+            final_text = None
+
+            # Finished video jobs wait for the turn before writing to the thread
+            async with get_thread_turns().hold(thread_id):
+                with Live(
+                    Text("CineBrain is thinking...", style="italic yellow"),
+                    console=console,
+                    vert_align="top",
+                    refresh_per_second=8
+                ) as live:
+                    async for event in astream_turn(graph, user_input, config):
+                        if event.kind == "token":
+                            streamed_text += event.data
+                            live.update(_response_panel(streamed_text))
+                        elif event.kind == "audio":
+                            # Start playback with the first segment; the rest queue behind it
+                            player.enqueue(event.data)
+                            live.update(Text("🔊 Playing speech while the rest is generated...", style="italic yellow"))
+                        elif event.kind == "final":
+                            final_text = event.data
+
+                    ai_response_message = final_text or streamed_text
+                    if ai_response_message:
+                        live.update(_response_panel(ai_response_message), refresh=True)
+                    else:
+                        live.update(Panel("[italic red]CineBrain did not provide a response.[/italic red]", title="[bold red]Error[/bold red]", title_align="left", border_style="red"), refresh=True)
+                    live.stop() # Stop the live display immediately after updating
+            await player.wait()
                 
         except Exception as e:
             console.print(Panel(f"[bold red]An error occurred: {e}[/bold red]", title="[bold red]Error[/bold red]", title_align="left", border_style="red"))
@@ -1 +1,259 @@
 # api_server.py
+import argparse
+import asyncio
+import base64
+import json
+import os
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+from src.graph.graph import SHARED_CHECKPOINTS_ENV, graph
+from src.graph.streaming import StreamEvent, astream_turn
+from src.graph.turns import ThreadTurns, get_thread_turns
+from src.memory.write_queue import get_write_queue
+from src.tools.http_client import get_http_client
+from src.tools.video_jobs import get_video_scheduler
+
+APP_PATH = "src.interfaces.web.api_server:app"
+
+
+class AdmissionController:
+    """
+    Bounds the turns this process runs at once.
+
+    Up to max_concurrent turns run; up to max_queued more wait for a slot (at
+    most queue_timeout seconds). Anything beyond that is refused with 503 and
+    a Retry-After header, so a load balancer can send it elsewhere instead of
+    piling work onto a saturated worker. A thread runs one turn at a time,
+    across all workers: a second concurrent turn on the same thread gets 409.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queued: int = 32,
+        queue_timeout: float = 30.0,
+        turns: Optional[ThreadTurns] = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.turns = turns or get_thread_turns()
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._running = 0
+        self._waiting = 0
+        self.rejected = 0
+
+    def _refuse(self, detail: str) -> HTTPException:
+        self.rejected += 1
+        return HTTPException(status_code=503, detail=detail, headers={"Retry-After": str(max(1, int(self.queue_timeout)))})
+
+    async def acquire(self, thread_id: str) -> None:
+        """Wait for a slot for thread_id; raises HTTPException (409/503) when refused."""
+        if self._slots.locked() and self._waiting >= self.max_queued:
+            raise self._refuse("Server is at capacity")
+        if not await self.turns.begin(thread_id):
+            raise HTTPException(status_code=409, detail=f"Thread {thread_id} already has a turn in progress")
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.turns.abandon(thread_id)
+            raise self._refuse("Timed out waiting for capacity")
+        except BaseException:
+            self.turns.abandon(thread_id)
+            raise
+        finally:
+            self._waiting -= 1
+        self._running += 1
+
+    async def release(self, thread_id: str) -> None:
+        self._running -= 1
+        self._slots.release()
+        await self.turns.end(thread_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": self._running,
+            "waiting": self._waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "rejected": self.rejected,
+        }
+
+
+def _api_conf() -> dict:
+    return load_yaml_config(get_config_path()).get("API_SERVER") or {}
+
+
+def _build_admission() -> AdmissionController:
+    conf = _api_conf()
+    return AdmissionController(
+        max_concurrent=int(conf.get("max_concurrent_runs", 8)),
+        max_queued=int(conf.get("max_queued_runs", 32)),
+        queue_timeout=float(conf.get("queue_timeout_seconds", 30)),
+    )
+
+
+admission = _build_admission()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Video jobs left running by a previous (or crashed) worker continue here
+    get_video_scheduler().resume()
+    logger.system_info(f"CineBrain API worker {os.getpid()} ready")
+    yield
+    await get_write_queue().close()
+    await get_http_client().aclose()
+
+
+app = FastAPI(
+    title="CineBrain API",
+    description="Chat with the CineBrain graph over thread-scoped sessions, with SSE streaming.",
+    version="0.1.0",
+    lifespan=lifespan,
+)
+
+
+class TurnRequest(BaseModel):
+    message: str = Field(..., min_length=1, description="The user's message")
+    user_id: Optional[str] = Field(None, description="Long-term memory identity; defaults to the thread id")
+
+
+class TurnResponse(BaseModel):
+    thread_id: str
+    reply: Optional[str]
+    audio_path: Optional[str] = None
+    video_path: Optional[str] = None
+    video_job_id: Optional[str] = None
+
+
+class ThreadState(BaseModel):
+    thread_id: str
+    messages: List[Dict[str, Any]]
+    audio_path: Optional[str] = None
+    video_path: Optional[str] = None
+    video_job_id: Optional[str] = None
+
+
+def _config(thread_id: str, user_id: Optional[str] = None) -> dict:
+    return {"configurable": {"thread_id": thread_id, "user_id": user_id or thread_id}}
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _event_payload(event: StreamEvent) -> Any:
+    if event.kind == "audio":
+        return {"wav_base64": base64.b64encode(event.data).decode("ascii")}
+    return {"text": event.data} if event.kind in ("token", "final") else {"node": event.data}
+
+
+async def _media_fields(thread_id: str) -> dict:
+    snapshot = await graph.aget_state(_config(thread_id))
+    values = snapshot.values or {}
+    return {key: values.get(key) for key in ("audio_path", "video_path", "video_job_id")}
+
+
+@app.get("/health")
+async def health() -> dict:
+    """Liveness plus this worker's admission counters, for load balancer checks."""
+    return {"status": "ok", "pid": os.getpid(), "admission": admission.stats()}
+
+
+@app.post("/threads", status_code=201)
+async def create_thread() -> dict:
+    """Start a new conversation; pass the returned thread_id to the turn endpoints."""
+    return {"thread_id": str(uuid.uuid4())}
+
+
+@app.get("/threads/{thread_id}", response_model=ThreadState)
+async def get_thread(thread_id: str) -> ThreadState:
+    """The thread's messages and generated media (including videos finished after their turn)."""
+    snapshot = await graph.aget_state(_config(thread_id))
+    values = snapshot.values or {}
+    if not values:
+        raise HTTPException(status_code=404, detail=f"Unknown thread {thread_id}")
+    return ThreadState(
+        thread_id=thread_id,
+        messages=[{"role": message.type, "content": message.content} for message in values.get("messages", [])],
+        audio_path=values.get("audio_path"),
+        video_path=values.get("video_path"),
+        video_job_id=values.get("video_job_id"),
+    )
+
+
+@app.post("/threads/{thread_id}/runs", response_model=TurnResponse)
+async def run_turn(thread_id: str, turn: TurnRequest) -> TurnResponse:
+    """Run one turn and return the full reply once the graph finishes."""
+    await admission.acquire(thread_id)
+    try:
+        reply = None
+        async for event in astream_turn(graph, turn.message, _config(thread_id, turn.user_id)):
+            if event.kind == "final":
+                reply = event.data
+        return TurnResponse(thread_id=thread_id, reply=reply, **await _media_fields(thread_id))
+    finally:
+        await admission.release(thread_id)
+
+
+@app.post("/threads/{thread_id}/runs/stream")
+async def stream_turn(thread_id: str, turn: TurnRequest, request: Request) -> StreamingResponse:
+    """
+    Run one turn as Server-Sent Events: `token` (reply text fragments), `node`
+    (graph progress), `audio` (base64 WAV segments), then `final` and `done`.
+    Disconnecting cancels the turn.
+    """
+    # Admit before the response starts so refusals are real HTTP statuses
+    await admission.acquire(thread_id)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event in astream_turn(graph, turn.message, _config(thread_id, turn.user_id)):
+                if await request.is_disconnected():
+                    logger.warning(f"Client left thread {thread_id} mid-turn; cancelling")
+                    return
+                yield _sse(event.kind, _event_payload(event))
+            yield _sse("done", await _media_fields(thread_id))
+        except Exception as e:
+            logger.warning(f"Streamed turn failed on thread {thread_id}: {e}")
+            yield _sse("error", {"detail": str(e)})
+        finally:
+            await admission.release(thread_id)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def main() -> None:
+    conf = _api_conf()
+    parser = argparse.ArgumentParser(description="Serve the CineBrain API")
+    parser.add_argument("--host", default=conf.get("host", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(conf.get("port", 8000)))
+    parser.add_argument("--workers", type=int, default=int(conf.get("workers", 1)))
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Workers are separate processes on one checkpoint file; they inherit this
+        os.environ[SHARED_CHECKPOINTS_ENV] = "1"
+        uvicorn.run(APP_PATH, host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
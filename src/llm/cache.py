@@ -0,0 +1,252 @@
+import difflib
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from src.config.logger import logger
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# How many recent entries per llm_string the similarity tier scans on a miss.
+_SIMILARITY_SCAN_LIMIT = 200
+
+# Structured output forces one named function (function calling) or sets a
+# response_format; tool binding for the ReAct agent does neither.
+_STRUCTURED_RE = re.compile(
+    r"""['"]tool_choice['"]\s*[,:]\s*\{[^}]*['"]function['"]|['"]response_format['"]\s*[,:]"""
+)
+
+
+def _normalize_tokens(prompt: str) -> List[str]:
+    return _TOKEN_RE.findall(prompt.lower())
+
+
+def _differing_span_similarity(a: Sequence[str], b: Sequence[str]) -> float:
+    """Order-sensitive similarity of the token spans where two prompts differ.
+
+    Prompts rendered from the same template share a long prefix and suffix, so a
+    whole-prompt similarity would match unrelated user queries. Stripping the
+    common prefix/suffix leaves the part that actually came from the user. The
+    spans are compared as sequences, so "a dog chasing a cat" and "a cat
+    chasing a dog" are not near-identical.
+    """
+    start = 0
+    limit = min(len(a), len(b))
+    while start < limit and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < limit - start and a[len(a) - 1 - end] == b[len(b) - 1 - end]:
+        end += 1
+    span_a = a[start:len(a) - end]
+    span_b = b[start:len(b) - end]
+    if not span_a and not span_b:
+        return 1.0
+    return difflib.SequenceMatcher(None, span_a, span_b, autojunk=False).ratio()
+
+
+class SQLiteResponseCache(BaseCache):
+    """
+    Persistent LangChain response cache backed by SQLite.
+
+    Exact tier: keyed on a hash of the llm_string (model, temperature and other
+    invocation params, including bound tools) and the rendered prompt.
+    Similarity tier: optional, only for structured-output calls; returns the
+    entry of a prompt whose user-supplied span is near-identical.
+
+    Entries expire after ttl_seconds and the least recently used ones are
+    evicted once the table holds more than max_entries rows.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: Optional[float] = 86400,
+        max_entries: int = 10000,
+        similarity_threshold: Optional[float] = None,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                llm_hash TEXT NOT NULL,
+                prompt_tokens TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_llm ON llm_responses (llm_hash, last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_access ON llm_responses (last_access)")
+        self._conn.commit()
+        self.counters: Dict[str, int] = {"exact_hits": 0, "similar_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def _hash(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    @staticmethod
+    def _is_structured(llm_string: str) -> bool:
+        """Structured-output calls force a named function or set a response_format."""
+        return _STRUCTURED_RE.search(llm_string) is not None
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        llm_hash = self._hash(llm_string)
+        key = self._hash(llm_string, prompt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and not self._expired(row[1], now):
+                self._conn.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.counters["exact_hits"] += 1
+                return loads(row[0])
+            if row:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._conn.commit()
+
+            if self.similarity_threshold is not None and self._is_structured(llm_string):
+                hit = self._lookup_similar(prompt, llm_hash, now)
+                if hit is not None:
+                    self.counters["similar_hits"] += 1
+                    return hit
+
+            self.counters["misses"] += 1
+            return None
+
+    def _lookup_similar(self, prompt: str, llm_hash: str, now: float) -> Optional[RETURN_VAL_TYPE]:
+        tokens = _normalize_tokens(prompt)
+        rows = self._conn.execute(
+            """
+            SELECT key, prompt_tokens, response, created_at FROM llm_responses
+            WHERE llm_hash = ? ORDER BY last_access DESC LIMIT ?
+            """,
+            (llm_hash, _SIMILARITY_SCAN_LIMIT),
+        ).fetchall()
+        best_key, best_response, best_score = None, None, 0.0
+        for key, prompt_tokens, response, created_at in rows:
+            if self._expired(created_at, now):
+                continue
+            candidate = json.loads(prompt_tokens)
+            # Cheap length filter before the span comparison
+            if abs(len(candidate) - len(tokens)) > max(3, len(tokens) // 10):
+                continue
+            score = _differing_span_similarity(tokens, candidate)
+            if score > best_score:
+                best_key, best_response, best_score = key, response, score
+        if best_key is None or best_score < self.similarity_threshold:
+            return None
+        self._conn.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, best_key))
+        self._conn.commit()
+        return loads(best_response)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        now = time.time()
+        row = (
+            self._hash(llm_string, prompt),
+            self._hash(llm_string),
+            json.dumps(_normalize_tokens(prompt)),
+            dumps(list(return_val)),
+            now,
+            now,
+        )
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_responses
+                (key, llm_hash, prompt_tokens, response, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                row,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop expired rows, then the least recently used rows above max_entries."""
+        if self.ttl_seconds is not None:
+            cur = self._conn.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self.counters["evictions"] += max(cur.rowcount, 0)
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cur = self._conn.execute(
+                """
+                DELETE FROM llm_responses WHERE key IN (
+                    SELECT key FROM llm_responses ORDER BY last_access ASC LIMIT ?
+                )
+                """,
+                (overflow,),
+            )
+            self.counters["evictions"] += max(cur.rowcount, 0)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the current entry count."""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()
+        lookups = self.counters["exact_hits"] + self.counters["similar_hits"] + self.counters["misses"]
+        hits = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": entries,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+_response_cache: Optional[SQLiteResponseCache] = None
+
+
+def get_response_cache(conf: Dict[str, Any]) -> Optional[SQLiteResponseCache]:
+    """
+    Return the process-wide response cache described by the RESPONSE_CACHE
+    section of agents_config.yaml, or None if caching is disabled.
+    """
+    global _response_cache
+    cache_conf = conf.get("RESPONSE_CACHE") or {}
+    if not cache_conf.get("enabled", False):
+        return None
+    if _response_cache is None:
+        path = Path(cache_conf.get("path", ".cache/llm_responses.sqlite"))
+        if not path.is_absolute():
+            path = Path(__file__).parent.parent.parent / path
+        _response_cache = SQLiteResponseCache(
+            str(path),
+            ttl_seconds=cache_conf.get("ttl_seconds", 86400),
+            max_entries=int(cache_conf.get("max_entries", 10000)),
+            similarity_threshold=cache_conf.get("similarity_threshold"),
+        )
+        logger.system_info(f"LLM response cache at {path}")
+    return _response_cache
@@ -1,15 +1,68 @@
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List, Optional
 import os
 
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
 from langchain_groq import ChatGroq
 
 from src.config.configuration import load_yaml_config, LLMType
 from src.config.logger import logger
+from src.llm.cache import get_response_cache
+from src.llm.rate_limit import ModelLimiter, estimate_tokens, get_model_limiter
 # Cache for LLM instances
 _llm_cache: dict[LLMType, ChatGroq] = {}
 
 
+def _config_path() -> str:
+    return str((Path(__file__).parent.parent / "config" / "agents_config.yaml").resolve())
+
+
+class PooledChatGroq(ChatGroq):
+    """
+    ChatGroq whose async API calls go through the shared per-model limiter
+    (concurrency cap + requests/tokens-per-minute buckets).
+
+    Only real API calls are limited: response-cache hits never reach _agenerate.
+    """
+
+    def _limiter(self) -> ModelLimiter:
+        return get_model_limiter(self.model_name, load_yaml_config(_config_path()))
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.streaming:
+            # ChatGroq delegates to _astream, which reserves its own slot
+            return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        async with self._limiter().reserve(estimate_tokens(messages)) as reservation:
+            result = await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            usage = (result.llm_output or {}).get("token_usage") or {}
+            reservation.settle(usage.get("total_tokens"))
+        return result
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        async with self._limiter().reserve(estimate_tokens(messages)) as reservation:
+            total_tokens = None
+            async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                usage = getattr(chunk.message, "usage_metadata", None)
+                if usage:
+                    total_tokens = usage.get("total_tokens")
+                yield chunk
+            reservation.settle(total_tokens)
+
+
 def _get_env_llm_conf(llm_type: str) -> Dict[str, Any]:
     """
     Get LLM configuration from environment variables.
@@ -46,7 +99,12 @@ def _create_llm_use_conf(llm_type: LLMType, conf: Dict[str, Any]) -> ChatGroq:
     
     logger.system_info(f"Creating LLM with conf: {merged_conf}")
 
-    return ChatGroq(**merged_conf)
+    # Shared SQLite response cache; None leaves caching off for this model
+    response_cache = get_response_cache(conf)
+    if response_cache is not None:
+        merged_conf.setdefault("cache", response_cache)
+
+    return PooledChatGroq(**merged_conf)
 
 
 def get_llm_by_type(
@@ -58,8 +116,7 @@ def get_llm_by_type(
     if llm_type in _llm_cache:
         return _llm_cache[llm_type]
 
-    config_path = Path(__file__).parent.parent / "config" / "agents_config.yaml"
-    conf = load_yaml_config(str(config_path.resolve()))
+    conf = load_yaml_config(_config_path())
     llm = _create_llm_use_conf(llm_type, conf)
     _llm_cache[llm_type] = llm
     return llm
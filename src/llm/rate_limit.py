@@ -0,0 +1,106 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+from langchain_core.messages import BaseMessage
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at `per_minute / 60` units per second.
+
+    Waiters are served in arrival order. The balance may go negative when a
+    caller settles more than it reserved; later callers then wait off the debt.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # Requests larger than the bucket wait for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def settle(self, amount: float) -> None:
+        """Charge (or refund, if negative) `amount` without waiting."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class Reservation:
+    """Handle returned by ModelLimiter.reserve to correct the token estimate."""
+
+    def __init__(self, limiter: "ModelLimiter", estimated_tokens: int):
+        self._limiter = limiter
+        self.estimated_tokens = estimated_tokens
+
+    def settle(self, actual_tokens: Optional[int]) -> None:
+        if actual_tokens is None or self._limiter.tokens is None:
+            return
+        self._limiter.tokens.settle(actual_tokens - self.estimated_tokens)
+
+
+class ModelLimiter:
+    """Concurrency cap plus requests/tokens-per-minute buckets for one model."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    @asynccontextmanager
+    async def reserve(self, estimated_tokens: int) -> AsyncIterator[Reservation]:
+        if self.semaphore is not None:
+            await self.semaphore.acquire()
+        try:
+            if self.requests is not None:
+                await self.requests.acquire(1)
+            if self.tokens is not None:
+                await self.tokens.acquire(estimated_tokens)
+            yield Reservation(self, estimated_tokens)
+        finally:
+            if self.semaphore is not None:
+                self.semaphore.release()
+
+
+def estimate_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Rough prompt size (~4 characters per token); settled against real usage later."""
+    return sum(len(str(message.content)) for message in messages) // 4 + 1
+
+
+_model_limiters: Dict[str, ModelLimiter] = {}
+
+
+def get_model_limiter(model_name: str, conf: Dict[str, Any]) -> ModelLimiter:
+    """
+    Get the shared limiter for a model from the RATE_LIMITS section of
+    agents_config.yaml. Models without an entry are not limited.
+    """
+    if model_name not in _model_limiters:
+        limits = (conf.get("RATE_LIMITS") or {}).get(model_name) or {}
+        _model_limiters[model_name] = ModelLimiter(
+            max_concurrency=limits.get("max_concurrency"),
+            requests_per_minute=limits.get("requests_per_minute"),
+            tokens_per_minute=limits.get("tokens_per_minute"),
+        )
+    return _model_limiters[model_name]
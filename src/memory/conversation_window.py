@@ -0,0 +1,44 @@
+from typing import List, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from src.config.logger import logger
+from src.llm.llm import get_llm_by_type
+from src.prompts.prompts import apply_prompt_template
+
+
+def split_turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into turns, each starting at a HumanMessage."""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def format_turn(turn: Sequence[BaseMessage]) -> str:
+    """Render a turn as 'role: content' lines for the summary prompt."""
+    lines = []
+    for message in turn:
+        role = "User" if isinstance(message, HumanMessage) else "CineBrain"
+        lines.append(f"{role}: {message.content}")
+    return "\n".join(lines)
+
+
+async def fold_turn(conversation_summary: str, turn: Sequence[BaseMessage]) -> str:
+    """
+    Fold one turn into the running conversation summary.
+
+    Only the previous summary and the single turn are sent, so the cost of an
+    update doesn't grow with the length of the session.
+    """
+    llm = get_llm_by_type("basic")
+    prompt = apply_prompt_template(
+        "conversation_summary_update",
+        {"conversation_summary": conversation_summary or "(empty)", "turn": format_turn(turn)},
+    )
+    response = await llm.ainvoke(prompt)
+    logger.system_info("Folded one turn into the running conversation summary")
+    return response.content.strip()
@@ -9,16 +9,24 @@ from mem0 import AsyncMemoryClient
 
 
 
-client = AsyncMemoryClient(api_key=settings.MEMO_API_KEY)
+_client: AsyncMemoryClient | None = None
 
 
+def get_client() -> AsyncMemoryClient:
+    """Process-wide Mem0 client, created on first use: building it contacts the
+    Mem0 API, so importing this module must not."""
+    global _client
+    if _client is None:
+        _client = AsyncMemoryClient(api_key=settings.MEMO_API_KEY)
+    return _client
+
 
 async def add_to_memory(messages: list[dict], user_id: str) -> str:
     """
     Add a list of messages to the memory.   
     """
     logger.system_info(f"Adding messages to Mem0: {messages}")  # Debug print
-    await client.add(messages, user_id=user_id, output_format='v1.1')
+    await get_client().add(messages, user_id=user_id, output_format='v1.1')
     return f"Stored messages for {user_id}"
 
 async def search_memory(query: str, user_id: str) -> list[str]:
@@ -30,5 +38,26 @@ async def search_memory(query: str, user_id: str) -> list[str]:
    ]
 }
 
-    all_memories = await client.get_all(version="v2", filters=filters, page=1, page_size=50)
+    all_memories = await get_client().get_all(version="v2", filters=filters, page=1, page_size=50)
     return all_memories
+
+async def fetch_memories(user_id: str, updated_since: str | None = None, page_size: int = 100) -> list[dict]:
+    """
+    Fetch every memory of a user, or only those updated at/after `updated_since`
+    (an ISO timestamp) for incremental refreshes.
+    """
+    conditions = [{"user_id": user_id}]
+    if updated_since:
+        conditions.append({"updated_at": {"gte": updated_since}})
+    filters = {"AND": conditions}
+
+    memories: list[dict] = []
+    page = 1
+    while True:
+        response = await get_client().get_all(version="v2", filters=filters, page=page, page_size=page_size)
+        results = response.get("results", []) if isinstance(response, dict) else response
+        memories.extend(results)
+        has_next = isinstance(response, dict) and response.get("next")
+        if not has_next or len(results) < page_size:
+            return memories
+        page += 1
@@ -1,12 +1,17 @@
+import asyncio
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
 
+from src.config.configuration import get_config_path, load_yaml_config
 from src.config.logger import logger
 from src.config.settings import settings
-from src.memory.memo_memory import add_to_memory, search_memory  # Updated import for memory tools
+from src.memory.memo_memory import add_to_memory  # Updated import for memory tools
+from src.memory.memory_snapshot import get_snapshot_store
+from src.memory.write_queue import get_write_queue
 from src.prompts.prompts import apply_prompt_template
 from src.llm.llm import get_llm_by_type
 
@@ -16,27 +21,59 @@ class MemoryAnalysis(BaseModel):
     is_important: bool = Field(..., description="Should this be stored in long-term memory?")
     formatted_memory: Optional[str] = Field(None, description="Formatted memory to store")
 
-_memory_manager_instance: Optional['MemoryManager'] = None
+_analysis_llm = None
+
+
+def _get_analysis_llm():
+    """Structured-output LLM shared by every MemoryManager."""
+    global _analysis_llm
+    if _analysis_llm is None:
+        _analysis_llm = get_llm_by_type("basic").with_structured_output(MemoryAnalysis)
+    return _analysis_llm
 
 class MemoryManager:
     """
     Memory manager for extracting and (optionally) storing long-term memory.
     Now split into extract_memory (for context) and store_memory (for persistence).
     """
-    def __init__(self, user_id: str = "default_user"):
+    def __init__(self, user_id: str = "default_user", max_results: int = 10):
         self.user_id = user_id
-        self.llm = get_llm_by_type("basic").with_structured_output(MemoryAnalysis)
+        self.max_results = max_results
+        self.llm = _get_analysis_llm()
+        # Local copy of this user's memories; searched in-process instead of re-downloading
+        self.snapshot = get_snapshot_store().get(user_id)
+        # Serializes this user's Mem0 traffic (snapshot refresh and direct writes);
+        # concurrent identical lookups share one task
+        self.lock = asyncio.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
 
-    def analyze_memory(self, user_query: str) -> MemoryAnalysis:
+    async def analyze_memory(self, user_query: str) -> MemoryAnalysis:
         prompt = apply_prompt_template("memory_extraction", {"user_query": user_query})
-        return self.llm.invoke(prompt)
+        return await self.llm.ainvoke(prompt)
 
     async def extract_memory(self, user_query: str) -> str:
         """
         Analyze the user query. If important, search for relevant memory and return it as context.
         If not important or not found, return an empty string.
+
+        Concurrent calls for the same query (e.g. a double-submitted turn) await
+        the first call instead of repeating the LLM analysis.
         """
-        analysis = self.analyze_memory(user_query)
+        inflight = self._inflight.get(user_query)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        future = asyncio.ensure_future(self._extract_memory(user_query))
+        self._inflight[user_query] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._inflight.pop(user_query, None)
+            else:
+                future.add_done_callback(lambda _: self._inflight.pop(user_query, None))
+
+    async def _extract_memory(self, user_query: str) -> str:
+        analysis = await self.analyze_memory(user_query)
         if not analysis.is_important:
             return ""
 
@@ -44,16 +81,24 @@ class MemoryManager:
             logger.warning(f"LLM indicated importance but provided no formatted_memory or empty string for query: {user_query}")
             return ""
 
-        memories_response = await search_memory(analysis.formatted_memory, self.user_id)
-        memories = memories_response.get("results", [])
-        return memories
+        async with self.lock:
+            await self.snapshot.refresh()
+            return self.snapshot.search(analysis.formatted_memory, limit=self.max_results)
     
     async def add_to_memory(self, memories: str) -> None:
         """
         Store the memory if it's important and not already present.
         """
-        await add_to_memory(memories, self.user_id)
+        async with self.lock:
+            await add_to_memory(memories, self.user_id)
+            self.snapshot.invalidate()
         return f" Stored memory for {self.user_id}"
+
+    def queue_memory(self, memories: list[dict]) -> None:
+        """
+        Hand the memory to the write-behind queue; it is sent to Mem0 in the background.
+        """
+        get_write_queue().enqueue(self.user_id, memories)
     
     
     def format_memories_for_prompt(self, memories: list[dict]) -> str:
@@ -63,8 +108,42 @@ class MemoryManager:
                 memory_context += memory["memory"] + "\n"
         return memory_context
 
+class MemoryManagerRegistry:
+    """
+    LRU of per-user MemoryManagers, bounded by max_users.
+
+    Managers are cheap: the analysis LLM, the Mem0 client and the snapshot
+    store are shared, so evicting one only drops its lock and in-flight map.
+    """
+
+    def __init__(self, max_users: int = 256, max_results: int = 10):
+        self.max_users = max_users
+        self.max_results = max_results
+        self._managers: "OrderedDict[str, MemoryManager]" = OrderedDict()
+
+    def get(self, user_id: str) -> MemoryManager:
+        manager = self._managers.get(user_id)
+        if manager is None:
+            manager = MemoryManager(user_id, max_results=self.max_results)
+            self._managers[user_id] = manager
+            while len(self._managers) > self.max_users:
+                evicted, _ = self._managers.popitem(last=False)
+                logger.system_info(f"Evicted memory manager for {evicted}")
+        else:
+            self._managers.move_to_end(user_id)
+        return manager
+
+
+_registry: Optional[MemoryManagerRegistry] = None
+
+
 async def get_memory_manager(user_id: str = "default_user") -> MemoryManager:
-    global _memory_manager_instance
-    if _memory_manager_instance is None:
-        _memory_manager_instance = MemoryManager(user_id)
-    return _memory_manager_instance
+    """Return the manager for user_id from the registry configured by MEMORY_MANAGERS."""
+    global _registry
+    if _registry is None:
+        conf = load_yaml_config(get_config_path()).get("MEMORY_MANAGERS") or {}
+        _registry = MemoryManagerRegistry(
+            max_users=int(conf.get("max_users", 256)),
+            max_results=int(conf.get("max_results", 10)),
+        )
+    return _registry.get(user_id)
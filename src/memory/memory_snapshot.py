@@ -0,0 +1,148 @@
+import asyncio
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+from src.memory.memo_memory import fetch_memories
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "is", "are",
+    "was", "were", "it", "this", "that", "my", "me", "i", "you", "we", "about", "what",
+}
+
+
+def _tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+class MemorySnapshot:
+    """
+    In-process copy of one user's Mem0 memories.
+
+    refresh() only pulls records updated since the newest one already held,
+    and does nothing if the last sync is younger than refresh_interval. A full
+    resync every full_resync_interval picks up deletions, which an
+    updated_at filter cannot see.
+    """
+
+    def __init__(self, user_id: str, refresh_interval: float = 30.0, full_resync_interval: float = 600.0):
+        self.user_id = user_id
+        self.refresh_interval = refresh_interval
+        self.full_resync_interval = full_resync_interval
+        self.records: Dict[str, dict] = {}
+        self._newest: Optional[datetime] = None
+        self._newest_raw: Optional[str] = None
+        self._last_sync: Optional[float] = None
+        self._last_full_sync: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Force the next refresh() to hit Mem0, e.g. after this process added a memory."""
+        self._last_sync = None
+
+    def _merge(self, memories: List[dict]) -> None:
+        for memory in memories:
+            key = memory.get("id") or memory.get("memory")
+            if key is None:
+                continue
+            self.records[key] = memory
+            stamp = memory.get("updated_at") or memory.get("created_at")
+            parsed = _parse_timestamp(stamp)
+            if parsed is not None and (self._newest is None or parsed > self._newest):
+                self._newest, self._newest_raw = parsed, stamp
+
+    async def refresh(self) -> None:
+        now = time.monotonic()
+        if self._last_sync is not None and now - self._last_sync < self.refresh_interval:
+            return
+        async with self._lock:
+            # Another coroutine may have refreshed while we waited for the lock
+            now = time.monotonic()
+            if self._last_sync is not None and now - self._last_sync < self.refresh_interval:
+                return
+            full = self._last_full_sync is None or now - self._last_full_sync >= self.full_resync_interval
+            if full:
+                memories = await fetch_memories(self.user_id)
+                self.records.clear()
+                self._newest = self._newest_raw = None
+                self._last_full_sync = now
+            else:
+                memories = await fetch_memories(self.user_id, updated_since=self._newest_raw)
+            self._merge(memories)
+            self._last_sync = now
+            logger.system_info(
+                f"Memory snapshot for {self.user_id}: {'full' if full else 'incremental'} sync, "
+                f"{len(memories)} fetched, {len(self.records)} held"
+            )
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """Rank held memories against the query with TF-IDF weighted term overlap."""
+        query_terms = set(_tokenize(query))
+        if not query_terms or not self.records:
+            return []
+        docs = [(memory, Counter(_tokenize(memory.get("memory", "")))) for memory in self.records.values()]
+        n_docs = len(docs)
+        doc_freq = Counter(term for _, terms in docs for term in set(terms) & query_terms)
+        scored = []
+        for memory, terms in docs:
+            score = sum(
+                (1 + math.log(terms[term])) * math.log(1 + n_docs / doc_freq[term])
+                for term in query_terms
+                if terms.get(term)
+            )
+            if score > 0:
+                scored.append((score, memory))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [memory for _, memory in scored[:limit]]
+
+
+class MemorySnapshotStore:
+    """LRU of per-user snapshots, bounded by max_users."""
+
+    def __init__(self, max_users: int = 256, refresh_interval: float = 30.0, full_resync_interval: float = 600.0):
+        self.max_users = max_users
+        self.refresh_interval = refresh_interval
+        self.full_resync_interval = full_resync_interval
+        self._snapshots: "OrderedDict[str, MemorySnapshot]" = OrderedDict()
+
+    def get(self, user_id: str) -> MemorySnapshot:
+        snapshot = self._snapshots.get(user_id)
+        if snapshot is None:
+            snapshot = MemorySnapshot(user_id, self.refresh_interval, self.full_resync_interval)
+            self._snapshots[user_id] = snapshot
+            while len(self._snapshots) > self.max_users:
+                self._snapshots.popitem(last=False)
+        else:
+            self._snapshots.move_to_end(user_id)
+        return snapshot
+
+
+_snapshot_store: Optional[MemorySnapshotStore] = None
+
+
+def get_snapshot_store() -> MemorySnapshotStore:
+    """Process-wide snapshot store configured by MEMORY_SNAPSHOT in agents_config.yaml."""
+    global _snapshot_store
+    if _snapshot_store is None:
+        conf = load_yaml_config(get_config_path()).get("MEMORY_SNAPSHOT") or {}
+        _snapshot_store = MemorySnapshotStore(
+            max_users=int(conf.get("max_users", 256)),
+            refresh_interval=float(conf.get("refresh_interval_seconds", 30)),
+            full_resync_interval=float(conf.get("full_resync_interval_seconds", 600)),
+        )
+    return _snapshot_store
@@ -0,0 +1,217 @@
+import asyncio
+import atexit
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+from src.memory.memo_memory import add_to_memory
+from src.memory.memory_snapshot import get_snapshot_store
+
+
+class MemoryWriteQueue:
+    """
+    Write-behind queue for long-term memory writes.
+
+    enqueue() returns immediately. A background task coalesces messages per
+    user and sends them as one Mem0 add per user once max_batch messages are
+    pending or the oldest has waited max_delay seconds. Failed sends are
+    retried with exponential backoff.
+
+    Writes that still cannot be delivered, or are pending at interpreter exit,
+    are appended to a JSONL journal and replayed when the queue next starts.
+    """
+
+    def __init__(
+        self,
+        journal_path: str,
+        max_batch: int = 20,
+        max_delay: float = 2.0,
+        max_retries: int = 5,
+        base_backoff: float = 0.5,
+    ):
+        self.journal_path = Path(journal_path)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self._pending: Dict[str, List[dict]] = {}
+        self._first_enqueued: Dict[str, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Batches currently being sent, so an exit mid-send still journals them
+        self._in_flight: Dict[int, tuple] = {}
+        atexit.register(self._spill_pending)
+
+    # --- Producer side -------------------------------------------------------
+
+    def enqueue(self, user_id: str, messages: List[dict]) -> None:
+        """Queue messages for user_id; must be called from a running event loop."""
+        self._pending.setdefault(user_id, []).extend(messages)
+        self._first_enqueued.setdefault(user_id, time.monotonic())
+        self._ensure_worker()
+        if len(self._pending[user_id]) >= self.max_batch:
+            self._wakeup.set()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._replay_journal()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    # --- Worker side ---------------------------------------------------------
+
+    def _next_deadline(self) -> Optional[float]:
+        if not self._first_enqueued:
+            return None
+        return min(self._first_enqueued.values()) + self.max_delay - time.monotonic()
+
+    def _due_users(self, force: bool = False) -> List[str]:
+        now = time.monotonic()
+        return [
+            user_id
+            for user_id, messages in self._pending.items()
+            if force
+            or len(messages) >= self.max_batch
+            or now - self._first_enqueued[user_id] >= self.max_delay
+        ]
+
+    async def _run(self) -> None:
+        while True:
+            timeout = self._next_deadline()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=None if timeout is None else max(timeout, 0))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush(self._due_users())
+
+    async def _flush(self, user_ids: List[str]) -> None:
+        batches = []
+        for user_id in user_ids:
+            batches.append((user_id, self._pending.pop(user_id)))
+            self._first_enqueued.pop(user_id, None)
+        await asyncio.gather(*(self._send(user_id, batch) for user_id, batch in batches))
+
+    async def _send(self, user_id: str, batch: List[dict]) -> None:
+        entry = (user_id, batch)
+        self._in_flight[id(entry)] = entry
+        try:
+            for attempt in range(self.max_retries):
+                try:
+                    await add_to_memory(batch, user_id)
+                    get_snapshot_store().get(user_id).invalidate()
+                    return
+                except Exception as e:
+                    delay = self.base_backoff * (2 ** attempt) * (1 + random.random())
+                    logger.warning(f"Memory write for {user_id} failed (attempt {attempt + 1}): {e}; retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+            logger.warning(f"Giving up on memory write for {user_id}; journaling {len(batch)} messages")
+            self._journal(user_id, batch)
+        except asyncio.CancelledError:
+            # Cancelled by close(): put the batch back so the final flush sends it
+            self._pending[user_id] = batch + self._pending.get(user_id, [])
+            self._first_enqueued.setdefault(user_id, time.monotonic())
+            raise
+        finally:
+            self._in_flight.pop(id(entry), None)
+
+    async def flush_all(self) -> None:
+        """Send everything pending now, regardless of thresholds."""
+        await self._flush(self._due_users(force=True))
+
+    async def close(self) -> None:
+        """Stop the worker and flush all pending writes; call on shutdown."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await self.flush_all()
+
+    # --- Journal -------------------------------------------------------------
+
+    def _journal(self, user_id: str, batch: List[dict]) -> None:
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        line = (json.dumps({"user_id": user_id, "messages": batch}) + "\n").encode("utf-8")
+        # One O_APPEND write per batch, so lines from workers sharing the journal never interleave
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def _spill_pending(self) -> None:
+        """atexit hook: persist anything not yet sent so it survives the restart.
+
+        Batches that were mid-send may be delivered twice; memory writes are
+        at-least-once.
+        """
+        for user_id, batch in [*self._pending.items(), *self._in_flight.values()]:
+            self._journal(user_id, batch)
+        self._pending.clear()
+        self._in_flight.clear()
+        self._first_enqueued.clear()
+
+    def _replay_journal(self) -> None:
+        """Load journaled writes into the queue; never raises into enqueue().
+
+        The journal is first claimed by renaming it to a name private to this
+        process, so when several processes (or a restarted worker) start at
+        once, exactly one of them replays each batch.
+        """
+        claimed = self.journal_path.with_name(f"{self.journal_path.name}.{os.getpid()}.replaying")
+        try:
+            os.replace(self.journal_path, claimed)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Could not claim memory write journal {self.journal_path}: {e}")
+            return
+        replayed = 0
+        try:
+            with open(claimed, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash mid-append
+                        continue
+                    self._pending.setdefault(entry["user_id"], []).extend(entry["messages"])
+                    self._first_enqueued.setdefault(entry["user_id"], time.monotonic())
+                    replayed += 1
+        except OSError as e:
+            logger.warning(f"Could not read memory write journal {claimed}: {e}")
+            return
+        # Replayed batches are pending now; the exit hook journals them again if unsent
+        claimed.unlink(missing_ok=True)
+        logger.system_info(f"Replayed {replayed} journaled memory writes")
+
+
+_write_queue: Optional[MemoryWriteQueue] = None
+
+
+def get_write_queue() -> MemoryWriteQueue:
+    """Process-wide write queue configured by MEMORY_WRITE_QUEUE in agents_config.yaml."""
+    global _write_queue
+    if _write_queue is None:
+        conf = load_yaml_config(get_config_path()).get("MEMORY_WRITE_QUEUE") or {}
+        path = Path(conf.get("journal_path", ".cache/memory_write_journal.jsonl"))
+        if not path.is_absolute():
+            path = Path(__file__).parent.parent.parent / path
+        _write_queue = MemoryWriteQueue(
+            str(path),
+            max_batch=int(conf.get("max_batch", 20)),
+            max_delay=float(conf.get("max_delay_seconds", 2.0)),
+            max_retries=int(conf.get("max_retries", 5)),
+            base_backoff=float(conf.get("base_backoff_seconds", 0.5)),
+        )
+    return _write_queue
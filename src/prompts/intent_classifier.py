@@ -0,0 +1,230 @@
+import math
+import re
+import zlib
+from typing import Dict, List, Sequence, Tuple
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.prompts.planner_module import ComplexityAnalysis, RouterResponse
+
+# ==============================================================================
+# --- FAST-PATH INTENT CLASSIFIER ---                                          #
+# ==============================================================================
+# Keyword rules plus a hashed n-gram linear model that answer the router and
+# complexity questions in-process. Callers fall back to the LLM whenever the
+# returned confidence is below the configured threshold.
+
+N_BUCKETS = 2 ** 12
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+_SMALL_TALK = r"^\s*(hi|hello|hey|thanks|thank you|ok|okay|cool|great|good (morning|evening))( there| cinebrain)?[\s!.?]*$"
+
+# Generate/render verbs and media nouns. A media rule only fires when the noun
+# is the verb's object ("render a short clip of ..."), so writing requests that
+# merely mention a video or a voice do not start a paid generation.
+_MAKE = r"(generate|create|make|render|produce|animate|shoot|film|synthesi[sz]e)"
+_OBJECT = r"(me\s+|us\s+)?((a|an|the|some|this|that|my)\s+)?((?!(of|for|about|with|in|to)\b)[a-z'-]+\s+){0,2}?"
+_VIDEO_NOUN = r"(video|videos|clip|clips|footage|animation)"
+_AUDIO_NOUN = r"(audio|voice ?-?over|voiceover|audio track|narration track)"
+# Narrating or recording is only a speech request when its object is audio;
+# "narrate how the villain escapes" and "record the interview scene" are writing
+_VOICE_NOUN = r"(narration|voice ?-?over|voiceover|audio|voice track|audiobook)"
+
+# Rules are checked in order; the first match wins. Each rule carries its own
+# confidence: explicit requests clear the fallback threshold, keyword hits do
+# not, so the LLM still decides messages that only mention a media word.
+_STRONG_CONFIDENCE = 0.95
+_KEYWORD_CONFIDENCE = 0.6
+
+_ROUTE_RULES: List[Tuple[re.Pattern, str, float]] = [
+    (re.compile(rf"\b{_MAKE}\s+{_OBJECT}{_VIDEO_NOUN}\b"), "video", _STRONG_CONFIDENCE),
+    (re.compile(rf"\b(turn|render|convert)\b.{{0,60}}\b(into|as)\s+(a|an)\s+([a-z-]+\s+)?{_VIDEO_NOUN}\b"), "video", _STRONG_CONFIDENCE),
+    (re.compile(rf"\b{_MAKE}\s+{_OBJECT}{_AUDIO_NOUN}\b"), "audio", _STRONG_CONFIDENCE),
+    (re.compile(rf"\b(narrate|record)\s+{_OBJECT}{_VOICE_NOUN}\b"), "audio", _STRONG_CONFIDENCE),
+    (re.compile(r"\b(read|say|speak|narrate|perform|record)\b.{0,60}\b(aloud|out loud)\b"), "audio", _STRONG_CONFIDENCE),
+    (re.compile(r"^\s*(please\s+)?animate\b"), "video", _STRONG_CONFIDENCE),
+    (re.compile(_SMALL_TALK), "conversation", _STRONG_CONFIDENCE),
+    (re.compile(r"\b(video|clip|footage|trailer|shot|animate)\b"), "video", _KEYWORD_CONFIDENCE),
+    (re.compile(r"\b(audio|voice|voice ?over|speech|narrat(e|ion)|aloud|read out)\b"), "audio", _KEYWORD_CONFIDENCE),
+]
+
+_COMPLEXITY_RULES: List[Tuple[re.Pattern, bool, float]] = [
+    (re.compile(r"\b(box office|opening weekend|imdb|rotten tomatoes|release date)\b"), True, _STRONG_CONFIDENCE),
+    (re.compile(r"\b(search (the web|online|for)|look up|google)\b"), True, _STRONG_CONFIDENCE),
+    (re.compile(_SMALL_TALK), False, _STRONG_CONFIDENCE),
+    (re.compile(r"\b(gross(ed)?|budget|cast of|directed by)\b"), True, _KEYWORD_CONFIDENCE),
+    (re.compile(r"\b(latest|current|recent|this year|upcoming|news|trending|right now|today)\b"), True, _KEYWORD_CONFIDENCE),
+    (re.compile(r"\b(search|find out|compare|research)\b"), True, _KEYWORD_CONFIDENCE),
+]
+
+# Seed examples the linear model is trained on at import time.
+_ROUTE_EXAMPLES: List[Tuple[str, str]] = [
+    ("give me a thriller short film idea", "conversation"),
+    ("help me write dialogue for two estranged sisters", "conversation"),
+    ("what makes a good second act", "conversation"),
+    ("can you punch up this scene", "conversation"),
+    ("rewrite the opening monologue to be funnier", "conversation"),
+    ("is my logline too long", "conversation"),
+    ("brainstorm three twists for a heist movie", "conversation"),
+    ("what do you think of my protagonist", "conversation"),
+    ("summarize the plot of my draft", "conversation"),
+    ("check this outline for plot holes", "conversation"),
+    ("how did chinatown structure its ending", "conversation"),
+    ("suggest a title for a space western", "conversation"),
+    ("tell me about three act structure", "conversation"),
+    ("continue the story from where we left off", "conversation"),
+    ("generate a video of a dragon over a burning city", "video"),
+    ("make a short clip of rain on a neon street", "video"),
+    ("render the opening shot as a video", "video"),
+    ("create footage of a car chase at dusk", "video"),
+    ("animate the storyboard for scene two", "video"),
+    ("show me a cinematic video of the desert at sunrise", "video"),
+    ("turn this scene into a video", "video"),
+    ("i want a trailer clip for the pitch", "video"),
+    ("read this dialogue aloud", "audio"),
+    ("generate audio for the villain's speech", "audio"),
+    ("narrate the opening paragraph", "audio"),
+    ("make a voice over for the teaser", "audio"),
+    ("let me hear how this line sounds", "audio"),
+    ("perform the scene as a table read", "audio"),
+    ("create speech for this monologue", "audio"),
+    ("record the narration for the intro", "audio"),
+]
+
+_COMPLEXITY_EXAMPLES: List[Tuple[str, bool]] = [
+    ("hello", False),
+    ("thanks that helps", False),
+    ("give me a thriller short film idea", False),
+    ("rewrite this line to sound angrier", False),
+    ("what is a logline", False),
+    ("suggest a name for my detective", False),
+    ("make the dialogue more natural", False),
+    ("write a haiku about a film set", False),
+    ("explain what a beat sheet is", False),
+    ("shorten this paragraph", False),
+    ("what genre is my story", False),
+    ("give me five titles for a romcom", False),
+    ("how much did dune part two make at the box office", True),
+    ("who is in the cast of the latest nolan film", True),
+    ("compare the budgets of recent a24 horror movies", True),
+    ("find movies similar to arrival released after 2015", True),
+    ("what is the imdb rating of parasite", True),
+    ("search for upcoming sci fi releases this year", True),
+    ("estimate how my horror script would perform given current trends", True),
+    ("look up the release date of the next pixar film", True),
+    ("research how heist films performed over the last decade", True),
+    ("what are the top grossing films right now", True),
+]
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _features(text: str) -> Dict[int, float]:
+    """Hash unigrams and bigrams into a fixed number of L2-normalised buckets."""
+    tokens = _tokens(text)
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    feats: Dict[int, float] = {}
+    for gram in grams:
+        idx = zlib.crc32(gram.encode("utf-8")) % N_BUCKETS
+        feats[idx] = feats.get(idx, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in feats.values())) or 1.0
+    return {k: v / norm for k, v in feats.items()}
+
+
+class HashedLinearModel:
+    """Multinomial logistic regression over hashed n-gram features."""
+
+    def __init__(self, labels: Sequence[str]):
+        self.labels = list(labels)
+        self.weights = [[0.0] * N_BUCKETS for _ in self.labels]
+        self.bias = [0.0] * len(self.labels)
+
+    def _scores(self, feats: Dict[int, float]) -> List[float]:
+        return [
+            self.bias[c] + sum(w[i] * v for i, v in feats.items())
+            for c, w in enumerate(self.weights)
+        ]
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        scores = self._scores(_features(text))
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        return {label: e / total for label, e in zip(self.labels, exps)}
+
+    def fit(self, examples: Sequence[Tuple[str, str]], epochs: int = 30, lr: float = 0.5, l2: float = 1e-4) -> "HashedLinearModel":
+        """Plain SGD; deterministic because examples are visited in order."""
+        data = [(_features(text), self.labels.index(label)) for text, label in examples]
+        for _ in range(epochs):
+            for feats, target in data:
+                scores = self._scores(feats)
+                top = max(scores)
+                exps = [math.exp(s - top) for s in scores]
+                total = sum(exps)
+                for c, e in enumerate(exps):
+                    grad = e / total - (1.0 if c == target else 0.0)
+                    self.bias[c] -= lr * grad
+                    w = self.weights[c]
+                    for i, v in feats.items():
+                        w[i] -= lr * (grad * v + l2 * w[i])
+        return self
+
+
+_route_model = HashedLinearModel(["conversation", "video", "audio"]).fit(_ROUTE_EXAMPLES)
+_complexity_model = HashedLinearModel(["simple", "complex"]).fit(
+    [(text, "complex" if is_complex else "simple") for text, is_complex in _COMPLEXITY_EXAMPLES]
+)
+
+
+def classify_route(user_query: str) -> Tuple[RouterResponse, float]:
+    """Classify a message into a workflow without calling the LLM.
+
+    Returns:
+        The RouterResponse and a confidence in [0, 1].
+    """
+    text = user_query.lower()
+    workflow, confidence = None, 0.0
+    for pattern, rule_workflow, rule_confidence in _ROUTE_RULES:
+        if pattern.search(text):
+            workflow, confidence = rule_workflow, rule_confidence
+            break
+    if workflow is None:
+        proba = _route_model.predict_proba(text)
+        workflow = max(proba, key=proba.get)
+        confidence = proba[workflow]
+    response = RouterResponse(
+        conversation=workflow == "conversation",
+        video=workflow == "video",
+        audio=workflow == "audio",
+    )
+    return response, confidence
+
+
+def classify_complexity(user_query: str) -> Tuple[ComplexityAnalysis, float]:
+    """Decide whether a message needs the ReAct agent without calling the LLM.
+
+    Returns:
+        The ComplexityAnalysis and a confidence in [0, 1].
+    """
+    text = user_query.lower()
+    for pattern, is_complex, rule_confidence in _COMPLEXITY_RULES:
+        match = pattern.search(text)
+        if match:
+            reason = f"fast-path rule matched '{match.group(0).strip()}'"
+            return ComplexityAnalysis(is_complex=is_complex, reason=reason), rule_confidence
+    proba = _complexity_model.predict_proba(text)
+    is_complex = proba["complex"] >= proba["simple"]
+    confidence = max(proba.values())
+    reason = f"fast-path model ({confidence:.2f})"
+    return ComplexityAnalysis(is_complex=is_complex, reason=reason), confidence
+
+
+def get_fast_path_config() -> Dict[str, float]:
+    """Read the FAST_PATH_CLASSIFIER section of agents_config.yaml."""
+    conf = load_yaml_config(get_config_path()).get("FAST_PATH_CLASSIFIER", {}) or {}
+    return {
+        "enabled": bool(conf.get("enabled", True)),
+        "router_threshold": float(conf.get("router_threshold", 0.8)),
+        "complexity_threshold": float(conf.get("complexity_threshold", 0.8)),
+    }
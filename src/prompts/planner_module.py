@@ -9,7 +9,8 @@ class VideoConfig(BaseModel):
 class RouterResponse(BaseModel):
     conversation : bool 
     video : bool
-    image : bool
+    audio : bool = False
+    image : bool = False
     
 class ComplexityAnalysis(BaseModel):
     is_complex: bool
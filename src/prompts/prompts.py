@@ -28,7 +28,7 @@ Your output MUST be a JSON object with the following schema:
 ROUTER_PROMPT = """
 You are the Workflow Router. Your job is to classify the user's query into the correct workflow.
 
-- User Query: "{messages[-1].content}"
+- User Query: "{user_query}"
 - Memory Context: {memory_context}
 
 Analyze the user's intent and choose one of the following workflows:
@@ -55,6 +55,7 @@ TASK_EXECUTION_CONVERSATION_PROMPT = """
 You are the CineBrain Creative Assistant. Your goal is to provide a helpful and engaging response to the user's query.
 
 - Task: {context_injection_output} 
+- Earlier in this session: {conversation_summary}
 
 Fulfill the user's request based on the provided task description. Be creative, clear, and concise.
 """
@@ -96,8 +97,8 @@ SUMMARY_PROMPT = """
 You are the Summarization Specialist. Your task is to create a concise, one-sentence summary of the latest user interaction for memory storage.
 
 - Workflow: {workflow}
-- User Query: "{messages[-1].content}"
-- AI Response: "{messages[-1].content}"
+- User Query: "{user_query}"
+- AI Response: "{ai_response}"
 
 Based on the query and response, create a neutral, third-person summary of the event.
 Example: "The user asked for a video of a dragon, and the AI generated a cinematic prompt for it."
@@ -186,6 +187,20 @@ Your output MUST be a JSON object with the following schema:
 }}
 """
 
+# 10. Conversation Summary Update Prompt
+CONVERSATION_SUMMARY_UPDATE_PROMPT = """
+You are the Session Archivist. A long writing session is kept short by folding older exchanges into a running summary. Your task is to fold ONE more exchange into it.
+
+Running Summary: "{conversation_summary}"
+
+Exchange to fold in:
+{turn}
+
+Rewrite the running summary so it also covers this exchange. Keep character names, plot points, decisions, open questions and the user's stated preferences; drop greetings and filler. Stay under 250 words.
+
+Respond with the updated summary only.
+"""
+
 # ==============================================================================
 # --- PROMPT REGISTRY & LOADER ---                                           #
 # ==============================================================================
@@ -205,6 +220,7 @@ PROMPT_REGISTRY: Dict[str, str] = {
     "agent_summary": AGENT_SUMMARY_PROMPT,
     "context_injection_generation": CONTEXT_INJECTION_GENERATION_PROMPT,
     "memory_storage_decision": MEMORY_STORAGE_DECISION_PROMPT,
+    "conversation_summary_update": CONVERSATION_SUMMARY_UPDATE_PROMPT,
 }
 
 def get_prompt_template(prompt_name: str) -> str:
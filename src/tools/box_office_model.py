@@ -0,0 +1,237 @@
+import csv
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+
+# IMDb genre vocabulary, so concepts and the movie database share one encoding
+GENRES = (
+    "Action", "Adult", "Adventure", "Animation", "Biography", "Comedy", "Crime", "Documentary",
+    "Drama", "Family", "Fantasy", "Film-Noir", "History", "Horror", "Music", "Musical", "Mystery",
+    "News", "Romance", "Sci-Fi", "Sport", "Thriller", "War", "Western",
+)
+_GENRE_INDEX = {genre.lower(): i for i, genre in enumerate(GENRES)}
+
+# z-score for an 80% interval around the log-gross estimate
+_INTERVAL_Z = 1.2816
+
+
+@dataclass
+class FilmConcept:
+    genres: Sequence[str]
+    runtime_minutes: float = 110.0
+    rating: float = 6.5  # expected IMDb-style rating
+    release_month: int = 6
+    budget: Optional[float] = None  # USD
+    title: str = ""
+
+
+@dataclass
+class BoxOfficePrediction:
+    concept: FilmConcept
+    gross: float  # worldwide USD
+    low: float
+    high: float
+    comparables: List[Tuple[str, float]] = field(default_factory=list)  # (title, gross)
+
+
+def _featurize(concepts: Sequence[FilmConcept]) -> np.ndarray:
+    """Raw feature matrix: genre multi-hot, runtime, rating, release seasonality, log budget."""
+    n = len(concepts)
+    genres = np.zeros((n, len(GENRES)), dtype=np.float64)
+    numeric = np.zeros((n, 7), dtype=np.float64)
+    for row, concept in enumerate(concepts):
+        for genre in concept.genres:
+            index = _GENRE_INDEX.get(genre.strip().lower())
+            if index is not None:
+                genres[row, index] = 1.0
+        numeric[row, 0] = concept.runtime_minutes
+        numeric[row, 1] = concept.rating
+        numeric[row, 2] = concept.release_month
+        numeric[row, 5] = concept.budget or 0.0
+        numeric[row, 6] = concept.budget is not None
+    months = numeric[:, 2].copy()
+    numeric[:, 2] = np.sin(2 * np.pi * months / 12)
+    numeric[:, 3] = np.cos(2 * np.pi * months / 12)
+    # Summer (May-Jul) and holiday (Nov-Dec) windows carry most of the year's gross
+    numeric[:, 4] = np.isin(months, (5, 6, 7, 11, 12))
+    numeric[:, 5] = np.log1p(numeric[:, 5])
+    return np.hstack([genres, numeric])
+
+
+class BoxOfficeEstimator:
+    """
+    Ridge regression on log worldwide gross plus a cosine kNN over the same
+    standardized features for comparable titles.
+
+    Fitting is one closed-form solve; predict_many scores any number of
+    concepts with a single matrix product per stage.
+    """
+
+    def __init__(self, alpha: float = 1.0, k: int = 5):
+        self.alpha = alpha
+        self.k = k
+        self.mean: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        self.weights: Optional[np.ndarray] = None
+        self.bias = 0.0
+        self.residual_std = 0.0
+        self.train_features: Optional[np.ndarray] = None  # standardized, unit-normalized rows
+        self.train_titles: List[str] = []
+        self.train_gross: Optional[np.ndarray] = None
+
+    def _standardize(self, raw: np.ndarray) -> np.ndarray:
+        return (raw - self.mean) / self.scale
+
+    def fit(self, concepts: Sequence[FilmConcept], grosses: Sequence[float]) -> "BoxOfficeEstimator":
+        raw = _featurize(concepts)
+        self.mean = raw.mean(axis=0)
+        self.scale = raw.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        X = self._standardize(raw)
+        y = np.log1p(np.asarray(grosses, dtype=np.float64))
+        self.bias = float(y.mean())
+        # Centered y leaves the intercept out of the penalty
+        gram = X.T @ X + self.alpha * np.eye(X.shape[1])
+        self.weights = np.linalg.solve(gram, X.T @ (y - self.bias))
+        residuals = y - (X @ self.weights + self.bias)
+        self.residual_std = float(np.sqrt(np.mean(residuals ** 2)))
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        self.train_features = X / np.where(norms == 0, 1.0, norms)
+        self.train_titles = [concept.title for concept in concepts]
+        self.train_gross = np.asarray(grosses, dtype=np.float64)
+        return self
+
+    def predict_many(self, concepts: Sequence[FilmConcept]) -> List[BoxOfficePrediction]:
+        """Score a batch of concepts in one vectorized pass."""
+        if self.weights is None:
+            raise RuntimeError("BoxOfficeEstimator is not fitted")
+        if not concepts:
+            return []
+        X = self._standardize(_featurize(concepts))
+        log_gross = X @ self.weights + self.bias
+        spread = _INTERVAL_Z * self.residual_std
+        gross, low, high = np.expm1(log_gross), np.expm1(log_gross - spread), np.expm1(log_gross + spread)
+
+        k = min(self.k, len(self.train_titles))
+        neighbours = np.empty((len(concepts), 0), dtype=np.int64)
+        if k:
+            norms = np.linalg.norm(X, axis=1, keepdims=True)
+            similarity = (X / np.where(norms == 0, 1.0, norms)) @ self.train_features.T
+            top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+            order = np.argsort(-np.take_along_axis(similarity, top, axis=1), axis=1)
+            neighbours = np.take_along_axis(top, order, axis=1)
+
+        return [
+            BoxOfficePrediction(
+                concept=concept,
+                gross=float(gross[i]),
+                low=float(max(low[i], 0.0)),
+                high=float(high[i]),
+                comparables=[(self.train_titles[j], float(self.train_gross[j])) for j in neighbours[i]],
+            )
+            for i, concept in enumerate(concepts)
+        ]
+
+    def predict(self, concept: FilmConcept) -> BoxOfficePrediction:
+        return self.predict_many([concept])[0]
+
+    def save(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            alpha=self.alpha,
+            k=self.k,
+            mean=self.mean,
+            scale=self.scale,
+            weights=self.weights,
+            bias=self.bias,
+            residual_std=self.residual_std,
+            train_features=self.train_features,
+            train_titles=np.array(self.train_titles, dtype=str),
+            train_gross=self.train_gross,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "BoxOfficeEstimator":
+        with np.load(path) as data:
+            estimator = cls(alpha=float(data["alpha"]), k=int(data["k"]))
+            estimator.mean = data["mean"]
+            estimator.scale = data["scale"]
+            estimator.weights = data["weights"]
+            estimator.bias = float(data["bias"])
+            estimator.residual_std = float(data["residual_std"])
+            estimator.train_features = data["train_features"]
+            estimator.train_titles = data["train_titles"].tolist()
+            estimator.train_gross = data["train_gross"]
+        return estimator
+
+
+def load_dataset(path: str) -> Tuple[List[FilmConcept], List[float]]:
+    """
+    Read the training CSV. Columns: title, genres (comma-separated),
+    runtime_minutes, rating, release_month, budget (may be empty), worldwide_gross.
+    """
+    concepts, grosses = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                gross = float(row["worldwide_gross"])
+            except (KeyError, ValueError):
+                continue
+            concepts.append(
+                FilmConcept(
+                    title=row.get("title", ""),
+                    genres=[g for g in (row.get("genres") or "").split(",") if g],
+                    runtime_minutes=float(row.get("runtime_minutes") or 110),
+                    rating=float(row.get("rating") or 6.5),
+                    release_month=int(row.get("release_month") or 6),
+                    budget=float(row["budget"]) if row.get("budget") else None,
+                )
+            )
+            grosses.append(gross)
+    return concepts, grosses
+
+
+def _resolve(path: str) -> Path:
+    resolved = Path(path)
+    return resolved if resolved.is_absolute() else Path(__file__).parent.parent.parent / resolved
+
+
+_estimator: Optional[BoxOfficeEstimator] = None
+_estimator_checked = False
+
+
+def get_box_office_estimator() -> Optional[BoxOfficeEstimator]:
+    """
+    Process-wide estimator configured by BOX_OFFICE_MODEL in agents_config.yaml.
+
+    Loads the saved model, refitting (and re-saving) it when the dataset is
+    newer. Returns None when there is no dataset to train from.
+    """
+    global _estimator, _estimator_checked
+    if _estimator_checked:
+        return _estimator
+    _estimator_checked = True
+    conf = load_yaml_config(get_config_path()).get("BOX_OFFICE_MODEL") or {}
+    dataset = _resolve(conf.get("dataset_path", "data/box_office.csv"))
+    model = _resolve(conf.get("model_path", ".cache/box_office_model.npz"))
+    if model.exists() and (not dataset.exists() or model.stat().st_mtime >= dataset.stat().st_mtime):
+        _estimator = BoxOfficeEstimator.load(str(model))
+    elif dataset.exists():
+        concepts, grosses = load_dataset(str(dataset))
+        if concepts:
+            _estimator = BoxOfficeEstimator(alpha=float(conf.get("alpha", 1.0)), k=int(conf.get("k", 5)))
+            _estimator.fit(concepts, grosses)
+            _estimator.save(str(model))
+            logger.system_info(f"Trained box-office model on {len(concepts)} titles")
+    if _estimator is None:
+        logger.warning(
+            f"No box-office dataset at {dataset} (build it with scripts/build_box_office_dataset.py); "
+            "box_office_predictor will search the web"
+        )
+    return _estimator
@@ -1,32 +1,108 @@
 # trope_detector.py
-from src.config import settings
-from crawl4ai import AsyncCrawler
-import requests
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from src.config.logger import logger
 from langchain_core.tools import tool
+from src.tools.box_office_model import BoxOfficePrediction, FilmConcept, get_box_office_estimator
+from src.tools.chunk_ranker import rank_pages
+from src.tools.crawl import get_crawl_stage
+from src.tools.http_client import organic_links, serper_search
+
+
+def _millions(value: float) -> str:
+    return f"${value / 1e6:,.1f}M"
+
+
+def _estimate(prediction: BoxOfficePrediction) -> str:
+    return f"{_millions(prediction.gross)} (80% range {_millions(prediction.low)} - {_millions(prediction.high)})"
+
+
+_NO_MODEL = (
+    "No local box-office model: build data/box_office.csv with scripts/build_box_office_dataset.py "
+    "(see BOX_OFFICE_MODEL in agents_config.yaml)."
+)
+
+
+class ConceptInput(BaseModel):
+    """One film concept for box_office_compare."""
+    title: str = Field(..., description="Working title or logline")
+    genres: str = Field(..., description='Comma-separated IMDb genres, e.g. "Action,Sci-Fi"')
+    runtime_minutes: float = 110
+    expected_rating: float = 6.5
+    release_month: int = Field(6, description="1-12")
+    budget: Optional[float] = Field(None, description="USD")
+
+    def to_concept(self) -> FilmConcept:
+        return FilmConcept(
+            title=self.title,
+            genres=[g for g in self.genres.split(",") if g.strip()],
+            runtime_minutes=self.runtime_minutes,
+            rating=self.expected_rating,
+            release_month=self.release_month,
+            budget=self.budget,
+        )
+
 
 @tool
-def box_office_predictor(query: str,num_results: int = 5) -> str:
-    
-    api_key = settings.SERPER_API_KEY
-    base_url = "https://google.serper.dev/search"
-    payload = {
-        "q": "site:the-numbers.com " + query,
-        "api_key": api_key
-    }
-    headers = {
-        'X-API-KEY': api_key,
-        'Content-Type': 'application/json'
-    }
-    
-    response = requests.request("POST", base_url, headers=headers, data=payload)
-    urls = response.json()
+async def box_office_predictor(
+    query: str,
+    genres: str = "",
+    runtime_minutes: float = 110,
+    expected_rating: float = 6.5,
+    release_month: int = 6,
+    budget: Optional[float] = None,
+    num_results: int = 5,
+) -> str:
+    """Estimate worldwide box office for a film concept.
+
+    Pass comma-separated IMDb genres (e.g. "Action,Sci-Fi") plus whatever is known
+    of runtime, expected rating, release month (1-12) and budget in USD to get a
+    local model estimate with comparable titles. Without genres, or when no model
+    is available, searches The Numbers for the query instead.
+    """
+    estimator = get_box_office_estimator()
+    if estimator is not None and genres:
+        concept = ConceptInput(
+            title=query,
+            genres=genres,
+            runtime_minutes=runtime_minutes,
+            expected_rating=expected_rating,
+            release_month=release_month,
+            budget=budget,
+        ).to_concept()
+        prediction = estimator.predict(concept)
+        logger.agent_event("box_office_predictor", f"Estimated box office locally for: {query}")
+        comparables = ", ".join(f"{title} ({_millions(gross)})" for title, gross in prediction.comparables)
+        return f"Estimated worldwide gross: {_estimate(prediction)}\nComparable titles: {comparables}"
+
+    links = organic_links(await serper_search("site:the-numbers.com " + query), num_results)
     
-    crawler = AsyncCrawler()
-    results = []
-    logger.agent_event(f"Serching the web for: {query}")
-    for url in urls["organic_results"][:num_results]:
-        response = crawler.get(url["link"])
-        results.append(response.markdown)
-    logger.agent_event(f"Found {len(results)} results for: {query}")
-    return "\n".join(results)
+    logger.agent_event("box_office_predictor", f"Serching the web for: {query}")
+    pages = await get_crawl_stage().crawl(links)
+    logger.agent_event("box_office_predictor", f"Found {len(pages)} results for: {query}")
+    return rank_pages(query, pages)
+
+
+@tool
+async def box_office_compare(concepts: List[ConceptInput]) -> str:
+    """Estimate and rank worldwide box office for several film concepts in one call.
+
+    Use this instead of repeated box_office_predictor calls when comparing
+    loglines or variants (genre mix, runtime, release month, budget) of a pitch.
+    Every concept needs a title and comma-separated IMDb genres.
+    """
+    estimator = get_box_office_estimator()
+    if estimator is None:
+        return _NO_MODEL
+    batch = [c if isinstance(c, ConceptInput) else ConceptInput.model_validate(c) for c in concepts]
+    if not batch:
+        return "No concepts to compare."
+    # One vectorized pass for the whole batch
+    predictions = estimator.predict_many([c.to_concept() for c in batch])
+    logger.agent_event("box_office_compare", f"Estimated box office locally for {len(batch)} concepts")
+    ranked = sorted(predictions, key=lambda prediction: prediction.gross, reverse=True)
+    lines = []
+    for rank, prediction in enumerate(ranked, start=1):
+        comparables = ", ".join(title for title, _ in prediction.comparables[:3])
+        lines.append(f"{rank}. {prediction.concept.title}: {_estimate(prediction)}; comparable: {comparables}")
+    return "\n".join(lines)
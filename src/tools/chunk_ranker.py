@@ -0,0 +1,138 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.tools.crawl import CrawledPage
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_BLOCK_SPLIT_RE = re.compile(r"\n\s*\n|\n(?=#)")
+# Markdown link/image syntax; a block that is mostly links is navigation
+_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+
+
+def _terms(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _approx_tokens(text: str) -> int:
+    # Same ~4 characters per token heuristic as the rate limiter
+    return len(text) // 4 + 1
+
+
+@dataclass
+class Chunk:
+    url: str
+    rank: int  # search rank of the source page, used to break ties
+    text: str
+    tokens: int
+
+
+def _is_boilerplate(block: str) -> bool:
+    if block.startswith("#"):
+        return False
+    stripped = _LINK_RE.sub(lambda m: m.group(1), block)
+    words = _terms(stripped)
+    if len(words) < 4:
+        return True
+    link_chars = sum(len(m.group(0)) for m in _LINK_RE.finditer(block))
+    return link_chars > 0.6 * len(block)
+
+
+def split_page(page: CrawledPage, max_chunk_tokens: int = 200) -> List[Chunk]:
+    """Split a page's markdown into paragraph-aligned chunks of at most ~max_chunk_tokens."""
+    chunks: List[Chunk] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            text = "\n\n".join(current)
+            chunks.append(Chunk(page.url, page.rank, text, _approx_tokens(text)))
+        current, current_tokens = [], 0
+
+    for block in _BLOCK_SPLIT_RE.split(page.markdown or ""):
+        block = block.strip()
+        if not block or _is_boilerplate(block):
+            continue
+        # Hard-wrap oversized blocks (tables, run-on text) on a character budget
+        for start in range(0, len(block), max_chunk_tokens * 4):
+            piece = block[start:start + max_chunk_tokens * 4]
+            piece_tokens = _approx_tokens(piece)
+            if current_tokens + piece_tokens > max_chunk_tokens:
+                flush()
+            current.append(piece)
+            current_tokens += piece_tokens
+    flush()
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 over a small in-memory set of chunks, built per tool call."""
+
+    def __init__(self, chunks: Sequence[Chunk], k1: float = 1.5, b: float = 0.75):
+        self.chunks = list(chunks)
+        self.k1 = k1
+        self.b = b
+        self.doc_terms = [Counter(_terms(chunk.text)) for chunk in self.chunks]
+        self.doc_lengths = [sum(terms.values()) for terms in self.doc_terms]
+        self.avg_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+        doc_freq: Dict[str, int] = Counter(term for terms in self.doc_terms for term in terms)
+        n_docs = len(self.chunks)
+        self.idf = {term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def scores(self, query: str) -> List[float]:
+        query_terms = set(_terms(query))
+        results = []
+        for terms, length in zip(self.doc_terms, self.doc_lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            score = 0.0
+            for term in query_terms:
+                tf = terms.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+def rank_chunks(
+    query: str,
+    pages: Sequence[CrawledPage],
+    token_budget: int = 1500,
+    max_chunk_tokens: int = 200,
+) -> List[Chunk]:
+    """Top BM25 chunks for the query that fit in token_budget, best first."""
+    chunks = [chunk for page in pages for chunk in split_page(page, max_chunk_tokens)]
+    if not chunks:
+        return []
+    scores = BM25Index(chunks).scores(query)
+    order = sorted(range(len(chunks)), key=lambda i: (-scores[i], chunks[i].rank, i))
+    selected, used = [], 0
+    for i in order:
+        if scores[i] <= 0 and selected:
+            break
+        if used + chunks[i].tokens > token_budget:
+            continue
+        selected.append(chunks[i])
+        used += chunks[i].tokens
+    return selected
+
+
+def format_chunks(chunks: Sequence[Chunk]) -> str:
+    """Render chunks as a tool observation, each tagged with its source URL."""
+    return "\n\n".join(f"[Source: {chunk.url}]\n{chunk.text}" for chunk in chunks)
+
+
+def rank_pages(query: str, pages: Sequence[CrawledPage], token_budget: Optional[int] = None) -> str:
+    """Post-crawl stage used by the tools; budgets come from CHUNK_RANKING in agents_config.yaml."""
+    conf = load_yaml_config(get_config_path()).get("CHUNK_RANKING") or {}
+    chunks = rank_chunks(
+        query,
+        pages,
+        token_budget=token_budget or int(conf.get("token_budget", 1500)),
+        max_chunk_tokens=int(conf.get("max_chunk_tokens", 200)),
+    )
+    return format_chunks(chunks)
@@ -0,0 +1,171 @@
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+from src.tools.crawl_cache import CachedPage, get_crawl_cache
+from src.tools.http_client import get_http_client
+
+
+@dataclass
+class CrawledPage:
+    url: str
+    rank: int  # position in the search results
+    markdown: str
+
+
+class LazyCrawler:
+    """
+    The AsyncWebCrawler of one crawl() call, started on first use so a call
+    answered entirely from the crawl cache never launches a browser. It is
+    closed with the exit stack it was entered on.
+    """
+
+    def __init__(self, stack: contextlib.AsyncExitStack):
+        self._stack = stack
+        self._crawler = None
+        self._lock = asyncio.Lock()
+
+    async def arun(self, **kwargs: Any) -> Any:
+        async with self._lock:
+            if self._crawler is None:
+                from crawl4ai import AsyncWebCrawler
+
+                self._crawler = await self._stack.enter_async_context(AsyncWebCrawler())
+        return await self._crawler.arun(**kwargs)
+
+
+class CrawlStage:
+    """
+    Fetches search-result pages concurrently.
+
+    A global semaphore caps pages in flight across all tools and sessions and
+    a per-host semaphore stops one site from taking every slot. Each page gets
+    page_timeout seconds. crawl() returns once `quorum` pages have arrived or
+    the overall deadline passes, whichever comes first; slower pages are
+    cancelled and the tool answers with what it has.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        per_host: int = 2,
+        page_timeout: float = 8.0,
+        deadline: float = 12.0,
+        quorum: int = 3,
+    ):
+        self.page_timeout = page_timeout
+        self.deadline = deadline
+        self.quorum = quorum
+        self.per_host = per_host
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def _revalidate(self, cached: CachedPage) -> Optional[httpx.Response]:
+        """
+        Conditional GET against the cached validators. Returns the 304 or 200
+        response, or None when there are no validators or the outcome is unknown.
+        """
+        headers = {}
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        if not headers:
+            return None
+        try:
+            return await get_http_client().request("GET", cached.url, headers=headers, timeout=self.page_timeout)
+        except httpx.HTTPStatusError as e:
+            return e.response if e.response.status_code == 304 else None
+        except httpx.HTTPError as e:
+            # Can't tell whether the page changed; crawl it again
+            logger.warning(f"Revalidation of {cached.url} failed: {type(e).__name__}")
+            return None
+
+    async def _fetch(self, crawler: Any, url: str, rank: int) -> CrawledPage:
+        cache = get_crawl_cache()
+        # The cache does SQLite and file I/O; keep it off the event loop
+        cached = await asyncio.to_thread(cache.get, url) if cache else None
+        if cached and cached.fresh:
+            return CrawledPage(url=url, rank=rank, markdown=cached.markdown)
+        async with self._global, self._host_slot(url):
+            revalidation = await self._revalidate(cached) if cached else None
+            if revalidation is not None and revalidation.status_code == 304:
+                await asyncio.to_thread(cache.touch, url)
+                return CrawledPage(url=url, rank=rank, markdown=cached.markdown)
+            if revalidation is not None:
+                # The page changed and the conditional GET already has the new body;
+                # convert it instead of fetching it a second time
+                result = await asyncio.wait_for(crawler.arun(url="raw:" + revalidation.text), timeout=self.page_timeout)
+                headers = dict(revalidation.headers)
+            else:
+                result = await asyncio.wait_for(crawler.arun(url=url), timeout=self.page_timeout)
+                headers = getattr(result, "response_headers", None) or {}
+        if not result.success:
+            raise RuntimeError(f"{url}: {result.error_message}")
+        markdown = str(result.markdown or "")
+        if cache:
+            headers = {key.lower(): value for key, value in headers.items()}
+            await asyncio.to_thread(cache.put, url, markdown, headers.get("etag"), headers.get("last-modified"))
+        return CrawledPage(url=url, rank=rank, markdown=markdown)
+
+    async def crawl(self, links: List[str], quorum: Optional[int] = None) -> List[CrawledPage]:
+        """Crawl links concurrently; returns the pages that made it, in search-rank order."""
+        if not links:
+            return []
+        needed = min(quorum or self.quorum, len(links))
+        pages: List[CrawledPage] = []
+        # At most one browser per call; it is closed once the quorum or deadline is reached
+        async with contextlib.AsyncExitStack() as stack:
+            crawler = LazyCrawler(stack)
+            pending = {asyncio.ensure_future(self._fetch(crawler, url, rank)) for rank, url in enumerate(links)}
+            started = time.monotonic()
+            try:
+                while pending and len(pages) < needed:
+                    remaining = self.deadline - (time.monotonic() - started)
+                    if remaining <= 0:
+                        break
+                    done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        try:
+                            pages.append(task.result())
+                        except Exception as e:
+                            logger.warning(f"Crawl failed: {type(e).__name__} {e}")
+            finally:
+                for task in pending:
+                    task.cancel()
+                # Let cancelled fetches unwind before the browser closes under them
+                await asyncio.gather(*pending, return_exceptions=True)
+        if len(pages) < needed:
+            logger.warning(f"Crawl returned {len(pages)}/{needed} pages within {self.deadline}s")
+        return sorted(pages, key=lambda page: page.rank)
+
+
+_crawl_stage: Optional[CrawlStage] = None
+
+
+def get_crawl_stage() -> CrawlStage:
+    """Process-wide crawl stage configured by CRAWL in agents_config.yaml."""
+    global _crawl_stage
+    if _crawl_stage is None:
+        conf = load_yaml_config(get_config_path()).get("CRAWL") or {}
+        _crawl_stage = CrawlStage(
+            max_concurrency=int(conf.get("max_concurrency", 8)),
+            per_host=int(conf.get("per_host", 2)),
+            page_timeout=float(conf.get("page_timeout_seconds", 8)),
+            deadline=float(conf.get("deadline_seconds", 12)),
+            quorum=int(conf.get("quorum", 3)),
+        )
+    return _crawl_stage
@@ -0,0 +1,210 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+
+
+@dataclass
+class CachedPage:
+    url: str
+    markdown: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool  # within its domain TTL; stale entries need revalidation
+
+
+class CrawlCache:
+    """
+    On-disk cache of crawled page markdown, keyed by URL.
+
+    Page bodies are zlib-compressed blobs named by the sha256 of their content,
+    so mirrors and unchanged re-crawls share one file. A SQLite index maps
+    URLs to blobs along with the ETag/Last-Modified validators and fetch time.
+
+    An entry is fresh for its domain's TTL. After that the caller revalidates
+    it with a conditional request and calls touch() on a 304, or put() with
+    the new content, which counts as a refetch. Once the blobs
+    exceed max_bytes the least recently used URLs are dropped and their
+    unreferenced blobs deleted.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        default_ttl: float = 86400,
+        domain_ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.directory = Path(directory)
+        self.blob_dir = self.directory / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.domain_ttls = {domain.lower(): float(ttl) for domain, ttl in (domain_ttls or {}).items()}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.directory / "index.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs (content_hash TEXT PRIMARY KEY, size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_access ON pages (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_hash ON pages (content_hash)")
+        self._conn.commit()
+        self.counters: Dict[str, int] = {"hits": 0, "revalidated": 0, "refetched": 0, "misses": 0, "evictions": 0}
+
+    def ttl_for(self, url: str) -> float:
+        """TTL of the most specific configured domain suffix of the URL's host."""
+        host = urlparse(url).hostname or ""
+        best, best_len = self.default_ttl, -1
+        for domain, ttl in self.domain_ttls.items():
+            if (host == domain or host.endswith("." + domain)) and len(domain) > best_len:
+                best, best_len = ttl, len(domain)
+        return best
+
+    def _blob_path(self, content_hash: str) -> Path:
+        return self.blob_dir / content_hash[:2] / f"{content_hash}.md.z"
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Return the cached page (fresh or stale), or None; counts a miss for None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            content_hash, etag, last_modified, fetched_at = row
+            try:
+                markdown = zlib.decompress(self._blob_path(content_hash).read_bytes()).decode("utf-8")
+            except (OSError, zlib.error):
+                # Blob lost or corrupt: forget the entry and crawl again
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self._conn.commit()
+                self.counters["misses"] += 1
+                return None
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+        fresh = now - fetched_at < self.ttl_for(url)
+        if fresh:
+            self.counters["hits"] += 1
+        return CachedPage(url, markdown, etag, last_modified, fresh)
+
+    def touch(self, url: str) -> None:
+        """Record a successful revalidation (304): the entry is fresh again."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url))
+            self._conn.commit()
+        self.counters["revalidated"] += 1
+
+    def put(self, url: str, markdown: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        data = markdown.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(content_hash)
+        now = time.time()
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                compressed = zlib.compress(data, 6)
+                tmp = path.with_suffix(".tmp")
+                tmp.write_bytes(compressed)
+                tmp.replace(path)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO blobs (content_hash, size) VALUES (?, ?)", (content_hash, len(compressed))
+                )
+            previous = self._conn.execute("SELECT content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO pages (url, content_hash, etag, last_modified, fetched_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (url, content_hash, etag, last_modified, now, now),
+            )
+            if previous:
+                # A stale entry that changed upstream: a lookup the cache could not answer
+                self.counters["refetched"] += 1
+                if previous[0] != content_hash:
+                    self._drop_unreferenced(previous[0])
+            self._evict()
+            self._conn.commit()
+
+    def _drop_unreferenced(self, content_hash: str) -> None:
+        if self._conn.execute("SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone():
+            return
+        self._conn.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+        self._blob_path(content_hash).unlink(missing_ok=True)
+
+    def _total_bytes(self) -> int:
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        return total
+
+    def _evict(self) -> None:
+        """Drop least recently used URLs until the blobs fit in max_bytes."""
+        total = self._total_bytes()
+        while total > self.max_bytes:
+            row = self._conn.execute("SELECT url, content_hash FROM pages ORDER BY last_access ASC LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (row[0],))
+            self._drop_unreferenced(row[1])
+            self.counters["evictions"] += 1
+            total = self._total_bytes()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the current index and blob sizes."""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+            total = self._total_bytes()
+        lookups = sum(self.counters[key] for key in ("hits", "revalidated", "refetched", "misses"))
+        hits = self.counters["hits"] + self.counters["revalidated"]
+        return {
+            **self.counters,
+            "entries": entries,
+            "bytes": total,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+_crawl_cache: Optional[CrawlCache] = None
+
+
+def get_crawl_cache() -> Optional[CrawlCache]:
+    """Process-wide crawl cache configured by CRAWL_CACHE in agents_config.yaml, or None if disabled."""
+    global _crawl_cache
+    conf = load_yaml_config(get_config_path()).get("CRAWL_CACHE") or {}
+    if not conf.get("enabled", False):
+        return None
+    if _crawl_cache is None:
+        directory = Path(conf.get("directory", ".cache/crawl"))
+        if not directory.is_absolute():
+            directory = Path(__file__).parent.parent.parent / directory
+        _crawl_cache = CrawlCache(
+            str(directory),
+            max_bytes=int(conf.get("max_megabytes", 256)) * 1024 * 1024,
+            default_ttl=float(conf.get("default_ttl_seconds", 86400)),
+            domain_ttls=conf.get("domain_ttl_seconds") or {},
+        )
+        logger.system_info(f"Crawl cache at {directory}")
+    return _crawl_cache
@@ -0,0 +1,128 @@
+import asyncio
+import importlib.util
+import random
+from typing import Any, Optional
+
+import httpx
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+from src.config.settings import settings
+from src.tools.search_cache import get_search_cache
+
+SERPER_SEARCH_URL = "https://google.serper.dev/search"
+
+# Worth retrying: rate limiting and transient upstream failures
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class PooledHTTPClient:
+    """
+    Keep-alive httpx.AsyncClient shared by every tool in the process.
+
+    HTTP/2 is negotiated when the h2 package is installed. Timeouts, 429/5xx
+    responses and transport errors are retried with jittered exponential
+    backoff. The underlying client is bound to an event loop, so it is
+    rebuilt if a different loop asks for it.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        max_keepalive: int = 20,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+        max_retries: int = 3,
+        base_backoff: float = 0.3,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.http2 = importlib.util.find_spec("h2") is not None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(http2=self.http2, limits=self.limits, timeout=self.timeout)
+            self._loop = loop
+        return self._client
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request, retrying transient failures; raises once retries run out."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.request(method, url, **kwargs)
+                if response.status_code not in _RETRY_STATUSES or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response
+                reason = f"HTTP {response.status_code}"
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                if attempt == self.max_retries:
+                    raise
+                reason = type(e).__name__
+            delay = self.base_backoff * (2 ** attempt) * (1 + random.random())
+            logger.warning(f"{method} {url} failed ({reason}); retry {attempt + 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_http_client: Optional[PooledHTTPClient] = None
+
+
+def get_http_client() -> PooledHTTPClient:
+    """Process-wide HTTP client configured by HTTP_CLIENT in agents_config.yaml."""
+    global _http_client
+    if _http_client is None:
+        conf = load_yaml_config(get_config_path()).get("HTTP_CLIENT") or {}
+        _http_client = PooledHTTPClient(
+            max_connections=int(conf.get("max_connections", 50)),
+            max_keepalive=int(conf.get("max_keepalive_connections", 20)),
+            keepalive_expiry=float(conf.get("keepalive_expiry_seconds", 30)),
+            connect_timeout=float(conf.get("connect_timeout_seconds", 5)),
+            read_timeout=float(conf.get("read_timeout_seconds", 20)),
+            max_retries=int(conf.get("max_retries", 3)),
+            base_backoff=float(conf.get("base_backoff_seconds", 0.3)),
+        )
+    return _http_client
+
+
+async def _serper_request(query: str) -> dict:
+    response = await get_http_client().request(
+        "POST",
+        SERPER_SEARCH_URL,
+        headers={"X-API-KEY": settings.SERPER_API_KEY, "Content-Type": "application/json"},
+        json={"q": query},
+    )
+    return response.json()
+
+
+async def serper_search(query: str) -> dict:
+    """
+    POST a query to Serper's Google search endpoint and return the JSON body.
+
+    Goes through the search cache when enabled, so repeated and concurrent
+    identical queries are billed once.
+    """
+    cache = get_search_cache()
+    if cache is None:
+        return await _serper_request(query)
+    return await cache.get_or_fetch(query, _serper_request)
+
+
+def organic_links(results: dict, num_results: int) -> list[str]:
+    """Pull the first num_results organic result links out of a Serper response."""
+    organic = results.get("organic") or results.get("organic_results") or []
+    return [item["link"] for item in organic[:num_results] if item.get("link")]
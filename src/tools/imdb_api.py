@@ -1,32 +1,27 @@
-import requests
-import re
-from src.config import settings
+import asyncio
 from langchain_core.tools import tool
-from crawl4ai import AsyncCrawler
 from src.config.logger import logger
+from src.tools.chunk_ranker import rank_pages
+from src.tools.crawl import get_crawl_stage
+from src.tools.http_client import organic_links, serper_search
+from src.tools.movie_db import get_movie_db
 
 
 @tool
-def imdb_api(query: str,num_results: int = 5) -> str:
-    api_key = settings.SERPER_API_KEY
-    base_url = "https://google.serper.dev/search"
-    payload = {
-        "q": "site:imdb.com " + query,
-        "api_key": api_key
-    }
-    headers = {
-        'X-API-KEY': api_key,
-        'Content-Type': 'application/json'
-    }
-    response = requests.request("POST", base_url, headers=headers, data=payload)
-    logger.agent_event(f"Serching the web for: {query}")
-    urls = response.json()
+async def imdb_api(query: str,num_results: int = 5) -> str:
+    """Look up films, cast and crew on IMDb."""
+    movie_db = get_movie_db()
+    if movie_db is not None:
+        # Local IMDb dump first; the web is only the fallback for misses
+        answer = await asyncio.to_thread(movie_db.lookup, query)
+        if answer:
+            logger.agent_event("imdb_api", f"Answered from the local movie database: {query}")
+            return answer
+
+    logger.agent_event("imdb_api", f"Serching the web for: {query}")
+    links = organic_links(await serper_search("site:imdb.com " + query), num_results)
     
-    crawler = AsyncCrawler()
-    results = []
-    for url in urls["organic_results"][:num_results]:
-        response = crawler.get(url["link"])
-        results.append(response.markdown)
+    pages = await get_crawl_stage().crawl(links)
     
-    return "\n".join(results)
+    return rank_pages(query, pages)
     
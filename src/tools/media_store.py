@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+
+# A temp file not written to for this long belongs to a write that died
+_STALE_TMP_SECONDS = 3600
+
+
+def generation_key(kind: str, params: Dict[str, Any]) -> str:
+    """sha256 of the canonical JSON of the generation parameters; equal requests share a key."""
+    canonical = json.dumps({"kind": kind, **params}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class MediaStore:
+    """
+    On-disk store of generated media, looked up by generation parameters.
+
+    A request's key is the hash of everything that determines its output
+    (model, prompt, negative prompt, video config, voice...), so repeating a
+    request returns the files made the first time instead of paying for a
+    new generation. Files are content-addressed blobs (sha256 of the bytes),
+    written by streaming into a temp file and renaming, so identical outputs
+    share one file. A SQLite index maps keys to their ordered blobs along
+    with the parameters that produced them. Once the blobs exceed max_bytes
+    the least recently used artifacts are dropped and their unreferenced
+    blobs deleted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 2 * 1024 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.blob_dir = self.directory / "blobs"
+        self.tmp_dir = self.directory / "tmp"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.directory / "index.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS artifacts (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS artifact_files (
+                key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                PRIMARY KEY (key, position)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs (content_hash TEXT PRIMARY KEY, ext TEXT NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_access ON artifacts (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_artifact_files_hash ON artifact_files (content_hash)")
+        self._conn.commit()
+        # Temp files of interrupted writes. Other processes sharing the directory
+        # may be streaming into theirs right now, so only untouched ones go
+        cutoff = time.time() - _STALE_TMP_SECONDS
+        for leftover in self.tmp_dir.glob("*.part"):
+            try:
+                if leftover.stat().st_mtime < cutoff:
+                    leftover.unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass
+        self.counters: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _blob_path(self, content_hash: str, ext: str) -> Path:
+        return self.blob_dir / content_hash[:2] / f"{content_hash}.{ext}"
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """File paths of the artifact stored under key, in order, or None."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT b.content_hash, b.ext FROM artifact_files f
+                JOIN blobs b ON b.content_hash = f.content_hash
+                WHERE f.key = ? ORDER BY f.position
+                """,
+                (key,),
+            ).fetchall()
+            paths = [self._blob_path(content_hash, ext) for content_hash, ext in rows]
+            if not paths or not all(path.exists() for path in paths):
+                if paths:
+                    # A blob was deleted behind our back: forget the artifact and generate again
+                    self._delete_artifact(key)
+                    self._conn.commit()
+                self.counters["misses"] += 1
+                return None
+            self._conn.execute("UPDATE artifacts SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        self.counters["hits"] += 1
+        return [str(path) for path in paths]
+
+    async def write_stream(self, chunks: AsyncIterator[bytes], ext: str) -> str:
+        """Stream chunks into a blob, hashing as they arrive; returns the content hash."""
+        digest = hashlib.sha256()
+        size = 0
+        tmp = self.tmp_dir / f"{uuid.uuid4().hex}.part"
+        try:
+            with open(tmp, "wb") as f:
+                async for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            content_hash = digest.hexdigest()
+            with self._lock:
+                path = self._blob_path(content_hash, ext)
+                if path.exists():
+                    tmp.unlink()
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(tmp, path)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO blobs (content_hash, ext, size) VALUES (?, ?, ?)", (content_hash, ext, size)
+                )
+                self._conn.commit()
+            return content_hash
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    async def put_streams(
+        self, key: str, kind: str, params: Dict[str, Any], streams: Sequence[AsyncIterator[bytes]], ext: str
+    ) -> List[str]:
+        """Store one file per stream under key and return their paths."""
+        hashes = [await self.write_stream(stream, ext) for stream in streams]
+        now = time.time()
+        with self._lock:
+            replaced = [row[0] for row in self._conn.execute("SELECT content_hash FROM artifact_files WHERE key = ?", (key,))]
+            self._conn.execute("DELETE FROM artifact_files WHERE key = ?", (key,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (key, kind, params, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(params, sort_keys=True, default=str), now, now),
+            )
+            self._conn.executemany(
+                "INSERT INTO artifact_files (key, position, content_hash) VALUES (?, ?, ?)",
+                [(key, position, content_hash) for position, content_hash in enumerate(hashes)],
+            )
+            # Only after the new files are referenced, so a shared blob survives
+            for content_hash in replaced:
+                self._drop_unreferenced(content_hash)
+            self._evict(keep=key)
+            self._conn.commit()
+        logger.system_info(f"Stored {kind} artifact {key[:12]} ({len(hashes)} files)")
+        return [str(self._blob_path(content_hash, ext)) for content_hash in hashes]
+
+    async def put_bytes(self, key: str, kind: str, params: Dict[str, Any], data: bytes, ext: str) -> str:
+        """Store a single in-memory file under key and return its path."""
+
+        async def single() -> AsyncIterator[bytes]:
+            yield data
+
+        return (await self.put_streams(key, kind, params, [single()], ext))[0]
+
+    def _delete_artifact(self, key: str) -> None:
+        hashes = [row[0] for row in self._conn.execute("SELECT content_hash FROM artifact_files WHERE key = ?", (key,))]
+        self._conn.execute("DELETE FROM artifact_files WHERE key = ?", (key,))
+        self._conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+        for content_hash in hashes:
+            self._drop_unreferenced(content_hash)
+
+    def _drop_unreferenced(self, content_hash: str) -> None:
+        if self._conn.execute("SELECT 1 FROM artifact_files WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone():
+            return
+        row = self._conn.execute("SELECT ext FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone()
+        self._conn.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+        if row:
+            self._blob_path(content_hash, row[0]).unlink(missing_ok=True)
+
+    def _total_bytes(self) -> int:
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        return total
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Drop least recently used artifacts (never `keep`) until the blobs fit in max_bytes."""
+        total = self._total_bytes()
+        while total > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key FROM artifacts WHERE key != ? ORDER BY last_access ASC LIMIT 1", (keep or "",)
+            ).fetchone()
+            if row is None:
+                break
+            self._delete_artifact(row[0])
+            self.counters["evictions"] += 1
+            total = self._total_bytes()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the current index and blob sizes."""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM artifacts").fetchone()
+            total = self._total_bytes()
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": entries,
+            "bytes": total,
+            "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+        }
+
+
+_media_store: Optional[MediaStore] = None
+
+
+def get_media_store() -> Optional[MediaStore]:
+    """Process-wide media store configured by MEDIA_STORE in agents_config.yaml, or None if disabled."""
+    global _media_store
+    conf = load_yaml_config(get_config_path()).get("MEDIA_STORE") or {}
+    if not conf.get("enabled", False):
+        return None
+    if _media_store is None:
+        directory = Path(conf.get("directory", "generated_media"))
+        if not directory.is_absolute():
+            directory = Path(__file__).parent.parent.parent / directory
+        _media_store = MediaStore(str(directory), max_bytes=int(conf.get("max_megabytes", 2048)) * 1024 * 1024)
+        logger.system_info(f"Media store at {directory}")
+    return _media_store
@@ -0,0 +1,229 @@
+import re
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+from typing import List, Optional, Set
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_YEAR_RE = re.compile(r"\b(18[89]\d|19\d\d|20\d\d)\b")
+_CAPITALIZED_RE = re.compile(r"(?<![.!?]\s)(?<!^)\b[A-Z][\w']*")
+
+# Words too common to identify a title on their own: function words, request
+# verbs and the film vocabulary of the questions themselves. A title made only
+# of these ("Us", "Tell Me", "The Office") needs the query to name it explicitly.
+_COMMON_WORDS = frozenset(
+    """
+    a about after all an and any are as at be before but by can could did do does for from get give had has
+    have he her here him his how i if in into is it its just know let like me more most my no not now of
+    on or our out she show so some tell than that the their them then there these they this those to too
+    up us was we were what when where which who why will with would you your
+    actor actress best box cast crew director directed film films good gross imdb latest movie movies new
+    office plot rating ratings release released review reviews sequel trailer upcoming year
+    """.split()
+)
+
+
+def _words(text: str) -> List[str]:
+    # Fold accents the way the FTS unicode61 tokenizer does ("Timothée" ~ "timothee")
+    folded = unicodedata.normalize("NFKD", text.lower())
+    return _WORD_RE.findall("".join(c for c in folded if not unicodedata.combining(c)))
+
+
+class MovieDB:
+    """
+    Read-only queries over the local IMDb database built by
+    scripts/ingest_movies_db.py.
+
+    lookup() finds titles and people whose full name appears in the query
+    ("dune 2021 cast" -> Dune), so the agent's free-form tool input works
+    without a separate entity-extraction step.
+    """
+
+    def __init__(self, path: str, max_titles: int = 3, max_people: int = 3, cast_size: int = 8):
+        self.path = path
+        self.max_titles = max_titles
+        self.max_people = max_people
+        self.cast_size = cast_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+
+    @staticmethod
+    def _fts_query(words: List[str]) -> str:
+        return " OR ".join(f'"{word}"' for word in dict.fromkeys(words))
+
+    @staticmethod
+    def _anchors(words: List[str], named: Set[str]) -> List[str]:
+        """
+        Words a matching name must contain at least one of: the uncommon and the
+        capitalized ones. Searching for the common words as well would let
+        popular titles full of "of" and "the" crowd out the one the user named.
+        """
+        return [word for word in words if word not in _COMMON_WORDS or word in named]
+
+    @staticmethod
+    def _specific(name_words: List[str], named: Set[str], year_matches: bool = False) -> bool:
+        """
+        Whether a name found inside the query is specific enough to be what the
+        user meant. It needs an uncommon word; otherwise every word must be
+        capitalized mid-sentence in the query ("box office of Us") or the query
+        must give its year. This keeps "tell me about ..." and "... for us" from
+        matching the films Tell Me and Us.
+        """
+        if any(word not in _COMMON_WORDS for word in name_words):
+            return True
+        return year_matches or all(word in named for word in name_words)
+
+    def _find_titles(self, words: List[str], year: Optional[int], named: Set[str]) -> List[sqlite3.Row]:
+        searches = []
+        anchors = self._anchors(words, named)
+        if anchors:
+            searches.append(("", (self._fts_query(anchors),)))
+        if year is not None:
+            # A title of common words only ("The Office") is specific when the query gives its year
+            searches.append(("AND t.start_year = ?", (self._fts_query(words), year)))
+        candidates = {}
+        for clause, params in searches:
+            for row in self._conn.execute(
+                f"""
+                SELECT t.*, r.average_rating, r.num_votes
+                FROM titles_fts f
+                JOIN titles t ON t.rowid = f.rowid
+                LEFT JOIN ratings r ON r.tconst = t.tconst
+                WHERE titles_fts MATCH ? {clause}
+                ORDER BY bm25(titles_fts)
+                LIMIT 200
+                """,
+                params,
+            ):
+                candidates.setdefault(row["tconst"], row)
+        query_words = set(words)
+        matches = [
+            row
+            for row in candidates.values()
+            if set(_words(row["primary_title"])) <= query_words
+            and self._specific(_words(row["primary_title"]), named, row["start_year"] == year)
+        ]
+        if year is not None:
+            matches = [row for row in matches if row["start_year"] == year] or matches
+        if not matches:
+            return []
+        # Keep only the most specific titles ("dune part two" shouldn't also return Dune), most voted first
+        longest = max(len(_words(row["primary_title"])) for row in matches)
+        matches = [row for row in matches if len(_words(row["primary_title"])) == longest]
+        matches.sort(key=lambda row: row["num_votes"] or 0, reverse=True)
+        return matches[: self.max_titles]
+
+    def _cast(self, tconst: str) -> List[str]:
+        rows = self._conn.execute(
+            """
+            SELECT p.name, pr.category, pr.characters FROM principals pr
+            JOIN people p ON p.nconst = pr.nconst
+            WHERE pr.tconst = ? ORDER BY pr.ordering LIMIT ?
+            """,
+            (tconst, self.cast_size),
+        ).fetchall()
+        credits = []
+        for row in rows:
+            characters = (row["characters"] or "").strip('[]"').replace('","', ", ")
+            credits.append(f"{row['name']} ({row['category']}{': ' + characters if characters else ''})")
+        return credits
+
+    def _find_people(self, words: List[str], named: Set[str]) -> List[sqlite3.Row]:
+        anchors = self._anchors(words, named)
+        if not anchors:
+            return []
+        rows = self._conn.execute(
+            """
+            SELECT p.* FROM people_fts f JOIN people p ON p.rowid = f.rowid
+            WHERE people_fts MATCH ? ORDER BY bm25(people_fts) LIMIT 200
+            """,
+            (self._fts_query(anchors),),
+        ).fetchall()
+        query_words = set(words)
+        matches = [
+            row
+            for row in rows
+            if len(_words(row["name"])) > 1
+            and set(_words(row["name"])) <= query_words
+            and self._specific(_words(row["name"]), named)
+        ]
+        return matches[: self.max_people]
+
+    def _known_for(self, known_for: Optional[str]) -> List[str]:
+        tconsts = [t for t in (known_for or "").split(",") if t]
+        if not tconsts:
+            return []
+        placeholders = ",".join("?" * len(tconsts))
+        rows = self._conn.execute(
+            f"SELECT primary_title, start_year FROM titles WHERE tconst IN ({placeholders})", tconsts
+        ).fetchall()
+        return [f"{row['primary_title']} ({row['start_year']})" for row in rows]
+
+    def lookup(self, query: str) -> str:
+        """Formatted facts for titles/people named in the query, or "" when nothing matches."""
+        words = _words(query)
+        if not words:
+            return ""
+        year_match = _YEAR_RE.search(query)
+        year = int(year_match.group(1)) if year_match else None
+        # Words the user capitalized mid-sentence, i.e. wrote as a name
+        named = {word for token in _CAPITALIZED_RE.findall(query.strip()) for word in _words(token)}
+        sections = []
+        with self._lock:
+            for row in self._find_titles(words, year, named):
+                lines = [f"{row['primary_title']} ({row['start_year'] or '?'}) [{row['title_type']}] imdb:{row['tconst']}"]
+                if row["genres"]:
+                    lines.append(f"Genres: {row['genres']}")
+                if row["runtime_minutes"]:
+                    lines.append(f"Runtime: {row['runtime_minutes']} min")
+                if row["average_rating"] is not None:
+                    lines.append(f"Rating: {row['average_rating']}/10 ({row['num_votes']:,} votes)")
+                cast = self._cast(row["tconst"])
+                if cast:
+                    lines.append("Principal cast & crew: " + "; ".join(cast))
+                sections.append("\n".join(lines))
+            for row in self._find_people(words, named):
+                lines = [f"{row['name']} imdb:{row['nconst']}"]
+                if row["professions"]:
+                    lines.append(f"Professions: {row['professions'].replace(',', ', ')}")
+                if row["birth_year"]:
+                    lines.append(f"Born: {row['birth_year']}" + (f", died {row['death_year']}" if row["death_year"] else ""))
+                known_for = self._known_for(row["known_for"])
+                if known_for:
+                    lines.append("Known for: " + ", ".join(known_for))
+                sections.append("\n".join(lines))
+        return "\n\n".join(sections)
+
+
+_movie_db: Optional[MovieDB] = None
+_movie_db_checked = False
+
+
+def get_movie_db() -> Optional[MovieDB]:
+    """
+    Process-wide movie database configured by MOVIE_DB in agents_config.yaml,
+    or None if it hasn't been built with scripts/ingest_movies_db.py.
+    """
+    global _movie_db, _movie_db_checked
+    if not _movie_db_checked:
+        _movie_db_checked = True
+        conf = load_yaml_config(get_config_path()).get("MOVIE_DB") or {}
+        path = Path(conf.get("path", ".cache/movies.sqlite"))
+        if not path.is_absolute():
+            path = Path(__file__).parent.parent.parent / path
+        if path.exists():
+            _movie_db = MovieDB(
+                str(path),
+                max_titles=int(conf.get("max_titles", 3)),
+                max_people=int(conf.get("max_people", 3)),
+                cast_size=int(conf.get("cast_size", 8)),
+            )
+            logger.system_info(f"Movie database at {path}")
+        else:
+            logger.warning(f"No movie database at {path}; imdb_api will search the web")
+    return _movie_db
@@ -0,0 +1,86 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive cache key; search operators like site: are kept."""
+    return _SPACE_RE.sub(" ", query.strip().lower())
+
+
+class SearchCache:
+    """
+    In-process TTL cache of search results with single-flight coalescing.
+
+    Concurrent calls for the same normalized query share one upstream request.
+    Failures are not cached: every waiter sees the exception and the next call
+    tries again.
+    """
+
+    def __init__(self, ttl_seconds: float = 900, max_entries: int = 2048):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.counters: Dict[str, int] = {"hits": 0, "coalesced": 0, "misses": 0}
+
+    async def get_or_fetch(self, query: str, fetch: Callable[[str], Awaitable[Any]]) -> Any:
+        key = normalize_query(query)
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            if time.monotonic() - stored_at < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return value
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        self.counters["misses"] += 1
+        future = asyncio.ensure_future(fetch(query))
+        self._inflight[key] = future
+        future.add_done_callback(lambda done: self._settle(key, done))
+        return await asyncio.shield(future)
+
+    def _settle(self, key: str, future: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._entries[key] = (time.monotonic(), future.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = sum(self.counters.values())
+        saved = self.counters["hits"] + self.counters["coalesced"]
+        return {**self.counters, "entries": len(self._entries), "hit_rate": saved / lookups if lookups else 0.0}
+
+
+_search_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Process-wide search cache configured by SEARCH_CACHE in agents_config.yaml, or None if disabled."""
+    global _search_cache
+    conf = load_yaml_config(get_config_path()).get("SEARCH_CACHE") or {}
+    if not conf.get("enabled", False):
+        return None
+    if _search_cache is None:
+        _search_cache = SearchCache(
+            ttl_seconds=float(conf.get("ttl_seconds", 900)),
+            max_entries=int(conf.get("max_entries", 2048)),
+        )
+        logger.system_info("Search query cache enabled")
+    return _search_cache
@@ -1,21 +1,115 @@
+import asyncio
 import os
-from typing import Optional
+import re
+import struct
+import time
+from typing import AsyncIterator, Callable, List, Optional, Tuple
 
+from src.config.configuration import get_config_path, load_yaml_config
 from src.config.execeptions import TextToSpeechError
+from src.config.logger import logger
 from src.config.settings import settings
-from groq import Groq
+from src.tools.media_store import generation_key, get_media_store
+from groq import AsyncGroq
+
+# A new speaker line ("NAME: ...", "NAME (V.O.): ...") is the preferred place to cut
+_SPEAKER_RE = re.compile(r"^\s*[A-Z][A-Z0-9 .'\-]*(\([^)]*\))?\s*:")
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+")
+
+
+def split_dialogue(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most max_chars, cutting at speaker lines
+    first, then sentence ends, and only mid-sentence (at whitespace) when a
+    single sentence is longer than max_chars.
+    """
+    units: List[str] = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if len(line) <= max_chars:
+            units.append(line)
+            continue
+        for sentence in _SENTENCE_RE.split(line):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                units.append(sentence[:cut])
+                sentence = sentence[cut:].lstrip()
+            if sentence:
+                units.append(sentence)
+
+    chunks: List[str] = []
+    current = ""
+    for unit in units:
+        starts_speaker = bool(_SPEAKER_RE.match(unit))
+        joined = f"{current}\n{unit}" if current else unit
+        # Close the chunk when full; also prefer to close it at a speaker change once it's half full
+        if current and (len(joined) > max_chars or (starts_speaker and len(current) >= max_chars // 2)):
+            chunks.append(current)
+            current = unit
+        else:
+            current = joined
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _wav_chunks(payload: bytes) -> Tuple[bytes, bytes]:
+    """Return the raw 'fmt ' body and PCM 'data' body of a RIFF/WAVE payload."""
+    if len(payload) < 12 or payload[:4] != b"RIFF" or payload[8:12] != b"WAVE":
+        raise TextToSpeechError("TTS response is not a RIFF/WAVE payload")
+    fmt, offset = None, 12
+    while offset + 8 <= len(payload):
+        chunk_id, size = payload[offset:offset + 4], struct.unpack("<I", payload[offset + 4:offset + 8])[0]
+        body_start = offset + 8
+        if chunk_id == b"fmt ":
+            fmt = payload[body_start:body_start + size]
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise TextToSpeechError("WAV data chunk precedes fmt chunk")
+            # Streamed WAVs often carry a placeholder size (0 or 0xFFFFFFFF): take the rest
+            end = body_start + size if 0 < size <= len(payload) - body_start else len(payload)
+            return fmt, payload[body_start:end]
+        offset = body_start + size + (size & 1)
+    raise TextToSpeechError("WAV payload has no data chunk")
+
+
+def stitch_wav(payloads: List[bytes]) -> bytes:
+    """
+    Concatenate WAV payloads with identical formats into one file by joining
+    their PCM data and writing a fresh RIFF header; no decoding or re-encoding.
+    """
+    if not payloads:
+        raise TextToSpeechError("Nothing to stitch")
+    fmt, pcm_parts = None, []
+    for payload in payloads:
+        part_fmt, pcm = _wav_chunks(payload)
+        if fmt is None:
+            fmt = part_fmt
+        elif part_fmt != fmt:
+            raise TextToSpeechError("Cannot stitch WAV chunks with different formats")
+        pcm_parts.append(pcm)
+    pcm = b"".join(pcm_parts)
+    fmt_chunk = b"fmt " + struct.pack("<I", len(fmt)) + fmt + (b"\x00" if len(fmt) & 1 else b"")
+    data_chunk = b"data" + struct.pack("<I", len(pcm)) + pcm + (b"\x00" if len(pcm) & 1 else b"")
+    return b"RIFF" + struct.pack("<I", 4 + len(fmt_chunk) + len(data_chunk)) + b"WAVE" + fmt_chunk + data_chunk
 
 
 class TextToSpeech:
-    """A class to handle text-to-speech conversion using ElevenLabs."""
+    """A class to handle text-to-speech conversion using Groq's PlayAI voices."""
 
-    # Required environment variables
-    REQUIRED_ENV_VARS = ["GROQ_API_KEY", "TTS_MODEL_NAME", "TTS_VOICE"]
+    # Required environment variables (model and voice have defaults in settings)
+    REQUIRED_ENV_VARS = ["GROQ_API_KEY"]
+    # Per-request input limit
+    MAX_INPUT_CHARS = 5000
 
-    def __init__(self):
+    def __init__(self, max_chunk_chars: int = 1200, max_concurrency: int = 4):
         """Initialize the TextToSpeech class and validate environment variables."""
         self._validate_env_vars()
-        self._client: Optional[Groq] = None
+        self._client: Optional[AsyncGroq] = None
+        self.max_chunk_chars = min(max_chunk_chars, self.MAX_INPUT_CHARS)
+        self._slots = asyncio.Semaphore(max_concurrency)
 
     def _validate_env_vars(self) -> None:
         """Validate that all required environment variables are set."""
@@ -24,20 +118,20 @@ class TextToSpeech:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
     @property
-    def client(self):
-        """Get or create ElevenLabs client instance using singleton pattern."""
+    def client(self) -> AsyncGroq:
+        """Get or create the Groq client instance using singleton pattern."""
         if self._client is None:
-            self._client = Groq(api_key=settings.GROQ_API_KEY)
+            self._client = AsyncGroq(api_key=settings.GROQ_API_KEY)
         return self._client
 
     async def synthesize(self, text: str) -> bytes:
-        """Convert text to speech using ElevenLabs.
+        """Convert text to speech in a single request.
 
         Args:
             text: Text to convert to speech
 
         Returns:
-            bytes: Audio data
+            bytes: WAV audio data
 
         Raises:
             ValueError: If the input text is empty or too long
@@ -46,25 +140,121 @@ class TextToSpeech:
         if not text.strip():
             raise ValueError("Input text cannot be empty")
 
-        if len(text) > 5000:  # ElevenLabs typical limit
-            raise ValueError("Input text exceeds maximum length of 5000 characters")
+        if len(text) > self.MAX_INPUT_CHARS:
+            raise ValueError(f"Input text exceeds maximum length of {self.MAX_INPUT_CHARS} characters; use synthesize_long")
 
         try:
-            audio_generator = self.client.audio.speech.create(
-                model=settings.TTS_MODEL_NAME,
-                voice=settings.TTS_VOICE,
-                response_format="wav",
-                input=text,
-            )
-
-            # Convert generator to bytes
-            audio_bytes = await audio_generator.content()
+            async with self._slots:
+                response = await self.client.audio.speech.create(
+                    model=settings.TTS_MODEL_NAME,
+                    voice=settings.TTS_VOICE,
+                    response_format="wav",
+                    input=text,
+                )
+                audio_bytes = await response.read()
             if not audio_bytes:
                 raise TextToSpeechError("Generated audio is empty")
 
             return audio_bytes
 
+        except TextToSpeechError:
+            raise
         except Exception as e:
             raise TextToSpeechError(f"Text-to-speech conversion failed: {str(e)}") from e
 
-text_to_speech = TextToSpeech()
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        """Yield one WAV payload per chunk, in order, as soon as each is ready.
+
+        All chunks are scheduled up front (bounded by max_concurrency), so
+        time to first audio is one chunk's latency while later chunks are
+        still being synthesized. Each payload is a complete, playable WAV.
+
+        Raises:
+            ValueError: If the input text is empty
+            TextToSpeechError: If any chunk fails to convert
+        """
+        if not text.strip():
+            raise ValueError("Input text cannot be empty")
+        chunks = split_dialogue(text, self.max_chunk_chars)
+        # The semaphore is FIFO, so chunks are synthesized roughly in order
+        tasks = [asyncio.ensure_future(self.synthesize(chunk)) for chunk in chunks]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def synthesize_long(self, text: str) -> bytes:
+        """Convert text of any length to one WAV file.
+
+        The text is split at speaker and sentence boundaries, the chunks are
+        synthesized concurrently (bounded by max_concurrency) and their PCM is
+        stitched in order.
+
+        Raises:
+            ValueError: If the input text is empty
+            TextToSpeechError: If any chunk fails to convert
+        """
+        started = time.monotonic()
+        payloads = [payload async for payload in self.stream(text)]
+        logger.system_info(f"Synthesized {len(payloads)} TTS chunks in {time.monotonic() - started:.1f}s")
+        return payloads[0] if len(payloads) == 1 else stitch_wav(payloads)
+
+
+def _build_text_to_speech() -> TextToSpeech:
+    conf = load_yaml_config(get_config_path()).get("TEXT_TO_SPEECH") or {}
+    return TextToSpeech(
+        max_chunk_chars=int(conf.get("max_chunk_chars", 1200)),
+        max_concurrency=int(conf.get("max_concurrency", 4)),
+    )
+
+
+text_to_speech = _build_text_to_speech()
+
+
+async def generate_speech(
+    text: str,
+    output_dir: str = "generated_audio",
+    on_chunk: Optional[Callable[[int, bytes], None]] = None,
+) -> str:
+    """Synthesize text (any length) and save it as a WAV file; returns the file path.
+
+    on_chunk(index, wav_bytes) is called for each chunk as soon as it is ready,
+    so callers can start playback before the whole file exists. Speech already
+    in the media store for the same text and voice is returned without calling
+    the API (on_chunk then receives the whole file once). Files go to
+    output_dir only when the media store is disabled.
+    """
+    media = get_media_store()
+    params = {
+        "model": settings.TTS_MODEL_NAME,
+        "voice": settings.TTS_VOICE,
+        "text": text,
+        "max_chunk_chars": text_to_speech.max_chunk_chars,
+    }
+    key = generation_key("speech", params)
+    if media is not None:
+        cached = media.get(key)
+        if cached:
+            if on_chunk is not None:
+                with open(cached[0], "rb") as f:
+                    on_chunk(0, f.read())
+            logger.system_info(f"Reusing stored speech {cached[0]}")
+            return cached[0]
+
+    payloads = []
+    async for payload in text_to_speech.stream(text):
+        if on_chunk is not None:
+            on_chunk(len(payloads), payload)
+        payloads.append(payload)
+    audio = payloads[0] if len(payloads) == 1 else stitch_wav(payloads)
+    if media is not None:
+        file_path = await media.put_bytes(key, "speech", params, audio, "wav")
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+        file_path = os.path.join(output_dir, f"speech_{int(time.time() * 1000)}.wav")
+        with open(file_path, "wb") as f:
+            f.write(audio)
+    logger.system_info(f"Speech saved to {file_path} ({len(payloads)} chunks)")
+    return file_path
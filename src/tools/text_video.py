@@ -2,15 +2,28 @@ import asyncio
 import logging
 import os
 import time
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
 from src.config.execeptions import TextToVideoError
 from src.prompts.prompts import get_prompt_template
 from src.config.settings import settings
+from src.tools.http_client import get_http_client
 from google import genai
 from google.genai import types
 from pydantic import BaseModel, Field
 
+# Read size when streaming a finished video to disk
+_DOWNLOAD_CHUNK = 1024 * 1024
+
+
+class VideoConfig(BaseModel):
+    """Technical settings for a Veo generation request."""
+    aspect_ratio: str = Field("16:9", description="16:9 or 9:16")
+    number_of_videos: int = Field(1, ge=1, le=4)
+    duration_seconds: int = Field(8, ge=5, le=8)
+    negative_prompt: Optional[str] = Field(None, description="What the video should avoid")
+
+
 class TextToVideo:
     """
     A comprehensive tool for an AI agent to plan and generate videos.
@@ -84,29 +97,16 @@ class TextToVideo:
         # Implementation details are in the prior responses.
         pass
 
-    async def generate_video(
-        self,
-        prompt: str,
-        config: VideoConfig,
-        output_dir: str = "generated_videos",
-    ) -> List[str]:
+    async def start_generation(self, prompt: str, config: VideoConfig) -> str:
         """
-        Asynchronously generates videos based on a prompt and a configuration object.
+        Start a Veo generation job and return its operation name without waiting for it.
 
-        Args:
-            prompt: The final, enhanced cinematic prompt for the video.
-            config: The Pydantic VideoConfig object with technical settings.
-            output_dir: The directory where generated videos will be saved.
-
-        Returns:
-            A list of file paths to the generated videos.
+        Poll the job with get_operation() and collect the output with save_videos().
         """
         if not prompt.strip():
             raise ValueError("Prompt cannot be empty")
 
-        os.makedirs(output_dir, exist_ok=True)
         self.logger.info(f"Generating video with config: {config.model_dump()}")
-
         try:
             # Convert our Pydantic model to the google.genai specific type
             video_config_api = types.GenerateVideosConfig(
@@ -116,35 +116,95 @@ class TextToVideo:
                 duration_seconds=config.duration_seconds,
                 negative_prompt=config.negative_prompt,
             )
-
-            operation = self.genai_client.models.generate_videos(
+            # The genai client is synchronous; keep it off the event loop
+            operation = await asyncio.to_thread(
+                self.genai_client.models.generate_videos,
                 model=self.VEO_MODEL,
                 prompt=prompt,
                 config=video_config_api,
             )
+        except Exception as e:
+            self.logger.error(f"Failed to start video generation: {e}")
+            raise TextToVideoError(f"Failed to start video generation: {e}") from e
+
+        self.logger.info(f"Video generation job started: {operation.name}")
+        return operation.name
+
+    async def get_operation(self, operation_name: str) -> "types.GenerateVideosOperation":
+        """Fetch the current state of a generation job by operation name."""
+        return await asyncio.to_thread(
+            self.genai_client.operations.get, types.GenerateVideosOperation(name=operation_name)
+        )
+
+    def generation_params(self, prompt: str, config: VideoConfig) -> dict:
+        """Everything that determines a generation's output; the media store keys artifacts by it."""
+        return {"model": self.VEO_MODEL, "prompt": prompt, "config": config.model_dump()}
+
+    def video_streams(self, operation: "types.GenerateVideosOperation") -> List[AsyncIterator[bytes]]:
+        """One byte stream per video of a finished job, in order."""
+        if operation.error:
+            raise TextToVideoError(f"Video generation failed: {operation.error}")
+        result = operation.result
+        if not result or not result.generated_videos:
+            raise TextToVideoError("The generation job completed but produced no videos.")
+        return [self._stream_video(generated_video.video) for generated_video in result.generated_videos]
+
+    async def _stream_video(self, video: "types.Video") -> AsyncIterator[bytes]:
+        if video.video_bytes:
+            yield video.video_bytes
+            return
+        if not video.uri:
+            raise TextToVideoError("Generated video has neither bytes nor a download URI.")
+        # Stream the file over the shared pool instead of buffering it in the genai client
+        client = get_http_client().client
+        async with client.stream(
+            "GET", video.uri, headers={"x-goog-api-key": settings.GEMINI_API_KEY}, follow_redirects=True
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK):
+                yield chunk
+
+    async def save_videos(self, operation: "types.GenerateVideosOperation", output_dir: str = "generated_videos") -> List[str]:
+        """Download the videos of a finished job into output_dir; returns their file paths."""
+        os.makedirs(output_dir, exist_ok=True)
+        saved_files = []
+        for n, stream in enumerate(self.video_streams(operation)):
+            timestamp = int(time.time())
+            file_path = os.path.join(output_dir, f"video_{timestamp}_{n}.mp4")
+            with open(file_path, "wb") as f:
+                async for chunk in stream:
+                    f.write(chunk)
+            saved_files.append(file_path)
+            self.logger.info(f"Video downloaded and saved to {file_path}")
+        return saved_files
 
-            self.logger.info(f"Video generation job started: {operation.name}")
-            while not operation.done:
-                self.logger.info("Generation in progress... checking again in 15s.")
-                await asyncio.sleep(15)
-                operation = self.genai_client.operations.get(operation.name)
-
-            self.logger.info("Video generation job finished.")
-            result = operation.result
-
-            if not result or not result.generated_videos:
-                raise TextToVideoError("The generation job completed but produced no videos.")
+    async def generate_video(
+        self,
+        prompt: str,
+        config: VideoConfig,
+        output_dir: str = "generated_videos",
+        poll_interval: float = 15.0,
+    ) -> List[str]:
+        """
+        Generate videos and wait for them; a convenience for scripts.
 
-            saved_files = []
-            for n, generated_video in enumerate(result.generated_videos):
-                timestamp = int(time.time())
-                file_path = os.path.join(output_dir, f"video_{timestamp}_{n}.mp4")
-                generated_video.video.save(file_path)
-                saved_files.append(file_path)
-                self.logger.info(f"Video downloaded and saved to {file_path}")
+        The graph submits jobs through the video job scheduler instead, which
+        doesn't hold a run open while Veo works.
 
-            return saved_files
+        Args:
+            prompt: The final, enhanced cinematic prompt for the video.
+            config: The Pydantic VideoConfig object with technical settings.
+            output_dir: The directory where generated videos will be saved.
 
-        except Exception as e:
-            self.logger.error(f"An exception occurred during video generation: {e}")
-            raise TextToVideoError(f"Failed to generate video: {e}") from e
\ No newline at end of file
+        Returns:
+            A list of file paths to the generated videos.
+        """
+        operation_name = await self.start_generation(prompt, config)
+        while True:
+            operation = await self.get_operation(operation_name)
+            if operation.done:
+                break
+            self.logger.info(f"Generation in progress... checking again in {poll_interval:.0f}s.")
+            await asyncio.sleep(poll_interval)
+        self.logger.info("Video generation job finished.")
+        return await self.save_videos(operation, output_dir)
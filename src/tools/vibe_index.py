@@ -0,0 +1,206 @@
+import json
+import math
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "is", "are", "was", "were",
+    "it", "its", "his", "her", "their", "he", "she", "they", "this", "that", "by", "as", "at", "from",
+    "who", "when", "after", "into", "but", "be", "has", "have", "must",
+}
+# Rows scored per matmul in exact mode; bounds the temporary score matrix
+_EXACT_BLOCK = 65536
+
+
+class HashingEmbedder:
+    """
+    Local synopsis embedding: signed feature hashing of unigrams and bigrams
+    with sublinear term frequency, L2-normalized to float32.
+
+    Needs no model download or API call, and produces the same vector for the
+    same text in every process, so stored vectors never need re-embedding.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> Dict[int, float]:
+        tokens = [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+        counts: Dict[int, float] = {}
+        for gram in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            h = zlib.crc32(gram.encode("utf-8"))
+            bucket, sign = h % self.dim, 1.0 if (h >> 31) & 1 else -1.0
+            counts[bucket] = counts.get(bucket, 0.0) + sign
+        return counts
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, value in self._features(text).items():
+                vectors[row, bucket] = math.copysign(1.0 + math.log(abs(value)), value) if value else 0.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Best k (ids, scores) from parallel arrays, highest score first."""
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        scores, ids = scores[keep], ids[keep]
+    order = np.argsort(-scores)
+    return ids[order], scores[order]
+
+
+class VibeIndex:
+    """
+    Cosine similarity index over synopsis vectors.
+
+    Vectors live in an append-only float32 file that is memory-mapped for
+    search, with one metadata JSON line per row. Small corpora are searched
+    exactly with blocked matmuls. Once an IVF layout has been built
+    (build_ivf: spherical k-means, rows grouped by nearest centroid), a query
+    scores only the n_probe closest lists. Rows appended after the last build
+    form an exactly-scanned tail, so append() never forces a rebuild.
+    """
+
+    def __init__(self, directory: str, dim: int = 512, exact_threshold: int = 20000, n_probe: int = 8):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.exact_threshold = exact_threshold
+        self.n_probe = n_probe
+        self.embedder = HashingEmbedder(dim)
+        self.vectors_path = self.directory / "vectors.f32"
+        self.meta_path = self.directory / "meta.jsonl"
+        self.ivf_path = self.directory / "ivf.npz"
+        self.metadata: List[dict] = []
+        if self.meta_path.exists():
+            with open(self.meta_path, encoding="utf-8") as f:
+                self.metadata = [json.loads(line) for line in f if line.strip()]
+        self._vectors: Optional[np.memmap] = None
+        self._ivf: Optional[Dict[str, np.ndarray]] = None
+        if self.ivf_path.exists():
+            with np.load(self.ivf_path) as data:
+                self._ivf = {name: data[name] for name in data.files}
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        if self._vectors is None or len(self._vectors) != len(self):
+            if not len(self):
+                return np.zeros((0, self.dim), dtype=np.float32)
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self), self.dim))
+        return self._vectors
+
+    @property
+    def ivf_rows(self) -> int:
+        """Rows covered by the IVF layout; later rows are the exact tail."""
+        return int(self._ivf["rows"]) if self._ivf is not None else 0
+
+    def append(self, synopses: Sequence[str], metadata: Sequence[dict]) -> None:
+        """Embed and append rows; metadata[i] is returned with matches (title, year, ...)."""
+        if len(synopses) != len(metadata):
+            raise ValueError("synopses and metadata must have the same length")
+        vectors = self.embedder.embed(synopses)
+        with open(self.vectors_path, "ab") as f:
+            vectors.tofile(f)
+        with open(self.meta_path, "a", encoding="utf-8") as f:
+            for entry in metadata:
+                f.write(json.dumps(entry) + "\n")
+        self.metadata.extend(metadata)
+        self._vectors = None
+
+    def build_ivf(self, n_lists: Optional[int] = None, iterations: int = 10, seed: int = 0) -> None:
+        """Cluster every row with spherical k-means and persist the list layout."""
+        vectors = self.vectors
+        n = len(vectors)
+        if n == 0:
+            return
+        n_lists = n_lists or max(1, int(math.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, size=min(n, 32 * n_lists), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=min(n_lists, len(sample)), replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            filled = norms[:, 0] > 0
+            centroids[filled] = sums[filled] / norms[filled]
+        assign = np.concatenate([
+            np.argmax(vectors[start:start + _EXACT_BLOCK] @ centroids.T, axis=1)
+            for start in range(0, n, _EXACT_BLOCK)
+        ])
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=len(centroids)))]).astype(np.int64)
+        self._ivf = {"centroids": centroids.astype(np.float32), "order": order, "offsets": offsets, "rows": np.int64(n)}
+        np.savez(self.ivf_path, **self._ivf)
+        logger.system_info(f"Built vibe IVF index: {n} rows in {len(centroids)} lists")
+
+    def _search_exact(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        vectors = self.vectors
+        best = [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in range(len(queries))]
+        for start in range(0, len(vectors), _EXACT_BLOCK):
+            block_scores = queries @ vectors[start:start + _EXACT_BLOCK].T
+            ids = np.arange(start, start + block_scores.shape[1])
+            for q in range(len(queries)):
+                top_ids, top_scores = _top_k(block_scores[q], ids, k)
+                best[q] = _top_k(np.concatenate([best[q][1], top_scores]), np.concatenate([best[q][0], top_ids]), k)
+        return best
+
+    def _search_ivf(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        vectors, ivf = self.vectors, self._ivf
+        centroids, order, offsets = ivf["centroids"], ivf["order"], ivf["offsets"]
+        n_probe = min(self.n_probe, len(centroids))
+        probes = np.argpartition(-(queries @ centroids.T), n_probe - 1, axis=1)[:, :n_probe]
+        tail = np.arange(self.ivf_rows, len(vectors))
+        results = []
+        for q, lists in enumerate(probes):
+            candidates = np.concatenate([order[offsets[l]:offsets[l + 1]] for l in lists] + [tail])
+            # Sorted ids keep memmap reads close to sequential
+            candidates.sort()
+            results.append(_top_k(vectors[candidates] @ queries[q], candidates, k))
+        return results
+
+    def search_vectors(self, queries: np.ndarray, k: int = 5) -> List[List[Tuple[int, float]]]:
+        if not len(self):
+            return [[] for _ in range(len(queries))]
+        queries = np.asarray(queries, dtype=np.float32)
+        use_ivf = self._ivf is not None and len(self) > self.exact_threshold
+        found = self._search_ivf(queries, k) if use_ivf else self._search_exact(queries, k)
+        return [[(int(i), float(s)) for i, s in zip(ids, scores)] for ids, scores in found]
+
+    def search(self, synopses: Sequence[str], k: int = 5) -> List[List[dict]]:
+        """Top-k most similar titles per synopsis, as metadata dicts with a `score` key."""
+        hits = self.search_vectors(self.embedder.embed(synopses), k)
+        return [[{**self.metadata[i], "score": round(score, 4)} for i, score in row] for row in hits]
+
+
+_vibe_index: Optional[VibeIndex] = None
+
+
+def get_vibe_index() -> Optional[VibeIndex]:
+    """Process-wide index configured by VIBE_INDEX in agents_config.yaml, or None if it is empty."""
+    global _vibe_index
+    if _vibe_index is None:
+        conf = load_yaml_config(get_config_path()).get("VIBE_INDEX") or {}
+        directory = Path(conf.get("directory", ".cache/vibe_index"))
+        if not directory.is_absolute():
+            directory = Path(__file__).parent.parent.parent / directory
+        _vibe_index = VibeIndex(
+            str(directory),
+            dim=int(conf.get("dim", 512)),
+            exact_threshold=int(conf.get("exact_threshold", 20000)),
+            n_probe=int(conf.get("n_probe", 8)),
+        )
+    return _vibe_index if len(_vibe_index) else None
@@ -0,0 +1,19 @@
+import asyncio
+from langchain_core.tools import tool
+from src.config.logger import logger
+from src.tools.vibe_index import get_vibe_index
+
+
+@tool
+async def vibe_match(synopsis: str, k: int = 5) -> str:
+    """Find released movies whose synopsis is closest in tone and premise to the given synopsis or logline."""
+    index = get_vibe_index()
+    if index is None:
+        return "Vibe matching is unavailable: the synopsis index has not been built (scripts/build_vibe_index.py)."
+    matches = (await asyncio.to_thread(index.search, [synopsis], k))[0]
+    logger.agent_event("vibe_match", f"Vibe-matched {len(matches)} titles")
+    lines = []
+    for match in matches:
+        year = f" ({match['year']})" if match.get("year") else ""
+        lines.append(f"{match.get('title', '?')}{year} - similarity {match['score']:.2f}: {match.get('synopsis', '')}")
+    return "\n".join(lines) or "No similar titles found."
@@ -0,0 +1,356 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from src.config.configuration import get_config_path, load_yaml_config
+from src.config.logger import logger
+from src.tools.media_store import generation_key, get_media_store
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS video_jobs (
+    job_id TEXT PRIMARY KEY,
+    thread_id TEXT,
+    prompt TEXT NOT NULL,
+    negative_prompt TEXT,
+    operation_name TEXT,
+    status TEXT NOT NULL,
+    polls INTEGER NOT NULL DEFAULT 0,
+    next_poll_at REAL NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    generation_key TEXT
+);
+CREATE TABLE IF NOT EXISTS video_job_threads (
+    job_id TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    PRIMARY KEY (job_id, thread_id)
+);
+"""
+
+# Job lifecycle: queued -> running -> succeeded | failed
+_ACTIVE = ("queued", "running")
+
+
+@dataclass
+class VideoJob:
+    job_id: str
+    thread_id: Optional[str]
+    prompt: str
+    negative_prompt: Optional[str]
+    operation_name: Optional[str]
+    status: str
+    polls: int
+    next_poll_at: float
+    result: Optional[List[str]]
+    error: Optional[str]
+    # Every thread waiting for this video: the one that queued it and any that
+    # requested the same generation while it was running
+    thread_ids: List[str] = field(default_factory=list)
+
+
+VideoJobCallback = Callable[[VideoJob], Awaitable[None]]
+
+
+class VideoJobStore:
+    """SQLite table of video jobs; survives restarts so running jobs can be resumed."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(video_jobs)")}
+        if "generation_key" not in columns:
+            # Tables created before jobs were matched by generation
+            self._conn.execute("ALTER TABLE video_jobs ADD COLUMN generation_key TEXT")
+            self._conn.execute(
+                "INSERT OR IGNORE INTO video_job_threads SELECT job_id, thread_id FROM video_jobs WHERE thread_id IS NOT NULL"
+            )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_video_jobs_due ON video_jobs (status, next_poll_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_video_jobs_key ON video_jobs (generation_key, status)")
+        self._conn.commit()
+
+    @staticmethod
+    def _to_job(row: tuple) -> VideoJob:
+        job_id, thread_id, prompt, negative, operation, status, polls, next_poll_at, result, error = row
+        return VideoJob(job_id, thread_id, prompt, negative, operation, status, polls, next_poll_at,
+                        json.loads(result) if result else None, error)
+
+    _COLUMNS = "job_id, thread_id, prompt, negative_prompt, operation_name, status, polls, next_poll_at, result, error"
+
+    def create_or_join(
+        self, prompt: str, negative_prompt: Optional[str], thread_id: Optional[str], generation_key: str
+    ) -> Tuple[VideoJob, bool]:
+        """
+        The queued or running job producing generation_key, or a new job when
+        there is none; thread_id is subscribed to it either way. Returns the job
+        and whether it was created. The lookup and insert are one IMMEDIATE
+        transaction, so processes sharing the table never start the same
+        generation twice.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"""
+                    SELECT {self._COLUMNS} FROM video_jobs WHERE generation_key = ? AND status IN (?, ?)
+                    ORDER BY created_at LIMIT 1
+                    """,
+                    (generation_key, *_ACTIVE),
+                ).fetchone()
+                if row is not None:
+                    job = self._to_job(row)
+                else:
+                    job = VideoJob(uuid.uuid4().hex[:12], thread_id, prompt, negative_prompt, None, "queued", 0, now, None, None)
+                    self._conn.execute(
+                        f"""
+                        INSERT INTO video_jobs ({self._COLUMNS}, created_at, updated_at, generation_key)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (job.job_id, thread_id, prompt, negative_prompt, None, job.status, 0, now, None, None, now, now,
+                         generation_key),
+                    )
+                if thread_id:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO video_job_threads (job_id, thread_id) VALUES (?, ?)", (job.job_id, thread_id)
+                    )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            job.thread_ids = self._thread_ids(job.job_id)
+        return job, row is None
+
+    def _thread_ids(self, job_id: str) -> List[str]:
+        rows = self._conn.execute("SELECT thread_id FROM video_job_threads WHERE job_id = ? ORDER BY rowid", (job_id,))
+        return [row[0] for row in rows]
+
+    def thread_ids(self, job_id: str) -> List[str]:
+        """Threads subscribed to the job, in the order they requested it."""
+        with self._lock:
+            return self._thread_ids(job_id)
+
+    def update(self, job: VideoJob) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE video_jobs SET operation_name = ?, status = ?, polls = ?, next_poll_at = ?,
+                    result = ?, error = ?, updated_at = ? WHERE job_id = ?
+                """,
+                (job.operation_name, job.status, job.polls, job.next_poll_at,
+                 json.dumps(job.result) if job.result is not None else None, job.error, time.time(), job.job_id),
+            )
+            self._conn.commit()
+
+    def claim(self, job: VideoJob, lease: float) -> bool:
+        """
+        Take a due job for `lease` seconds by pushing its next poll out. Only one
+        of several processes sharing the table wins; False means another did.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE video_jobs SET next_poll_at = ? WHERE job_id = ? AND next_poll_at = ? AND status IN (?, ?)",
+                (time.time() + lease, job.job_id, job.next_poll_at, *_ACTIVE),
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[VideoJob]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {self._COLUMNS} FROM video_jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = self._to_job(row)
+            job.thread_ids = self._thread_ids(job_id)
+        return job
+
+    def active(self) -> List[VideoJob]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM video_jobs WHERE status IN (?, ?) ORDER BY next_poll_at", _ACTIVE
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+
+class VideoJobScheduler:
+    """
+    Runs every video job in the process from one poller task.
+
+    submit() records the job and returns at once; the poller starts the Veo
+    operation and then polls all outstanding operations, each on its own
+    backoff (poll_interval doubling per poll up to max_poll_interval). Finished
+    jobs are streamed into the media store (or output_dir when it is disabled)
+    and handed to the completion callbacks. Jobs left
+    queued or running by a previous process are resumed on start. Each job
+    is claimed for `lease` seconds before it is advanced, so server workers
+    sharing the table never poll the same job twice, and a job whose worker
+    died is picked up again once its lease runs out.
+    """
+
+    def __init__(
+        self,
+        store: VideoJobStore,
+        output_dir: str = "generated_videos",
+        poll_interval: float = 10.0,
+        max_poll_interval: float = 60.0,
+        max_polls: int = 120,
+        lease: float = 300.0,
+    ):
+        self.store = store
+        self.output_dir = output_dir
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.max_polls = max_polls
+        self.lease = lease
+        self._callbacks: List[VideoJobCallback] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._backend = None
+
+    @property
+    def backend(self):
+        """The TextToVideo client; created lazily since it validates API keys."""
+        if self._backend is None:
+            from src.tools.text_video import TextToVideo
+
+            self._backend = TextToVideo()
+        return self._backend
+
+    def _request(self, prompt: str, negative_prompt: Optional[str]) -> Tuple[object, dict, str]:
+        """The VideoConfig, generation parameters and media store key of a request."""
+        from src.tools.text_video import VideoConfig
+
+        config = VideoConfig(negative_prompt=negative_prompt or None)
+        params = self.backend.generation_params(prompt, config)
+        return config, params, generation_key("video", params)
+
+    def cached(self, prompt: str, negative_prompt: Optional[str] = None) -> Optional[List[str]]:
+        """Paths of an identical earlier generation from the media store, or None."""
+        media = get_media_store()
+        if media is None:
+            return None
+        return media.get(self._request(prompt, negative_prompt)[2])
+
+    def add_callback(self, callback: VideoJobCallback) -> None:
+        """Register an async callback run once per job when it succeeds or fails."""
+        self._callbacks.append(callback)
+
+    def _ensure_poller(self) -> None:
+        if self._poller is None or self._poller.done():
+            self._wakeup = asyncio.Event()
+            self._poller = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, prompt: str, negative_prompt: Optional[str] = None, thread_id: Optional[str] = None) -> str:
+        """
+        Queue a video job and return its id; the video is produced in the
+        background. A request identical to a job still in progress joins that
+        job instead of paying for a second generation.
+        """
+        job, created = self.store.create_or_join(prompt, negative_prompt, thread_id, self._request(prompt, negative_prompt)[2])
+        if not created:
+            logger.system_info(f"Video job {job.job_id} is already generating this request; thread {thread_id} joins it")
+            return job.job_id
+        self._ensure_poller()
+        self._wakeup.set()
+        logger.system_info(f"Queued video job {job.job_id}")
+        return job.job_id
+
+    def resume(self) -> None:
+        """Start the poller (from a running loop) so jobs from a previous run continue."""
+        outstanding = len(self.store.active())
+        if outstanding:
+            logger.system_info(f"Resuming {outstanding} outstanding video jobs")
+        self._ensure_poller()
+
+    def _backoff(self, polls: int) -> float:
+        return min(self.poll_interval * (2 ** max(polls - 1, 0)), self.max_poll_interval)
+
+    async def _run(self) -> None:
+        while True:
+            jobs = self.store.active()
+            now = time.time()
+            # Claiming lets several server processes share the table without double polling
+            due = [job for job in jobs if job.next_poll_at <= now and self.store.claim(job, self.lease)]
+            if due:
+                await asyncio.gather(*(self._advance(job) for job in due))
+                continue
+            timeout = min((job.next_poll_at for job in jobs), default=now + 3600) - now
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _advance(self, job: VideoJob) -> None:
+        """Start, poll or finish one job; never raises, failures are recorded on the job."""
+        try:
+            config, params, key = self._request(job.prompt, job.negative_prompt)
+            if job.operation_name is None:
+                job.operation_name = await self.backend.start_generation(job.prompt, config)
+                job.status = "running"
+                job.next_poll_at = time.time() + self.poll_interval
+                self.store.update(job)
+                return
+
+            operation = await self.backend.get_operation(job.operation_name)
+            job.polls += 1
+            if not operation.done:
+                if job.polls >= self.max_polls:
+                    raise TimeoutError(f"still running after {job.polls} polls")
+                job.next_poll_at = time.time() + self._backoff(job.polls)
+                self.store.update(job)
+                return
+
+            media = get_media_store()
+            if media is not None:
+                job.result = await media.put_streams(key, "video", params, self.backend.video_streams(operation), "mp4")
+            else:
+                job.result = await self.backend.save_videos(operation, self.output_dir)
+            job.status = "succeeded"
+        except Exception as e:
+            logger.warning(f"Video job {job.job_id} failed: {e}")
+            job.status, job.error = "failed", str(e)
+        self.store.update(job)
+        # Threads may have joined since the job was loaded
+        job.thread_ids = self.store.thread_ids(job.job_id)
+        await self._notify(job)
+
+    async def _notify(self, job: VideoJob) -> None:
+        for callback in self._callbacks:
+            try:
+                await callback(job)
+            except Exception as e:
+                logger.warning(f"Video job callback failed for {job.job_id}: {e}")
+
+
+_scheduler: Optional[VideoJobScheduler] = None
+
+
+def get_video_scheduler() -> VideoJobScheduler:
+    """Process-wide scheduler configured by VIDEO_JOBS in agents_config.yaml."""
+    global _scheduler
+    if _scheduler is None:
+        conf = load_yaml_config(get_config_path()).get("VIDEO_JOBS") or {}
+        path = Path(conf.get("path", ".cache/video_jobs.sqlite"))
+        if not path.is_absolute():
+            path = Path(__file__).parent.parent.parent / path
+        _scheduler = VideoJobScheduler(
+            VideoJobStore(str(path)),
+            output_dir=conf.get("output_dir", "generated_videos"),
+            poll_interval=float(conf.get("poll_interval_seconds", 10)),
+            max_poll_interval=float(conf.get("max_poll_interval_seconds", 60)),
+            max_polls=int(conf.get("max_polls", 120)),
+            lease=float(conf.get("lease_seconds", 300)),
+        )
+    return _scheduler
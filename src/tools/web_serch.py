@@ -1,40 +1,24 @@
-from crawl4ai import AsyncCrawler
-import requests
-from src.config import settings
 from src.config.logger import logger
+from src.tools.chunk_ranker import rank_pages
+from src.tools.crawl import get_crawl_stage
+from src.tools.http_client import organic_links, serper_search
 
-def web_research(query: str) -> str:
+async def web_research(query: str) -> dict:
     """Search the web for information."""
     try:
-        api_key = settings.SERPER_API_KEY
-        base_url = "https://google.serper.dev/search"
-        payload = {
-            "q": query,
-            "api_key": api_key
-        }
-        headers = {
-            'X-API-KEY': api_key,
-            'Content-Type': 'application/json'
-        }
-        response = requests.request("POST", base_url, headers=headers, data=payload)
-        return response.json()
+        return await serper_search(query)
     except Exception as e:
-        logger.error(f"Web search failed: {e}")
-        return "Web search failed."
+        logger.warning(f"Web search failed: {e}")
+        return {}
 
 from langchain_core.tools import tool
 @tool
 async def web_search(query: str,num_results: int = 5) -> str:
     """Search the web for information."""
     try:
-        urls = web_research(query)
-        crawler = AsyncCrawler()
-        results = []
-        for i in range(num_results):
-            response = await crawler.get(urls["organic_results"][i]["link"])
-            results.append(response.markdown)
-        return "\n".join(results)
+        links = organic_links(await web_research(query), num_results)
+        pages = await get_crawl_stage().crawl(links)
+        return rank_pages(query, pages)
     except Exception as e:
-        logger.error(f"Web search failed: {e}")
+        logger.warning(f"Web search failed: {e}")
         return "Web search failed."
-
@@ -1,7 +1,9 @@
+
 from .imdb_api import imdb_api
-from .box_office_predictor import box_office_predictor
+from .box_office_predictor import box_office_predictor, box_office_compare
 from .web_serch import web_search
+from .vibe_match import vibe_match
 
 def get_tools():
-    tools = [imdb_api,box_office_predictor,web_search]
+    tools = [imdb_api,box_office_predictor,box_office_compare,web_search,vibe_match]
     return tools
@@ -0,0 +1,103 @@
+"""SQLite checkpointer batching, retention and maintenance thread."""
+import sqlite3
+import time
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src.graph.checkpointer import SQLiteCheckpointSaver
+
+
+def _put(saver: SQLiteCheckpointSaver, thread_id: str) -> str:
+    checkpoint = empty_checkpoint()
+    saver.put({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}, checkpoint, {}, {})
+    return checkpoint["id"]
+
+
+def _rows_on_disk(path, thread_id: str) -> int:
+    """Counted over a separate connection, so buffered rows don't show."""
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "checkpoints.sqlite"
+
+
+def test_puts_are_buffered_until_batch_size(path):
+    saver = SQLiteCheckpointSaver(str(path), batch_size=3, flush_interval=3600, keep_last=None)
+    try:
+        _put(saver, "t")
+        _put(saver, "t")
+        assert _rows_on_disk(path, "t") == 0
+        _put(saver, "t")
+        assert _rows_on_disk(path, "t") == 3
+    finally:
+        saver.close()
+
+
+def test_reads_flush_pending_writes(path):
+    saver = SQLiteCheckpointSaver(str(path), batch_size=100, flush_interval=3600)
+    try:
+        checkpoint_id = _put(saver, "t")
+        latest = saver.get_tuple({"configurable": {"thread_id": "t", "checkpoint_ns": ""}})
+        assert latest.checkpoint["id"] == checkpoint_id
+        assert _rows_on_disk(path, "t") == 1
+    finally:
+        saver.close()
+
+
+def test_keep_last_prunes_oldest_checkpoints(path):
+    saver = SQLiteCheckpointSaver(str(path), batch_size=1, flush_interval=0.0, keep_last=2)
+    try:
+        ids = [_put(saver, "t") for _ in range(5)]
+        kept = [item.checkpoint["id"] for item in saver.list({"configurable": {"thread_id": "t"}})]
+        assert kept == ids[:-3:-1]
+    finally:
+        saver.close()
+
+
+def test_compact_evicts_idle_threads(path):
+    saver = SQLiteCheckpointSaver(str(path), batch_size=1, flush_interval=0.0, idle_ttl=0.2)
+    try:
+        _put(saver, "idle")
+        time.sleep(0.3)
+        _put(saver, "active")
+        assert saver.compact()["evicted_threads"] == 1
+        assert _rows_on_disk(path, "idle") == 0
+        assert _rows_on_disk(path, "active") == 1
+    finally:
+        saver.close()
+
+
+def test_maintenance_thread_flushes_after_flush_interval(path):
+    saver = SQLiteCheckpointSaver(str(path), batch_size=100, flush_interval=0.2)
+    saver.start_compaction(3600)
+    try:
+        _put(saver, "t")
+        assert _rows_on_disk(path, "t") == 0
+        deadline = time.monotonic() + 2.0
+        while _rows_on_disk(path, "t") == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert _rows_on_disk(path, "t") == 1
+    finally:
+        saver.close()
+
+
+@pytest.mark.parametrize("flush_interval, interval", [(0.0, 3600), (0.0, 0.0), (1e-6, 1e-6)])
+def test_idle_maintenance_thread_does_not_spin(path, flush_interval, interval):
+    # (0.0, 3600) is what build_checkpointer() uses for API workers sharing the file
+    saver = SQLiteCheckpointSaver(str(path), batch_size=1, flush_interval=flush_interval)
+    saver.start_compaction(interval)
+    try:
+        cpu_before, wall_before = time.process_time(), time.monotonic()
+        time.sleep(1.0)
+        cpu = time.process_time() - cpu_before
+        wall = time.monotonic() - wall_before
+    finally:
+        saver.close()
+    assert cpu < 0.2 * wall
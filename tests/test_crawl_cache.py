@@ -0,0 +1,140 @@
+"""Crawl cache revalidation against a local stand-in HTTP server."""
+import asyncio
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from src.tools import crawl
+from src.tools.crawl_cache import CrawlCache
+
+
+class _Site:
+    """One page whose body and ETag change with `version`; records every request."""
+
+    def __init__(self):
+        self.version = 1
+        self.requests = []
+
+    @property
+    def etag(self) -> str:
+        return f'"v{self.version}"'
+
+    @property
+    def body(self) -> str:
+        return f"<html><body><p>page version {self.version}</p></body></html>"
+
+
+@pytest.fixture
+def site():
+    state = _Site()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state.requests.append(dict(self.headers))
+            if self.headers.get("If-None-Match") == state.etag:
+                self.send_response(304)
+                self.send_header("ETag", state.etag)
+                self.end_headers()
+                return
+            body = state.body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("ETag", state.etag)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state.url = f"http://127.0.0.1:{server.server_port}/page"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+class _FakeCrawler:
+    """Stands in for AsyncWebCrawler: fetches real URLs with urllib, passes raw: HTML through."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def arun(self, url: str):
+        self.calls.append(url)
+        if url.startswith("raw:"):
+            return SimpleNamespace(success=True, markdown=url[len("raw:"):], response_headers={})
+
+        def get():
+            with urllib.request.urlopen(url) as response:
+                return response.read().decode("utf-8"), dict(response.headers)
+
+        body, headers = await asyncio.to_thread(get)
+        return SimpleNamespace(success=True, markdown=body, response_headers=headers)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    crawl_cache = CrawlCache(str(tmp_path / "crawl"), default_ttl=60)
+    monkeypatch.setattr(crawl, "get_crawl_cache", lambda: crawl_cache)
+    return crawl_cache
+
+
+def _fetch(crawler, url):
+    stage = crawl.CrawlStage(page_timeout=5)
+    return asyncio.run(stage._fetch(crawler, url, 0))
+
+
+def _expire(cache, url):
+    with cache._lock:
+        cache._conn.execute("UPDATE pages SET fetched_at = fetched_at - 3600 WHERE url = ?", (url,))
+        cache._conn.commit()
+
+
+def test_fresh_entry_is_served_without_requests(site, cache):
+    crawler = _FakeCrawler()
+    first = _fetch(crawler, site.url)
+    second = _fetch(crawler, site.url)
+
+    assert "page version 1" in first.markdown
+    assert second.markdown == first.markdown
+    assert len(site.requests) == 1
+    assert crawler.calls == [site.url]
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_unchanged_entry_is_revalidated_with_304(site, cache):
+    crawler = _FakeCrawler()
+    _fetch(crawler, site.url)
+    _expire(cache, site.url)
+
+    page = _fetch(crawler, site.url)
+
+    assert "page version 1" in page.markdown
+    assert len(site.requests) == 2
+    assert site.requests[1].get("If-None-Match") == '"v1"'
+    assert crawler.calls == [site.url]  # no second crawl
+    assert cache.get(site.url).fresh
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_expired_changed_entry_uses_the_200_body(site, cache):
+    crawler = _FakeCrawler()
+    _fetch(crawler, site.url)
+    _expire(cache, site.url)
+    site.version = 2
+
+    page = _fetch(crawler, site.url)
+
+    assert "page version 2" in page.markdown
+    # One conditional GET and no second fetch of the changed page
+    assert len(site.requests) == 2
+    assert crawler.calls[1].startswith("raw:")
+    cached = cache.get(site.url)
+    assert cached.fresh and cached.etag == '"v2"' and "page version 2" in cached.markdown
+    assert cache.stats()["refetched"] == 1
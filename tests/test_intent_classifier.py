@@ -0,0 +1,46 @@
+"""Fast-path routing: only explicit media requests skip the LLM router."""
+import pytest
+
+from src.prompts.intent_classifier import classify_route, get_fast_path_config
+
+THRESHOLD = get_fast_path_config()["router_threshold"]
+
+
+def _fast_path(query: str):
+    """The workflow the router would take without the LLM, or None when it defers."""
+    response, confidence = classify_route(query)
+    if confidence < THRESHOLD:
+        return None
+    return "video" if response.video else "audio" if response.audio else "conversation"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "create a recording studio scene",
+        "narrate how the villain escapes in the outline",
+        "Record the interview scene dialogue better",
+        "write a scene set in a recording studio",
+        "Write a scene where the hero finds a video of his father",
+        "make the villain's voice more menacing in this scene",
+        "create a parody of video game tropes",
+    ],
+)
+def test_writing_requests_never_fast_path_to_media(query):
+    assert _fast_path(query) not in ("audio", "video")
+
+
+@pytest.mark.parametrize(
+    "query, workflow",
+    [
+        ("generate a video of a dragon over a burning city", "video"),
+        ("turn this scene into a video", "video"),
+        ("read this dialogue aloud", "audio"),
+        ("record the narration for the intro", "audio"),
+        ("record a voice over for the trailer", "audio"),
+        ("make a voice over for the teaser", "audio"),
+        ("hello", "conversation"),
+    ],
+)
+def test_explicit_requests_take_the_fast_path(query, workflow):
+    assert _fast_path(query) == workflow
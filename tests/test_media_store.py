@@ -0,0 +1,35 @@
+"""Media store temp files shared by several processes."""
+import asyncio
+import os
+import time
+
+from src.tools.media_store import MediaStore, generation_key
+
+
+def test_new_store_keeps_temp_files_still_being_written(tmp_path):
+    store = MediaStore(str(tmp_path))
+    key = generation_key("video", {"prompt": "a heist at dawn"})
+
+    async def slow_video():
+        yield b"first half "
+        # Another worker opens the same directory mid-write
+        MediaStore(str(tmp_path))
+        yield b"second half"
+
+    paths = asyncio.run(store.put_streams(key, "video", {"prompt": "a heist at dawn"}, [slow_video()], "mp4"))
+    assert open(paths[0], "rb").read() == b"first half second half"
+    assert store.get(key) == paths
+
+
+def test_new_store_removes_abandoned_temp_files(tmp_path):
+    MediaStore(str(tmp_path))
+    abandoned = tmp_path / "tmp" / "abandoned.part"
+    recent = tmp_path / "tmp" / "recent.part"
+    abandoned.write_bytes(b"x")
+    recent.write_bytes(b"x")
+    two_hours_ago = time.time() - 7200
+    os.utime(abandoned, (two_hours_ago, two_hours_ago))
+
+    MediaStore(str(tmp_path))
+    assert not abandoned.exists()
+    assert recent.exists()
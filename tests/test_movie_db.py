@@ -0,0 +1,133 @@
+"""Local movie database lookups on a small ingested IMDb sample."""
+import importlib.util
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.tools.movie_db import MovieDB
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+_spec = importlib.util.spec_from_file_location("ingest_movies_db", REPO_ROOT / "scripts" / "ingest_movies_db.py")
+ingest_movies_db = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ingest_movies_db)
+
+TITLES = [
+    ("tt0000001", "movie", "Aftersun", 2022, 1000),
+    ("tt0000002", "movie", "Dune", 2021, 800_000),
+    ("tt0000003", "movie", "Dune: Part Two", 2024, 600_000),
+    ("tt0000004", "movie", "Us", 2019, 300_000),
+    ("tt0000005", "tvSeries", "The Office", 2005, 700_000),
+    ("tt0000006", "movie", "Tell Me", 2007, 50),
+    ("tt0000007", "tvEpisode", "Pilot", 2005, 10),
+]
+# Popular titles made of the words questions are phrased with, enough to fill any fixed window
+TITLES += [
+    (f"tt1{i:06d}", "movie", f"The Rating of the Film {word}", 1990 + i % 30, 2_000_000 - i)
+    for i, word in enumerate(f"w{n}" for n in range(400))
+]
+TITLES += [(f"tt2{i:06d}", "movie", f"Cast of the Best {i}", 1990, 1_500_000 - i) for i in range(300)]
+PEOPLE = [
+    ("nm0000001", "Paul Mescal", "actor", "tt0000001"),
+    ("nm0000002", "Charlotte Wells", "director", "tt0000001"),
+    ("nm0000003", "Timothée Chalamet", "actor", "tt0000002,tt0000003"),
+]
+PEOPLE += [(f"nm1{i:06d}", f"Paul Actor{i}", "actor", "") for i in range(300)]
+
+
+def _write_tsv(path: Path, header: str, rows) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header + "\n")
+        for row in rows:
+            f.write("\t".join("\\N" if value is None else str(value) for value in row) + "\n")
+
+
+@pytest.fixture(scope="module")
+def dumps(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("imdb")
+    _write_tsv(
+        data_dir / "title.basics.tsv",
+        "tconst\ttitleType\tprimaryTitle\toriginalTitle\tisAdult\tstartYear\tendYear\truntimeMinutes\tgenres",
+        [(tconst, kind, title, title, 0, year, None, 100, "Drama") for tconst, kind, title, year, _ in TITLES],
+    )
+    _write_tsv(
+        data_dir / "title.ratings.tsv",
+        "tconst\taverageRating\tnumVotes",
+        [(tconst, 7.5, votes) for tconst, _, _, _, votes in TITLES],
+    )
+    _write_tsv(
+        data_dir / "title.principals.tsv",
+        "tconst\tordering\tnconst\tcategory\tjob\tcharacters",
+        [
+            ("tt0000001", 1, "nm0000001", "actor", None, '["Calum"]'),
+            ("tt0000001", 2, "nm0000002", "director", None, None),
+            ("tt0000002", 1, "nm0000003", "actor", None, '["Paul Atreides"]'),
+            ("tt0000007", 1, "nm0000001", "actor", None, None),
+        ],
+    )
+    _write_tsv(
+        data_dir / "name.basics.tsv",
+        "nconst\tprimaryName\tbirthYear\tdeathYear\tprimaryProfession\tknownForTitles",
+        [(nconst, name, 1990, None, professions, known_for) for nconst, name, professions, known_for in PEOPLE],
+    )
+    return data_dir
+
+
+@pytest.fixture(scope="module")
+def db(dumps, tmp_path_factory):
+    path = tmp_path_factory.mktemp("db") / "movies.sqlite"
+    ingest_movies_db.ingest(dumps, path, ingest_movies_db.DEFAULT_TITLE_TYPES, batch_size=100)
+    return MovieDB(str(path))
+
+
+def _titles(answer: str):
+    return [line.split(" (")[0] for line in answer.split("\n") if " imdb:tt" in line]
+
+
+def _people(answer: str):
+    return [line.split(" imdb:")[0] for line in answer.split("\n") if " imdb:nm" in line]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "Aftersun",
+        "cast of Aftersun",
+        "rating of Aftersun",
+        "what is the rating of the film Aftersun",
+        "who was the best in the cast of the film aftersun?",
+    ],
+)
+def test_title_named_inside_a_sentence(db, query):
+    assert _titles(db.lookup(query)) == ["Aftersun"]
+
+
+def test_person_named_inside_a_sentence(db):
+    assert _people(db.lookup("what films has Paul Mescal been in")) == ["Paul Mescal"]
+
+
+def test_most_specific_title_wins(db):
+    assert _titles(db.lookup("dune part two cast")) == ["Dune: Part Two"]
+    assert _titles(db.lookup("Dune 2021 cast")) == ["Dune"]
+
+
+def test_common_word_titles_need_a_name_or_year(db):
+    assert _titles(db.lookup("tell me about the box office for us")) == []
+    assert _titles(db.lookup("box office of Us")) == ["Us"]
+    assert _titles(db.lookup("who starred in the office 2005")) == ["The Office"]
+
+
+def test_ingest_drops_rows_of_titles_not_kept(db):
+    conn = sqlite3.connect(db.path)
+    try:
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table} WHERE tconst = 'tt0000007'").fetchone()[0]
+            for table in ("titles", "ratings", "principals")
+        }
+        (aftersun_credits,) = conn.execute("SELECT COUNT(*) FROM principals WHERE tconst = 'tt0000001'").fetchone()
+    finally:
+        conn.close()
+    # tt0000007 is an episode, which the default title types leave out
+    assert counts == {"titles": 0, "ratings": 0, "principals": 0}
+    assert aftersun_credits == 2
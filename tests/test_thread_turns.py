@@ -0,0 +1,74 @@
+"""One writer per thread: turns and out-of-band updates wait for each other."""
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from src.graph.checkpointer import SQLiteCheckpointSaver
+from src.graph.turns import ThreadLocks, ThreadTurns
+
+
+def test_claims_exclude_other_processes_sharing_the_lock_file(tmp_path):
+    path = str(tmp_path / "locks.sqlite")
+
+    async def scenario():
+        worker_a = ThreadTurns(ThreadLocks(path, lease=0.3), poll_interval=0.02)
+        worker_b = ThreadTurns(ThreadLocks(path, lease=0.3), poll_interval=0.02)
+        assert await worker_a.begin("t")
+        assert not await worker_a.begin("t")
+        assert not await worker_b.begin("t")
+        # Renewed while held, well past the lease
+        await asyncio.sleep(1.0)
+        assert not await worker_b.begin("t")
+        await worker_a.end("t")
+        assert await worker_b.begin("t")
+        worker_b.abandon("t")
+
+    asyncio.run(scenario())
+
+
+def test_lock_of_a_dead_process_expires(tmp_path):
+    path = str(tmp_path / "locks.sqlite")
+    assert ThreadLocks(path, lease=0.2).acquire("t")
+
+    async def scenario():
+        turns = ThreadTurns(ThreadLocks(path), poll_interval=0.05)
+        assert not await turns.begin("t")
+        async with turns.hold("t"):
+            pass
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+
+def test_update_waits_for_the_running_turn(tmp_path):
+    async def slow_reply(state):
+        await asyncio.sleep(0.3)
+        return {"messages": [AIMessage(content="reply")]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("reply", slow_reply)
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"), batch_size=1, flush_interval=0.0)
+    graph = builder.compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": "t"}}
+    turns = ThreadTurns(poll_interval=0.02)
+
+    async def turn():
+        async with turns.hold("t"):
+            await graph.ainvoke({"messages": [HumanMessage(content="hi")]}, config)
+
+    async def deliver():
+        await asyncio.sleep(0.1)  # arrives mid-turn
+        async with turns.hold("t"):
+            await graph.aupdate_state(config, {"messages": [AIMessage(content="Your video is ready")]}, as_node="reply")
+
+    async def scenario():
+        await asyncio.gather(turn(), deliver())
+        return (await graph.aget_state(config)).values["messages"]
+
+    try:
+        messages = asyncio.run(scenario())
+    finally:
+        saver.close()
+    assert [message.content for message in messages] == ["hi", "reply", "Your video is ready"]
@@ -0,0 +1,113 @@
+"""Video jobs: identical requests made while a job is running share it."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.tools import video_jobs
+from src.tools.media_store import generation_key
+from src.tools.video_jobs import VideoJobScheduler, VideoJobStore
+
+
+class _FakeVeo:
+    """Stands in for TextToVideo; each operation finishes on its second poll."""
+
+    def __init__(self):
+        self.started = []
+        self.polls = {}
+
+    async def start_generation(self, prompt, config):
+        self.started.append(prompt)
+        return f"operation-{len(self.started)}"
+
+    async def get_operation(self, name):
+        self.polls[name] = self.polls.get(name, 0) + 1
+        return SimpleNamespace(done=self.polls[name] >= 2, name=name)
+
+    async def save_videos(self, operation, output_dir):
+        return [f"{output_dir}/{operation.name}.mp4"]
+
+
+@pytest.fixture
+def make_scheduler(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_jobs, "get_media_store", lambda: None)
+    veo = _FakeVeo()
+
+    def make():
+        scheduler = VideoJobScheduler(
+            VideoJobStore(str(tmp_path / "jobs.sqlite")), output_dir=str(tmp_path), poll_interval=0.05, max_poll_interval=0.05
+        )
+        scheduler._backend = veo
+        monkeypatch.setattr(
+            scheduler, "_request", lambda prompt, negative: (None, {}, generation_key("video", {"prompt": prompt, "negative": negative}))
+        )
+        return scheduler
+
+    make.veo = veo
+    return make
+
+
+def _run_until_delivered(scheduler, count, submit):
+    delivered = []
+
+    async def record(job):
+        delivered.append(job)
+
+    scheduler.add_callback(record)
+
+    async def scenario():
+        job_ids = await submit()
+        for _ in range(200):
+            if len(delivered) >= count:
+                break
+            await asyncio.sleep(0.02)
+        scheduler._poller.cancel()
+        return job_ids
+
+    return asyncio.run(scenario()), delivered
+
+
+def test_identical_request_joins_the_running_job(make_scheduler):
+    scheduler = make_scheduler()
+
+    async def submit():
+        first = await scheduler.submit("a heist at dawn", thread_id="thread-a")
+        await asyncio.sleep(0.08)  # started, not finished
+        second = await scheduler.submit("a heist at dawn", thread_id="thread-b")
+        return first, second
+
+    (first, second), delivered = _run_until_delivered(scheduler, 1, submit)
+    assert first == second
+    assert make_scheduler.veo.started == ["a heist at dawn"]
+    assert [job.thread_ids for job in delivered] == [["thread-a", "thread-b"]]
+
+
+def test_different_requests_get_their_own_jobs(make_scheduler):
+    scheduler = make_scheduler()
+
+    async def submit():
+        return [
+            await scheduler.submit("a heist at dawn", thread_id="thread-a"),
+            await scheduler.submit("a heist at dawn", negative_prompt="rain", thread_id="thread-b"),
+        ]
+
+    job_ids, delivered = _run_until_delivered(scheduler, 2, submit)
+    assert job_ids[0] != job_ids[1]
+    assert len(make_scheduler.veo.started) == 2
+    assert sorted(job.thread_ids[0] for job in delivered) == ["thread-a", "thread-b"]
+
+
+def test_processes_sharing_the_table_join_the_same_job(make_scheduler):
+    worker_a, worker_b = make_scheduler(), make_scheduler()
+
+    async def scenario():
+        first = await worker_a.submit("a heist at dawn", thread_id="thread-a")
+        second = await worker_b.submit("a heist at dawn", thread_id="thread-b")
+        # Only the worker that created the job polls it
+        assert worker_b._poller is None
+        worker_a._poller.cancel()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second
+    assert worker_a.store.get(first).thread_ids == ["thread-a", "thread-b"]